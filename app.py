@@ -3,7 +3,9 @@ Kite 프론트엔드 (Streamlit)
 """
 import streamlit as st
 import requests
+import json
 import os
+from urllib.parse import quote
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -53,47 +55,142 @@ with col_ex3:
 
 st.divider()
 
+
+def fetch_document(doc_id: str) -> dict:
+    """
+    문서 전체 내용 조회 (펼쳤을 때만)
+    
+    받은 본문과 ETag를 세션에 저장해두고, 다시 그릴 때는 If-None-Match로
+    재검증해서 바뀌지 않았으면(304) 저장된 본문을 사용한다.
+    """
+    document_cache = st.session_state.setdefault("document_cache", {})
+    cached = document_cache.get(doc_id)
+    headers = {"If-None-Match": cached["etag"]} if cached and cached["etag"] else {}
+    
+    response = requests.get(f"{BACKEND_URL}/documents/{quote(doc_id, safe='')}", headers=headers, timeout=10)
+    if response.status_code == 304 and cached:
+        return cached["document"]
+    response.raise_for_status()
+    
+    document = response.json()
+    document_cache[doc_id] = {"etag": response.headers.get("ETag"), "document": document}
+    return document
+
+
+def render_documents(documents: list):
+    """관련 문서 목록 (스니펫 표시, 버튼을 누르면 전체 내용 조회)"""
+    opened = st.session_state.setdefault("opened_documents", set())
+    
+    st.subheader(f"🔍 관련 문서 ({len(documents)}개 발견)")
+    for doc in documents:
+        with st.expander(f"**[{doc['source']}]** {doc['title']} | {doc['date']}", expanded=doc["id"] in opened):
+            if doc["id"] in opened:
+                try:
+                    st.write(fetch_document(doc["id"])["content"])
+                except Exception as e:
+                    st.error(f"❌ 문서를 불러올 수 없습니다: {str(e)}")
+            else:
+                st.markdown(doc.get("snippet") or "")
+                if st.button("📄 전체 내용 보기", key=f"full_{doc['id']}"):
+                    opened.add(doc["id"])
+                    st.rerun()
+            if doc.get("sender"):
+                st.caption(f"작성자: {doc['sender']}")
+
+
+def render_action_items(action_items: list):
+    for i, item in enumerate(action_items, 1):
+        st.checkbox(f"{i}. {item}", key=f"action_{i}")
+
+
 # 분석 실행
 if analyze_button and user_query:
-    with st.spinner("🔎 관련 문서를 찾고 AI가 분석하고 있습니다..."):
-        try:
-            # FastAPI 호출
-            response = requests.post(
-                f"{BACKEND_URL}/analyze",
-                json={"query": user_query},
-                timeout=30
-            )
+    st.session_state.pop("last_analysis", None)
+    st.session_state["opened_documents"] = set()
+    
+    # 결과 영역을 먼저 잡아두고, 스트림 이벤트가 도착하는 대로 채운다
+    st.subheader("📖 업무 맥락 요약")
+    summary_placeholder = st.empty()
+    summary_placeholder.info("🔎 관련 문서를 찾고 있습니다...")
+    
+    st.divider()
+    documents_container = st.container()
+    st.divider()
+    
+    st.subheader("✅ 해야 할 일 (Action Items)")
+    action_items_placeholder = st.empty()
+    
+    try:
+        # FastAPI 스트리밍 호출 (NDJSON: 한 줄에 이벤트 하나)
+        with requests.post(
+            f"{BACKEND_URL}/analyze/stream",
+            json={"query": user_query},
+            stream=True,
+            timeout=(5, 60)  # (연결, 이벤트 간 최대 대기)
+        ) as response:
             
             if response.status_code == 200:
-                result = response.json()
-                
-                # 업무 맥락 요약
-                st.subheader("📖 업무 맥락 요약")
-                st.markdown(result["summary"])
+                response.encoding = "utf-8"
+                summary = ""
+                documents, action_items = [], []
                 
-                st.divider()
+                for line in response.iter_lines(decode_unicode=True):
+                    if not line:
+                        continue
+                    event = json.loads(line)
+                    
+                    if event["type"] == "documents":
+                        # 관련 문서 (스니펫만, 전체 내용은 펼칠 때 조회)
+                        documents = event["documents"]
+                        with documents_container:
+                            render_documents(documents)
+                        summary_placeholder.info("🤖 AI가 분석하고 있습니다...")
+                    
+                    elif event["type"] == "summary":
+                        # 업무 맥락 요약 (토큰 단위로 이어 붙이기)
+                        summary += event["delta"]
+                        summary_placeholder.markdown(summary + "▌")
+                    
+                    elif event["type"] == "action_items":
+                        # 액션 아이템
+                        action_items = event["action_items"]
+                        with action_items_placeholder.container():
+                            render_action_items(action_items)
+                    
+                    elif event["type"] == "error":
+                        st.error(f"❌ 분석 실패: {event['error']}")
                 
-                # 관련 문서
-                st.subheader(f"🔍 관련 문서 ({len(result['documents'])}개 발견)")
-                for doc in result["documents"]:
-                    with st.expander(f"**[{doc['source']}]** {doc['title']} | {doc['date']}"):
-                        st.write(doc["content"])
-                        if "sender" in doc:
-                            st.caption(f"작성자: {doc.get('sender', doc.get('author', doc.get('assignee', '')))}")
-                st.divider()
+                if summary:
+                    summary_placeholder.markdown(summary)
                 
-                # 액션 아이템
-                st.subheader("✅ 해야 할 일 (Action Items)")
-                for i, item in enumerate(result["action_items"], 1):
-                    st.checkbox(f"{i}. {item}", key=f"action_{i}")
+                # 버튼을 눌러 다시 그릴 때(rerun) 결과를 유지하기 위해 저장
+                st.session_state["last_analysis"] = {
+                    "summary": summary,
+                    "documents": documents,
+                    "action_items": action_items
+                }
                 
             else:
                 st.error(f"❌ 서버 오류: {response.status_code}")
                 
-        except requests.exceptions.ConnectionError:
-            st.error("❌ 백엔드 서버에 연결할 수 없습니다. FastAPI 서버가 실행 중인지 확인하세요.")
-        except Exception as e:
-            st.error(f"❌ 오류 발생: {str(e)}")
+    except requests.exceptions.ConnectionError:
+        st.error("❌ 백엔드 서버에 연결할 수 없습니다. FastAPI 서버가 실행 중인지 확인하세요.")
+    except Exception as e:
+        st.error(f"❌ 오류 발생: {str(e)}")
+
+elif "last_analysis" in st.session_state:
+    # 직전 분석 결과 다시 그리기 (전체 내용 보기 버튼 등으로 rerun된 경우)
+    last_analysis = st.session_state["last_analysis"]
+    
+    st.subheader("📖 업무 맥락 요약")
+    st.markdown(last_analysis["summary"])
+    
+    st.divider()
+    render_documents(last_analysis["documents"])
+    st.divider()
+    
+    st.subheader("✅ 해야 할 일 (Action Items)")
+    render_action_items(last_analysis["action_items"])
 
 # 사이드바
 with st.sidebar:
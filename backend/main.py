@@ -1,12 +1,68 @@
 """
 FastAPI 백엔드 메인 서버 (RAG 통합)
 """
-from fastapi import FastAPI, Request
+import asyncio
+import hashlib
+import json
+import os
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+from backend.service.container import ServiceContainer
+from backend.service.metrics import METRICS_CONTENT_TYPE, render_metrics, track_stage
+from backend.service.query_cache import make_cache_key, is_cacheable
+from backend.service.query_filters import normalize_filters, resolve_filters
+
+
+async def watch_corpus_version(container: ServiceContainer):
+    """
+    인덱서 마지막 성공 시각을 주기적으로 확인해서
+    새 실행이 성공했으면 결과 캐시 / 의미 캐시를 비운다.
+    조회가 실패해도 감시를 멈추지 않고 다음 주기에 다시 확인한다 (태스크가 죽으면 캐시가 영영 안 비워짐).
+    """
+    interval = float(os.getenv("KITE_INDEXER_POLL_INTERVAL", "60"))
+    
+    while True:
+        try:
+            status = await container.search_service.get_indexer_status()
+            version = status.get("last_success_time")
+            container.semantic_cache.update_corpus_version(version)
+            if container.query_cache.update_corpus_version(version):
+                print(f"🧹 인덱서 실행 감지 → 캐시 초기화 ({container.query_cache.corpus_version})")
+        except Exception as e:
+            print(f"⚠️ 코퍼스 버전 확인 실패 (다음 주기에 다시 확인): {str(e)}")
+        await asyncio.sleep(interval)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    공유 서비스 컨테이너 생성 (커넥션 풀 / 캐시는 앱 전체에서 하나씩),
+    코퍼스 버전 감시 시작, 앱 종료 시 커넥션 정리
+    """
+    container = ServiceContainer()
+    app.state.container = container
+    
+    watcher = None
+    if container.search_service and (container.query_cache.enabled or container.semantic_cache.enabled):
+        watcher = asyncio.create_task(watch_corpus_version(container))
+    
+    yield
+    
+    if watcher:
+        watcher.cancel()
+    await container.close()
 
-from backend.service.rag_service import RAGService
 
-app = FastAPI(title="Kite API", version="1.0.0")
+def get_container(request: Request) -> ServiceContainer:
+    """라우트에 공유 서비스 컨테이너 주입"""
+    return request.app.state.container
+
+
+app = FastAPI(title="Kite API", version="1.0.0", lifespan=lifespan)
 
 # CORS 설정
 app.add_middleware(
@@ -17,13 +73,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# RAG 서비스 초기화 (전역)
-try:
-    rag_service = RAGService()
-    print("✅ RAG 서비스 초기화 완료")
-except Exception as e:
-    print(f"⚠️ RAG 서비스 초기화 실패: {str(e)}")
-    rag_service = None
+# 요청 단위 지표를 남길 경로 (라벨 수가 늘어나지 않도록 고정 목록)
+# 스트리밍 응답은 본문 전송 전 응답 시작까지의 시간이 기록된다.
+TRACKED_PATHS = {
+    "/analyze": "analyze_request",
+    "/analyze/stream": "analyze_stream_request"
+}
+
+
+@app.middleware("http")
+async def track_requests(request: Request, call_next):
+    stage = TRACKED_PATHS.get(request.url.path)
+    if stage is None:
+        return await call_next(request)
+    
+    with track_stage(stage):
+        return await call_next(request)
 
 
 @app.get("/")
@@ -42,9 +107,12 @@ def read_root():
 
 
 @app.post("/analyze")
-async def analyze_query(request: Request):
+async def analyze_query(request: Request, container: ServiceContainer = Depends(get_container)):
     """
     업무 질문 분석 엔드포인트 (RAG 적용)
+    
+    body: {"query": "...", "filters": {"sources": [...], "senders": [...], "date_from": "YYYY-MM-DD", "date_to": "YYYY-MM-DD"}}
+    filters는 생략 가능하고, 질문 문장에서 뽑은 필터("이번 주 슬랙")와 합쳐진다 (요청 값 우선).
     """
     try:
         data = await request.json()
@@ -59,7 +127,7 @@ async def analyze_query(request: Request):
                 "action_items": []
             }
         
-        if not rag_service:
+        if not container.rag_service:
             return {
                 "error": "RAG 서비스가 초기화되지 않았습니다",
                 "query": query,
@@ -68,28 +136,44 @@ async def analyze_query(request: Request):
                 "action_items": []
             }
         
-        # 1. RAG로 관련 문서 검색
-        print(f"🔍 검색 쿼리: {query}")
-        documents = rag_service.search_relevant_documents(query, top=5)
+        try:
+            filters = resolve_filters(query, data.get("filters"))
+            explicit_filters = normalize_filters(data.get("filters"))
+        except ValueError as e:
+            return {
+                "error": f"잘못된 filters: {str(e)}",
+                "query": query,
+                "summary": "",
+                "documents": [],
+                "action_items": []
+            }
+        
+        # 캐시 확인 (정규화된 질문 + 검색 파라미터)
+        top = 5
+        cache_key = make_cache_key(query, top=top, filters=filters)
+        cached = container.query_cache.get(cache_key)
+        if cached is not None:
+            print(f"⚡ 캐시 적중: {query}")
+            return {**cached, "query": query, "metadata": {**cached["metadata"], "cache": "hit"}}
         
-        # 2. AI로 맥락 요약 생성
-        print(f"🤖 AI 요약 생성 중... (문서 {len(documents)}개)")
-        summary = rag_service.generate_context_aware_summary(query, documents)
+        async def compute():
+            corpus_version = container.query_cache.corpus_version
+            result = await container.rag_service.analyze(
+                query, top=top, filters=filters, fallback_filters=explicit_filters
+            )
+            if is_cacheable(result):
+                container.query_cache.set(cache_key, result, corpus_version)
+            return result
         
-        # 3. 액션 아이템 추출
-        print(f"✅ 액션 아이템 생성 중...")
-        action_items = rag_service.generate_action_items(query, documents)
+        # 같은 질문이 이미 처리 중이면 그 결과를 함께 기다림
+        result, coalesced = await container.single_flight.do(cache_key, compute)
+        if coalesced:
+            print(f"🔗 진행 중인 동일 요청에 합류: {query}")
         
         return {
+            **result,
             "query": query,
-            "summary": summary,
-            "documents": documents,
-            "action_items": action_items,
-            "metadata": {
-                "documents_found": len(documents),
-                "search_method": "hybrid (keyword + vector)",
-                "ai_model": "gpt-4"
-            }
+            "metadata": {**result["metadata"], "cache": "miss", "coalesced": coalesced}
         }
     
     except Exception as e:
@@ -106,23 +190,180 @@ async def analyze_query(request: Request):
         }
 
 
+def _stream_event(event: dict) -> str:
+    """NDJSON 스트림 이벤트 한 줄 생성"""
+    return json.dumps(event, ensure_ascii=False) + "\n"
+
+
+def _replay_events(query: str, result: dict, **metadata):
+    """완성된 /analyze 결과를 스트림 이벤트 순서로 변환"""
+    yield _stream_event({"type": "documents", "query": query, "documents": result["documents"]})
+    yield _stream_event({"type": "summary", "delta": result["summary"]})
+    yield _stream_event({"type": "action_items", "action_items": result["action_items"]})
+    yield _stream_event({"type": "done", "metadata": {**result["metadata"], **metadata}})
+
+
+async def _stream_analysis(container: ServiceContainer, query: str, filters: dict, fallback_filters: dict = None):
+    """
+    /analyze/stream 이벤트 생성기
+    
+    캐시에 있거나 같은 질문이 /analyze에서 처리 중이면 그 결과를 같은 이벤트
+    순서로 한 번에 내보내고, 없으면 RAG 파이프라인 이벤트를 그대로 전달하면서
+    결과를 모아 캐시에 저장한다.
+    """
+    top = 5
+    cache_key = make_cache_key(query, top=top, filters=filters)
+    cached = container.query_cache.get(cache_key)
+    
+    if cached is not None:
+        print(f"⚡ [stream] 캐시 적중: {query}")
+        for event in _replay_events(query, cached, cache="hit", coalesced=False):
+            yield event
+        return
+    
+    inflight = container.single_flight.get_inflight(cache_key)
+    if inflight is not None:
+        print(f"🔗 [stream] 진행 중인 동일 요청에 합류: {query}")
+        try:
+            result = await asyncio.shield(inflight)
+            for event in _replay_events(query, result, cache="miss", coalesced=True):
+                yield event
+        except Exception as e:
+            print(f"❌ 스트리밍 분석 실패: {str(e)}")
+            yield _stream_event({"type": "error", "error": str(e)})
+        return
+    
+    corpus_version = container.query_cache.corpus_version
+    result = {"query": query}
+    summary_parts = []
+    
+    try:
+        async for event in container.rag_service.stream_analyze(
+            query, top=top, filters=filters, fallback_filters=fallback_filters
+        ):
+            if event["type"] == "documents":
+                result["documents"] = event["documents"]
+            elif event["type"] == "summary":
+                summary_parts.append(event["delta"])
+            elif event["type"] == "action_items":
+                result["action_items"] = event["action_items"]
+            elif event["type"] == "done":
+                result["summary"] = "".join(summary_parts)
+                result["metadata"] = event["metadata"]
+                if is_cacheable(result):
+                    container.query_cache.set(cache_key, result, corpus_version)
+                event = {
+                    "type": "done",
+                    "metadata": {**event["metadata"], "cache": "miss", "coalesced": False}
+                }
+        
+            yield _stream_event(event)
+    
+    except Exception as e:
+        print(f"❌ 스트리밍 분석 실패: {str(e)}")
+        yield _stream_event({"type": "error", "error": str(e)})
+
+
+@app.post("/analyze/stream")
+async def analyze_query_stream(request: Request, container: ServiceContainer = Depends(get_container)):
+    """
+    업무 질문 분석 스트리밍 엔드포인트 (NDJSON)
+    
+    검색된 문서를 먼저 보내고, 요약은 모델이 생성하는 대로 토큰 단위로,
+    마지막으로 액션 아이템을 보낸다. 각 줄은 {"type": ...} 형태의 JSON.
+    body는 /analyze와 같다 (query, filters).
+    """
+    # 본문이 JSON 객체가 아니면 /analyze처럼 오류를 응답으로 (500 대신)
+    try:
+        data = await request.json()
+        query = data.get("query", "")
+    except Exception as e:
+        print(f"❌ 스트리밍 요청 본문 해석 실패: {str(e)}")
+        data, query, body_error = None, None, str(e)
+    
+    if data is None:
+        events = [_stream_event({"type": "error", "error": f"요청 본문은 JSON 객체여야 합니다: {body_error}"})]
+    elif not query:
+        events = [_stream_event({"type": "error", "error": "query 파라미터가 필요합니다"})]
+    elif not container.rag_service:
+        events = [_stream_event({"type": "error", "error": "RAG 서비스가 초기화되지 않았습니다"})]
+    else:
+        try:
+            events = _stream_analysis(
+                container, query, resolve_filters(query, data.get("filters")), normalize_filters(data.get("filters"))
+            )
+        except ValueError as e:
+            events = [_stream_event({"type": "error", "error": f"잘못된 filters: {str(e)}"})]
+    
+    return StreamingResponse(
+        events,
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match 헤더에 etag가 있는지 (약한 비교, * 포함)"""
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or any(value.removeprefix("W/") == etag for value in candidates)
+
+
+@app.get("/documents/{doc_id}")
+async def get_document(doc_id: str, request: Request, container: ServiceContainer = Depends(get_container)):
+    """
+    문서 전체 내용 조회 (/analyze 응답에는 스니펫만 포함)
+    
+    본문 해시로 ETag를 만들어 보내고, 클라이언트가 If-None-Match로 같은 값을 보내면
+    본문 없이 304를 반환한다.
+    """
+    if not container.search_service:
+        return JSONResponse({"error": "검색 서비스가 초기화되지 않았습니다"}, status_code=503)
+    
+    try:
+        document = await container.search_service.get_document(doc_id)
+    except Exception as e:
+        print(f"❌ 문서 조회 실패: {doc_id}, {str(e)}")
+        return JSONResponse({"error": str(e)}, status_code=502)
+    
+    if document is None:
+        return JSONResponse({"error": "문서를 찾을 수 없습니다", "id": doc_id}, status_code=404)
+    
+    body = json.dumps(document, ensure_ascii=False).encode("utf-8")
+    etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    
+    if _etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+
 @app.get("/health")
-def health_check():
+def health_check(container: ServiceContainer = Depends(get_container)):
     """헬스 체크"""
     return {
         "status": "healthy",
-        "rag_service": "ready" if rag_service else "not initialized"
+        "rag_service": "ready" if container.rag_service else "not initialized",
+        "query_cache": container.query_cache.stats(),
+        "semantic_cache": container.semantic_cache.stats(),
+        "embedding_cache": container.embedding_cache.stats(),
+        "single_flight": container.single_flight.stats()
     }
 
 
+@app.get("/metrics")
+def metrics():
+    """Prometheus 지표 (단계별 지연 시간 / 오류 / 캐시 적중)"""
+    return Response(render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
+
 @app.get("/indexer/status")
-async def get_indexer_status():
+async def get_indexer_status(container: ServiceContainer = Depends(get_container)):
     """인덱서 상태 조회"""
     try:
-        from backend.service.azure_search import AzureSearchService
+        if not container.search_service:
+            return {"error": "검색 서비스가 초기화되지 않았습니다"}
         
-        search_service = AzureSearchService()
-        status = search_service.get_indexer_status()
+        status = await container.search_service.get_indexer_status()
         
         return {
             "indexer": "kite-auto-indexer",
@@ -135,14 +376,13 @@ async def get_indexer_status():
 
 
 @app.post("/indexer/run")
-async def run_indexer():
+async def run_indexer(container: ServiceContainer = Depends(get_container)):
     """인덱서 수동 실행"""
     try:
-        from backend.service.azure_search import AzureSearchService
-        
-        search_service = AzureSearchService()
+        if not container.search_service:
+            return {"error": "검색 서비스가 초기화되지 않았습니다"}
         
-        if search_service.run_indexer():
+        if await container.search_service.run_indexer():
             return {
                 "message": "인덱서 실행 시작",
                 "estimated_time": "1-2분"
@@ -1,17 +1,94 @@
 """
 Azure Blob Storage 클라이언트
 문서 업로드 및 관리
+
+대량 업로드(upload_documents)는 스레드 풀로 여러 문서를 동시에 올린다.
+Blob마다 Content-MD5를 저장하므로 remote_hashes(blob_hashes 결과)를 넘기면 안 바뀐 문서는 건너뛴다
+(증분 동기화는 blob_manifest.sync_documents).
+- KITE_BLOB_UPLOAD_CONCURRENCY: 동시 업로드 수 (HTTP 커넥션 풀 크기도 같게 맞춤)
+- KITE_BLOB_UPLOAD_RETRIES: 스로틀링(429 / 503) / 일시적인 오류 재시도 횟수 (지수 백오프 + 지터)
 """
 import os
 import json
-from typing import List, Dict
-from azure.storage.blob import BlobServiceClient, BlobClient, ContentSettings
+import time
+import random
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import requests
+from requests.adapters import HTTPAdapter
+from azure.core.exceptions import HttpResponseError, ResourceNotFoundError, ServiceRequestError, ServiceResponseError
+from azure.core.pipeline.transport import RequestsTransport
+from azure.storage.blob import BlobPrefix, BlobServiceClient, BlobClient, ContentSettings
 from dotenv import load_dotenv
 import logging
+from backend.service.blob_manifest import blob_name as document_blob_name, content_md5, serialize_document
 
 load_dotenv()
 logger = logging.getLogger(__name__)
 
+# 재시도할 HTTP 상태 (스로틀링 / 일시적인 서버 오류)
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+# 재시도 대기 시간 (초): min(기본 × 2^시도, 최대) 안에서 무작위
+_RETRY_BASE_SECONDS = 0.5
+_RETRY_MAX_SECONDS = 30.0
+
+# 진행 상황 콜백 최소 간격 (초)
+_PROGRESS_INTERVAL = 1.0
+
+# 배치 삭제 요청 하나에 넣을 수 있는 최대 Blob 수
+_DELETE_BATCH = 256
+
+
+def upload_concurrency() -> int:
+    """KITE_BLOB_UPLOAD_CONCURRENCY (기본 16)"""
+    return max(int(os.getenv("KITE_BLOB_UPLOAD_CONCURRENCY", "16")), 1)
+
+
+def upload_retries() -> int:
+    """KITE_BLOB_UPLOAD_RETRIES (기본 5)"""
+    return max(int(os.getenv("KITE_BLOB_UPLOAD_RETRIES", "5")), 0)
+
+
+def _retry_delay(error: Exception, attempt: int) -> float:
+    """서버가 Retry-After를 주면 그 값, 아니면 지수 백오프 + full jitter"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        if headers.get("x-ms-retry-after-ms"):
+            return float(headers["x-ms-retry-after-ms"]) / 1000
+        if headers.get("Retry-After"):
+            return float(headers["Retry-After"])
+    except ValueError:
+        pass
+    return random.uniform(0, min(_RETRY_BASE_SECONDS * 2 ** attempt, _RETRY_MAX_SECONDS))
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, (ServiceRequestError, ServiceResponseError)):
+        return True
+    return isinstance(error, HttpResponseError) and error.status_code in RETRYABLE_STATUS
+
+
+def _pooled_transport(pool_size: int) -> RequestsTransport:
+    """동시 업로드 수만큼 커넥션을 유지하는 transport (requests 기본 풀은 호스트당 10개)"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return RequestsTransport(session=session, session_owner=True)
+
+
+def upload_progress(stats: Dict, elapsed: float) -> Dict:
+    """업로드 진행 상황 (개수 / 바이트 + 처리량)"""
+    elapsed = max(elapsed, 1e-9)
+    return {
+        **stats,
+        "elapsed_seconds": round(elapsed, 2),
+        "docs_per_second": round(stats["done"] / elapsed, 1),
+        "mb_per_second": round(stats["bytes"] / elapsed / 1e6, 2)
+    }
+
 
 class AzureBlobService:
     """Azure Blob Storage 서비스"""
@@ -20,10 +97,13 @@ class AzureBlobService:
         """클라이언트 초기화"""
         self.connection_string = os.getenv("AZURE_STORAGE_CONNECTION_STRING")
         self.container_name = os.getenv("AZURE_STORAGE_CONTAINER_NAME")
+        self.concurrency = upload_concurrency()
+        self.max_retries = upload_retries()
         
-        # Blob 서비스 클라이언트
+        # Blob 서비스 클라이언트 (커넥션 풀 = 동시 업로드 수)
         self.blob_service_client = BlobServiceClient.from_connection_string(
-            self.connection_string
+            self.connection_string,
+            transport=_pooled_transport(self.concurrency)
         )
         
         # 컨테이너 클라이언트
@@ -46,18 +126,9 @@ class AzureBlobService:
         """
         try:
             if blob_name is None:
-                blob_name = f"{document['id']}.json"
+                blob_name = document_blob_name(document)
             
-            # JSON 문자열로 변환
-            json_data = json.dumps(document, ensure_ascii=False, indent=2)
-            
-            # Blob 업로드
-            blob_client = self.container_client.get_blob_client(blob_name)
-            blob_client.upload_blob(
-                json_data,
-                overwrite=True,
-                content_settings=ContentSettings(content_type='application/json')
-            )
+            self._upload_with_retry(blob_name, serialize_document(document))
             
             logger.info(f"✅ 문서 업로드 성공: {blob_name}")
             return True
@@ -66,29 +137,126 @@ class AzureBlobService:
             logger.error(f"❌ 문서 업로드 실패: {blob_name}, {str(e)}")
             return False
     
-    def upload_documents(self, documents: List[Dict]) -> int:
+    def _upload_with_retry(self, blob_name: str, data: bytes, content_type: str = "application/json") -> int:
         """
-        여러 문서를 일괄 업로드
+        Blob 하나 업로드 (재시도 가능한 오류면 백오프 후 다시 시도)
+        
+        SDK 자체 재시도는 끄고(retry_total=0) 여기서만 재시도한다.
+        내용의 MD5를 Content-MD5로 같이 저장한다 (증분 동기화 비교용).
+        
+        Returns:
+            재시도 횟수
+        """
+        blob_client = self.container_client.get_blob_client(blob_name)
+        content_settings = ContentSettings(content_type=content_type, content_md5=bytearray(content_md5(data)))
+        for attempt in range(self.max_retries + 1):
+            try:
+                blob_client.upload_blob(data, overwrite=True, content_settings=content_settings, retry_total=0)
+                return attempt
+            except Exception as e:
+                if attempt == self.max_retries or not _is_retryable(e):
+                    raise
+                delay = _retry_delay(e, attempt)
+                logger.warning(f"⏳ 업로드 재시도 {attempt + 1}/{self.max_retries} ({delay:.1f}초 후): {blob_name}, {str(e)}")
+                time.sleep(delay)
+    
+    def upload_documents(
+        self,
+        documents: Iterable[Dict],
+        max_concurrency: int = None,
+        on_progress: Optional[Callable[[Dict], None]] = None,
+        remote_hashes: Optional[Dict[str, str]] = None
+    ) -> int:
+        """
+        여러 문서를 동시에 일괄 업로드 (문서마다 {id}.json Blob 하나)
         
         Args:
-            documents: 문서 리스트
+            documents: 문서 리스트 (또는 이터러블)
+            max_concurrency: 동시 업로드 수 (없으면 KITE_BLOB_UPLOAD_CONCURRENCY)
+            on_progress: 진행 상황 콜백 (최대 1초에 한 번 + 마지막에 한 번, upload_progress 형식)
+            remote_hashes: {Blob 이름: MD5 hex} (blob_hashes 결과), 같은 MD5면 업로드하지 않음
         
         Returns:
-            성공한 문서 개수
+            성공한 문서 개수 (건너뛴 문서 제외)
         """
-        success_count = 0
+        remote_hashes = remote_hashes or {}
         
-        for doc in documents:
-            if self.upload_document(doc):
-                success_count += 1
+        def blobs():
+            for document in documents:
+                name = document_blob_name(document)
+                data = serialize_document(document)
+                yield name, (None if remote_hashes.get(name) == content_md5(data).hex() else data)
         
-        logger.info(f"📊 일괄 업로드 완료: {success_count}/{len(documents)}개 성공")
-        return success_count
+        total = len(documents) if hasattr(documents, "__len__") else None
+        return self.upload_blobs(blobs(), max_concurrency, on_progress, total=total)["succeeded"]
+    
+    def upload_blobs(
+        self,
+        blobs: Iterable[Tuple[str, Optional[bytes]]],
+        max_concurrency: int = None,
+        on_progress: Optional[Callable[[Dict], None]] = None,
+        content_type: str = "application/json",
+        total: int = None
+    ) -> Dict:
+        """
+        (Blob 이름, 내용) 목록을 스레드 풀로 동시에 업로드 (내용이 None이면 건너뜀으로 집계)
+        
+        동시에 진행 중인 업로드는 max_concurrency × 2개까지만 두므로
+        제너레이터로 넘겨도 메모리가 Blob 수만큼 늘지 않는다.
+        
+        Returns:
+            마지막 진행 상황 (upload_progress 형식)
+        """
+        workers = max_concurrency or self.concurrency
+        stats = {"total": total, "done": 0, "succeeded": 0, "skipped": 0, "failed": 0, "retries": 0, "bytes": 0}
+        started = last_report = time.perf_counter()
+        
+        def upload(name: str, data: bytes):
+            return len(data), self._upload_with_retry(name, data, content_type)
+        
+        def collect(finished):
+            for future in finished:
+                stats["done"] += 1
+                try:
+                    size, retries = future.result()
+                    stats["succeeded"] += 1
+                    stats["bytes"] += size
+                    stats["retries"] += retries
+                except Exception as e:
+                    stats["failed"] += 1
+                    logger.error(f"❌ 업로드 실패: {str(e)}")
+        
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="blob-upload") as executor:
+            pending = set()
+            for name, data in blobs:
+                if data is None:
+                    stats["done"] += 1
+                    stats["skipped"] += 1
+                    continue
+                pending.add(executor.submit(upload, name, data))
+                if len(pending) >= workers * 2:
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(finished)
+                    if on_progress and time.perf_counter() - last_report >= _PROGRESS_INTERVAL:
+                        last_report = time.perf_counter()
+                        on_progress(upload_progress(stats, last_report - started))
+            finished, _ = wait(pending)
+            collect(finished)
+        
+        progress = upload_progress(stats, time.perf_counter() - started)
+        if on_progress:
+            on_progress(progress)
+        logger.info(
+            f"📊 일괄 업로드 완료: {stats['succeeded']}/{stats['done'] - stats['skipped']}개 성공, "
+            f"{stats['skipped']}개 변경 없음 "
+            f"({progress['docs_per_second']}개/초, {progress['mb_per_second']} MB/초)"
+        )
+        return progress
     
-    def list_blobs(self) -> List[str]:
-        """컨테이너 내 모든 Blob 목록 반환"""
+    def list_blobs(self, prefix: str = None) -> List[str]:
+        """컨테이너 내 모든 Blob 목록 반환 (prefix가 있으면 그 경로 아래만)"""
         try:
-            blobs = self.container_client.list_blobs()
+            blobs = self.container_client.list_blobs(name_starts_with=prefix)
             blob_names = [blob.name for blob in blobs]
             
             logger.info(f"📄 Blob 목록 조회: {len(blob_names)}개 발견")
@@ -98,6 +266,31 @@ class AzureBlobService:
             logger.error(f"❌ Blob 목록 조회 실패: {str(e)}")
             return []
     
+    def blob_hashes(self) -> Dict[str, Optional[str]]:
+        """
+        {Blob 이름: Content-MD5 hex} 매니페스트 (MD5가 없는 Blob은 None)
+        
+        컨테이너 루트의 문서 Blob({id}.json)만 포함한다 (LocalBlobService.blob_hashes와 같음).
+        jsonl/, manifest/ 같은 하위 경로는 delimiter 목록에서 접두어로만 나오므로 건너뛴다
+        (delete_missing이 배치 Blob / 매니페스트를 지우지 않도록).
+        조회에 실패하면 예외 전파 (빈 매니페스트로 처리하면 전체를 다시 올리게 됨)
+        """
+        hashes = {}
+        for blob in self.container_client.walk_blobs(delimiter="/"):
+            if isinstance(blob, BlobPrefix) or not blob.name.endswith(".json"):
+                continue
+            md5 = blob.content_settings.content_md5
+            hashes[blob.name] = bytes(md5).hex() if md5 else None
+        logger.info(f"📄 Blob 매니페스트 조회: {len(hashes)}개")
+        return hashes
+    
+    def download_bytes(self, blob_name: str) -> Optional[bytes]:
+        """Blob 내용 그대로 (없으면 None, 그 밖의 오류는 예외 전파)"""
+        try:
+            return self.container_client.get_blob_client(blob_name).download_blob().readall()
+        except ResourceNotFoundError:
+            return None
+    
     def download_blob(self, blob_name: str) -> Dict:
         """
         Blob 다운로드 및 JSON 파싱
@@ -135,6 +328,29 @@ class AzureBlobService:
             logger.error(f"❌ Blob 삭제 실패: {blob_name}, {str(e)}")
             return False
     
+    def delete_blobs(self, blob_names: List[str]) -> int:
+        """
+        여러 Blob 삭제 (요청 하나에 256개씩 배치 삭제)
+        
+        Returns:
+            삭제한 Blob 개수
+        """
+        deleted = 0
+        for start in range(0, len(blob_names), _DELETE_BATCH):
+            batch = blob_names[start:start + _DELETE_BATCH]
+            try:
+                responses = self.container_client.delete_blobs(*batch, raise_on_any_failure=False)
+                for name, response in zip(batch, responses):
+                    if response.status_code in (200, 202, 404):
+                        deleted += 1
+                    else:
+                        logger.error(f"❌ Blob 삭제 실패: {name}, HTTP {response.status_code}")
+            except Exception as e:
+                logger.error(f"❌ Blob 배치 삭제 실패: {len(batch)}개, {str(e)}")
+        
+        logger.info(f"🗑️ Blob 삭제: {deleted}/{len(blob_names)}개")
+        return deleted
+    
     def get_blob_url(self, blob_name: str) -> str:
         """Blob URL 반환 (디버깅용)"""
         blob_client = self.container_client.get_blob_client(blob_name)
@@ -2,9 +2,13 @@
 Azure AI Search 서비스 (검색 엔진)
 """
 import os
-from typing import List, Dict
+import json
+from pathlib import Path
+from typing import List, Dict, Optional
 from azure.search.documents import SearchClient
+from azure.search.documents.aio import SearchClient as AsyncSearchClient
 from azure.search.documents.indexes import SearchIndexClient, SearchIndexerClient
+from azure.search.documents.indexes.aio import SearchIndexerClient as AsyncSearchIndexerClient
 from azure.search.documents.indexes.models import (
     SearchIndex,
     SearchField,
@@ -14,21 +18,173 @@ from azure.search.documents.indexes.models import (
     VectorSearch,
     VectorSearchProfile,
     HnswAlgorithmConfiguration,
+    ScalarQuantizationCompression,
+    ScalarQuantizationParameters,
+    BinaryQuantizationCompression,
     SearchIndexer,
     SearchIndexerDataSourceConnection,
+    SoftDeleteColumnDeletionDetectionPolicy,
     SearchIndexerDataContainer,
     SearchIndexerSkillset,
     InputFieldMappingEntry,
     OutputFieldMappingEntry,
     AzureOpenAIEmbeddingSkill,
     IndexingParameters,
-    IndexingParametersConfiguration
+    IndexingParametersConfiguration,
+    SearchIndexerIndexProjection,
+    SearchIndexerIndexProjectionSelector,
+    SearchIndexerIndexProjectionsParameters
 )
 from azure.core.credentials import AzureKeyCredential
+from azure.core.exceptions import ResourceNotFoundError
+from azure.core.pipeline.transport import AioHttpTransport
 from dotenv import load_dotenv
+import aiohttp
+from backend.service.blob_batches import BATCH_PREFIX, SOFT_DELETE_COLUMN, SOFT_DELETE_MARKER, blob_layout
+from backend.service.chunking import CHUNK_FIELDS, index_mode, merge_chunk_document
+from backend.service.metrics import record_error
+from backend.service.query_filters import to_odata
+from backend.service.vector_compression import (
+    EMBEDDING_MODEL_DIMENSIONS,
+    embedding_dimensions,
+    vector_compression,
+    vector_oversampling,
+    vector_rescore
+)
+from backend.service.snippets import HIGHLIGHT_POST_TAG, HIGHLIGHT_PRE_TAG, search_highlight_snippet
 
 load_dotenv()
 
+# 검색 결과로 가져오는 필드 (content_vector는 응답 크기가 커서 제외)
+DOCUMENT_FIELDS = ("id", "title", "content", "source", "date", "sender")
+
+# 청크 색인에서 원본 문서 하나를 복원할 때 가져오는 최대 청크 수
+_MAX_CHUNKS_PER_DOCUMENT = 1000
+
+# HNSW 기본 파라미터 (KITE_HNSW_CONFIG / create_index 인자로 덮어씀)
+DEFAULT_HNSW_PARAMETERS = {"m": 4, "efConstruction": 400, "efSearch": 500, "metric": "cosine"}
+HNSW_PARAMETER_NAMES = tuple(DEFAULT_HNSW_PARAMETERS)
+
+
+def load_hnsw_config() -> Dict:
+    """
+    KITE_HNSW_CONFIG의 HNSW 파라미터 (JSON 파일 경로 또는 JSON 문자열, 없으면 빈 딕셔너리)
+    
+    scripts/hnsw_sweep.py --recommend 로 만든 파일을 그대로 쓸 수 있다.
+    """
+    value = os.getenv("KITE_HNSW_CONFIG", "").strip()
+    if not value:
+        return {}
+    text = value if value.startswith("{") else Path(value).read_text(encoding="utf-8")
+    config = json.loads(text)
+    return {name: config[name] for name in HNSW_PARAMETER_NAMES if name in config}
+
+
+def _to_document(result) -> Dict:
+    """검색 결과 한 건을 응답용 딕셔너리로 변환"""
+    document = {
+        "id": result["id"],
+        "title": result["title"],
+        "content": result["content"],
+        "source": result["source"],
+        "date": result["date"],
+        "sender": result.get("sender", ""),
+        "score": result["@search.score"],
+        "snippet": search_highlight_snippet(result.get("@search.highlights"), result["content"])
+    }
+    # 청크 단위 색인이면 원본 문서 ID / 청크 번호 포함
+    for field in CHUNK_FIELDS:
+        if result.get(field) is not None:
+            document[field] = result[field]
+    return document
+
+
+def _index_names() -> Dict[str, str]:
+    """색인 방식별 인덱스 / 인덱서 / 스킬셋 이름 (청크 색인은 스키마가 달라서 별도 인덱스)"""
+    if index_mode() == "chunk":
+        return {"index": "kite-chunks", "indexer": "kite-chunk-indexer", "skillset": "kite-chunk-skillset"}
+    return {"index": "kite-documents", "indexer": "kite-indexer", "skillset": "kite-embedding-skillset"}
+
+
+def _search_options(search_text: Optional[str], chunked: bool, filters: Optional[Dict] = None) -> Dict:
+    """
+    검색 요청 공통 옵션
+    
+    필요한 필드만 가져오고(select), 키워드 검색이면 본문 하이라이트로 스니펫을 만든다.
+    필터가 있으면 OData 필터로 후보를 먼저 줄인다 (벡터 검색도 필터 적용 후 k개, preFilter).
+    """
+    options = {"select": [*DOCUMENT_FIELDS, *(CHUNK_FIELDS if chunked else ())]}
+    odata = to_odata(filters)
+    if odata:
+        options.update(filter=odata, vector_filter_mode="preFilter")
+    if search_text and search_text != "*":
+        options.update(
+            highlight_fields="content",
+            highlight_pre_tag=HIGHLIGHT_PRE_TAG,
+            highlight_post_tag=HIGHLIGHT_POST_TAG
+        )
+    return options
+
+
+def _vector_compressions() -> List:
+    """
+    KITE_VECTOR_COMPRESSION에 맞는 벡터 압축 설정 (none이면 빈 목록)
+    
+    양자화 벡터로 후보를 k × oversampling개 뽑고, KITE_VECTOR_RESCORE=originals면
+    원본 벡터로 다시 계산한다 (rerank_with_original_vectors).
+    """
+    compression = vector_compression()
+    if compression == "none":
+        return []
+    options = {
+        "compression_name": "kite-compression",
+        "rerank_with_original_vectors": vector_rescore() == "originals",
+        "default_oversampling": vector_oversampling()
+    }
+    if compression == "int8":
+        return [ScalarQuantizationCompression(
+            parameters=ScalarQuantizationParameters(quantized_data_type="int8"), **options
+        )]
+    return [BinaryQuantizationCompression(**options)]
+
+
+def _chunk_filter(parent_id: str) -> str:
+    """parent_id 일치 OData 필터 (작은따옴표 이스케이프)"""
+    escaped = parent_id.replace("'", "''")
+    return f"parent_id eq '{escaped}'"
+
+
+def _vector_queries(query_vector: Optional[List[float]], k: int) -> Optional[List[Dict]]:
+    """벡터 쿼리 파라미터 (벡터가 없으면 None → 키워드 검색만)"""
+    if not query_vector:
+        return None
+    return [{
+        "kind": "vector",
+        "vector": query_vector,
+        "fields": "content_vector",
+        "k": k
+    }]
+
+
+def _to_indexer_status(status) -> Dict:
+    """인덱서 상태 객체를 응답용 딕셔너리로 변환"""
+    # 가장 최근의 성공한 실행 (execution_history는 최신순)
+    last_success = next(
+        (run for run in [status.last_result, *status.execution_history]
+         if run and run.status == "success"),
+        None
+    )
+    
+    return {
+        "status": status.status,
+        "last_result": status.last_result.status if status.last_result else None,
+        "execution_history": len(status.execution_history),
+        "last_success_time": (
+            last_success.end_time.isoformat()
+            if last_success and last_success.end_time else None
+        )
+    }
+
 
 class AzureSearchService:
     """Azure AI Search 서비스"""
@@ -36,10 +192,12 @@ class AzureSearchService:
     def __init__(self):
         self.endpoint = os.getenv("AZURE_SEARCH_ENDPOINT")
         self.key = os.getenv("AZURE_SEARCH_KEY")
-        self.index_name = "kite-documents"
+        self.index_mode = index_mode()
+        names = _index_names()
+        self.index_name = names["index"]
         self.datasource_name = "kite-blob-datasource"
-        self.indexer_name = "kite-indexer"
-        self.skillset_name = "kite-embedding-skillset"
+        self.indexer_name = names["indexer"]
+        self.skillset_name = names["skillset"]
         
         self.credential = AzureKeyCredential(self.key)
         
@@ -52,6 +210,11 @@ class AzureSearchService:
             endpoint=self.endpoint,
             credential=self.credential
         )
+        self.search_client = SearchClient(
+            endpoint=self.endpoint,
+            index_name=self.index_name,
+            credential=self.credential
+        )
         
         print("✅ Azure AI Search 초기화 완료")
     
@@ -63,11 +226,20 @@ class AzureSearchService:
             storage_connection_string = os.getenv("AZURE_STORAGE_CONNECTION_STRING")
             container_name = os.getenv("AZURE_STORAGE_CONTAINER_NAME")
             
+            # JSON Lines 배치면 배치 경로만 읽고, tombstone 줄(is_deleted=true)로 인덱스 문서 삭제
+            jsonl = blob_layout() == "jsonl"
             datasource = SearchIndexerDataSourceConnection(
                 name=self.datasource_name,
                 type="azureblob",
                 connection_string=storage_connection_string,
-                container=SearchIndexerDataContainer(name=container_name)
+                container=SearchIndexerDataContainer(
+                    name=container_name,
+                    query=BATCH_PREFIX.rstrip("/") if jsonl else None
+                ),
+                data_deletion_detection_policy=SoftDeleteColumnDeletionDetectionPolicy(
+                    soft_delete_column_name=SOFT_DELETE_COLUMN,
+                    soft_delete_marker_value=SOFT_DELETE_MARKER
+                ) if jsonl else None
             )
             
             self.indexer_client.create_or_update_data_source_connection(datasource)
@@ -78,43 +250,65 @@ class AzureSearchService:
             print(f"❌ 데이터 소스 생성 실패: {str(e)}")
             return False
     
-    def create_index(self) -> bool:
-        """인덱스(검색 가능한 형태로 정리된 데이터 공간) 생성 """
+    def create_index(self, hnsw_parameters: Optional[Dict] = None) -> bool:
+        """
+        인덱스(검색 가능한 형태로 정리된 데이터 공간) 생성
+        
+        hnsw_parameters: {"m", "efConstruction", "efSearch", "metric"} 중 바꿀 값
+        (없으면 KITE_HNSW_CONFIG, 그것도 없으면 DEFAULT_HNSW_PARAMETERS)
+        """
         try:
-            # 벡터 검색 설정
+            parameters = {**DEFAULT_HNSW_PARAMETERS, **(hnsw_parameters or load_hnsw_config())}
+            print(f"   HNSW: {parameters}")
+            
+            # 벡터 검색 설정 (KITE_VECTOR_COMPRESSION이면 양자화 압축)
+            compressions = _vector_compressions()
             vector_search = VectorSearch(
                 profiles=[
                     VectorSearchProfile(
                         name="kite-profile",
-                        algorithm_configuration_name="kite-hnsw"
+                        algorithm_configuration_name="kite-hnsw",
+                        compression_name=compressions[0].compression_name if compressions else None
                     )
                 ],
                 algorithms=[
                     HnswAlgorithmConfiguration(
                         name="kite-hnsw",
-                        parameters={
-                            "m": 4,
-                            "efConstruction": 400,
-                            "efSearch": 500,
-                            "metric": "cosine"
-                        }
+                        parameters=parameters
                     )
-                ]
+                ],
+                compressions=compressions
             )
             
             # 필드 정의
-            fields = [
-                SimpleField(name="id", type=SearchFieldDataType.String, key=True),
+            if self.index_mode == "chunk":
+                # 청크 색인: 키는 인덱스 프로젝션이 생성 (keyword 분석기 필요), parent_id로 원본 문서 참조
+                fields = [
+                    SearchableField(
+                        name="id", type=SearchFieldDataType.String, key=True, analyzer_name="keyword",
+                        filterable=True, sortable=True
+                    ),
+                    SimpleField(name="parent_id", type=SearchFieldDataType.String, filterable=True),
+                    SimpleField(name="chunk_index", type=SearchFieldDataType.Int32, sortable=True)
+                ]
+            else:
+                fields = [
+                    SimpleField(name="id", type=SearchFieldDataType.String, key=True, filterable=True, sortable=True)
+                ]
+            fields += [
                 SearchableField(name="title", type=SearchFieldDataType.String),
                 SearchableField(name="content", type=SearchFieldDataType.String),
                 SimpleField(name="source", type=SearchFieldDataType.String, filterable=True),
                 SimpleField(name="date", type=SearchFieldDataType.String, sortable=True),
                 SimpleField(name="sender", type=SearchFieldDataType.String, filterable=True),
+                # 필터 전용 필드 (업로드 시 query_filters.attach_filter_fields로 생성)
+                SimpleField(name="date_value", type=SearchFieldDataType.DateTimeOffset, filterable=True, sortable=True),
+                SimpleField(name="senders", type=SearchFieldDataType.Collection(SearchFieldDataType.String), filterable=True),
                 SearchField(
                     name="content_vector",
                     type=SearchFieldDataType.Collection(SearchFieldDataType.Single),
                     searchable=True,
-                    vector_search_dimensions=1536,
+                    vector_search_dimensions=embedding_dimensions(),
                     vector_search_profile_name="kite-profile"
                 )
             ]
@@ -139,19 +333,24 @@ class AzureSearchService:
         스킬셋 생성 (임베딩 자동 생성용)
         """
         try:
+            # 청크 색인이면 업로드 시 만든 /document/chunks의 청크마다 임베딩
+            chunked = self.index_mode == "chunk"
+            context = "/document/chunks/*" if chunked else "/document"
+            
             # Azure OpenAI 임베딩 스킬
             embedding_skill = AzureOpenAIEmbeddingSkill(
                 name="embedding-skill",
                 description="텍스트를 벡터로 변환",
-                context="/document",
+                context=context,
                 resource_url=os.getenv("AZURE_OPENAI_ENDPOINT"),
                 api_key=os.getenv("AZURE_OPENAI_API_KEY"),
                 deployment_name=os.getenv("AZURE_OPENAI_EMBEDDING_DEPLOYMENT"),
                 model_name="text-embedding-3-small",  
+                dimensions=embedding_dimensions() if embedding_dimensions() != EMBEDDING_MODEL_DIMENSIONS else None,
                 inputs=[
                     InputFieldMappingEntry(
                         name="text",
-                        source="/document/content"
+                        source=f"{context}/content"
                     )
                 ],
                 outputs=[
@@ -165,7 +364,8 @@ class AzureSearchService:
             skillset = SearchIndexerSkillset(
                 name=self.skillset_name,
                 description="Kite 임베딩 스킬셋",
-                skills=[embedding_skill]
+                skills=[embedding_skill],
+                index_projection=self._chunk_projection() if chunked else None
             )
             
             self.indexer_client.create_or_update_skillset(skillset)
@@ -176,15 +376,44 @@ class AzureSearchService:
             print(f"❌ 스킬셋 생성 실패: {str(e)}")
             return False
     
+    def _chunk_projection(self) -> SearchIndexerIndexProjection:
+        """
+        청크 → 인덱스 문서 프로젝션
+        
+        청크 하나가 인덱스 문서 하나가 되고, 원본 문서 키는 parent_id에 들어간다.
+        원본 문서 자체는 색인하지 않는다.
+        """
+        mappings = [
+            InputFieldMappingEntry(name="chunk_index", source="/document/chunks/*/chunk_index"),
+            InputFieldMappingEntry(name="content", source="/document/chunks/*/content"),
+            InputFieldMappingEntry(name="content_vector", source="/document/chunks/*/content_vector")
+        ] + [
+            InputFieldMappingEntry(name=field, source=f"/document/{field}")
+            for field in ("title", "source", "date", "sender", "date_value", "senders")
+        ]
+        return SearchIndexerIndexProjection(
+            selectors=[
+                SearchIndexerIndexProjectionSelector(
+                    target_index_name=self.index_name,
+                    parent_key_field_name="parent_id",
+                    source_context="/document/chunks/*",
+                    mappings=mappings
+                )
+            ],
+            parameters=SearchIndexerIndexProjectionsParameters(
+                projection_mode="skipIndexingParentDocuments"
+            )
+        )
+    
     def create_indexer(self) -> bool:
         """
         인덱서(자동으로 데이터를 인덱스에 추가해주는 역할) 생성 
         """
         try:
-            # 인덱서 파라미터
+            # 인덱서 파라미터 (JSON Lines 배치면 줄마다 검색 문서 하나)
             indexing_parameters = IndexingParameters(
                 configuration=IndexingParametersConfiguration(
-                    parsing_mode="json",
+                    parsing_mode="jsonLines" if blob_layout() == "jsonl" else "json",
                     query_timeout=None
                 )
             )
@@ -196,13 +425,17 @@ class AzureSearchService:
                 {"sourceFieldName": "content", "targetFieldName": "content"},
                 {"sourceFieldName": "source", "targetFieldName": "source"},
                 {"sourceFieldName": "date", "targetFieldName": "date"},
-                {"sourceFieldName": "sender", "targetFieldName": "sender"}
+                {"sourceFieldName": "sender", "targetFieldName": "sender"},
+                {"sourceFieldName": "date_value", "targetFieldName": "date_value"},
+                {"sourceFieldName": "senders", "targetFieldName": "senders"}
             ]
             
-            # 출력 필드 매핑 (스킬셋 결과)
+            # 출력 필드 매핑 (스킬셋 결과, 청크 색인은 인덱스 프로젝션이 대신 매핑)
             output_field_mappings = [
                 {"sourceFieldName": "/document/content_vector", "targetFieldName": "content_vector"}
             ]
+            if self.index_mode == "chunk":
+                field_mappings, output_field_mappings = [], []
             
             # 인덱서 생성
             indexer = SearchIndexer(
@@ -240,59 +473,217 @@ class AzureSearchService:
         """인덱서 상태 확인"""
         try:
             status = self.indexer_client.get_indexer_status(self.indexer_name)
-            return {
-                "status": status.status,
-                "last_result": status.last_result.status if status.last_result else None,
-                "execution_history": len(status.execution_history)
-            }
+            return _to_indexer_status(status)
         except Exception as e:
             print(f"❌ 상태 조회 실패: {str(e)}")
             return {}
     
     def get_search_client(self) -> SearchClient:
-        """검색 클라이언트 반환"""
-        return SearchClient(
-            endpoint=self.endpoint,
-            index_name=self.index_name,
-            credential=self.credential
-        )
+        """검색 클라이언트 반환 (커넥션 재사용을 위해 인스턴스당 하나)"""
+        return self.search_client
     
     def hybrid_search(
         self,
         query: str,
-        query_vector: List[float],
-        top: int = 5
+        query_vector: Optional[List[float]],
+        top: int = 5,
+        filters: Optional[Dict] = None
+    ) -> List[Dict]:
+        """하이브리드 검색 (키워드 + 벡터, 벡터가 없으면 키워드만, filters: query_filters 형식)"""
+        return self._search(query, query_vector, top, filters)
+    
+    def keyword_search(self, query: str, top: int = 50, filters: Optional[Dict] = None) -> List[Dict]:
+        """키워드 검색만 실행"""
+        return self._search(query, None, top, filters)
+    
+    def vector_search(self, query_vector: List[float], top: int = 5, filters: Optional[Dict] = None) -> List[Dict]:
+        """벡터 검색만 실행"""
+        return self._search(None, query_vector, top, filters)
+    
+    def get_document(self, doc_id: str) -> Optional[Dict]:
+        """
+        문서 전체 조회 (없으면 None, 그 밖의 오류는 예외 전파)
+        
+        청크 색인이면 parent_id가 같은 청크를 모두 가져와서 이어 붙인다.
+        """
+        try:
+            if self.index_mode == "chunk":
+                results = self.search_client.search(
+                    search_text="*",
+                    filter=_chunk_filter(doc_id),
+                    select=[*DOCUMENT_FIELDS, *CHUNK_FIELDS],
+                    order_by=["chunk_index"],
+                    top=_MAX_CHUNKS_PER_DOCUMENT
+                )
+                chunks = [dict(result) for result in results]
+                return merge_chunk_document(doc_id, chunks) if chunks else None
+            
+            result = self.search_client.get_document(key=doc_id, selected_fields=list(DOCUMENT_FIELDS))
+            return {field: result.get(field) for field in DOCUMENT_FIELDS}
+        except ResourceNotFoundError:
+            return None
+    
+    def _search(
+        self,
+        search_text: Optional[str],
+        query_vector: Optional[List[float]],
+        top: int,
+        filters: Optional[Dict] = None
     ) -> List[Dict]:
-        """하이브리드 검색 (키워드 + 벡터)"""
         try:
             search_client = self.get_search_client()
             
             results = search_client.search(
-                search_text=query,
-                vector_queries=[{
-                    "kind": "vector",
-                    "vector": query_vector,
-                    "fields": "content_vector",
-                    "k": top
-                }],
-                top=top
+                search_text=search_text,
+                vector_queries=_vector_queries(query_vector, top),
+                top=top,
+                **_search_options(search_text, self.index_mode == "chunk", filters)
+            )
+            
+            documents = [_to_document(result) for result in results]
+            
+            print(f"✅ 검색 완료: {len(documents)}개 문서 발견")
+            return documents
+            
+        except Exception as e:
+            print(f"❌ 검색 실패: {str(e)}")
+            return []
+
+
+class AsyncAzureSearchService:
+    """
+    Azure AI Search 서비스 (비동기)
+    
+    FastAPI 라우트에서 사용하는 검색 / 인덱서 조회 전용 클라이언트.
+    인덱스 / 스킬셋 생성 같은 설정 작업은 AzureSearchService를 사용한다.
+    
+    session을 넘기면 검색 / 인덱서 클라이언트가 그 aiohttp 커넥션 풀을 함께 사용한다
+    (ServiceContainer가 앱 전체에서 하나만 만들어서 주입).
+    """
+    
+    def __init__(self, session: aiohttp.ClientSession = None):
+        self.endpoint = os.getenv("AZURE_SEARCH_ENDPOINT")
+        self.key = os.getenv("AZURE_SEARCH_KEY")
+        self.index_mode = index_mode()
+        names = _index_names()
+        self.index_name = names["index"]
+        self.indexer_name = names["indexer"]
+        
+        self.credential = AzureKeyCredential(self.key)
+        
+        # 클라이언트들 (요청마다 새로 만들지 않고 재사용)
+        self.search_client = AsyncSearchClient(
+            endpoint=self.endpoint,
+            index_name=self.index_name,
+            credential=self.credential,
+            **self._transport_kwargs(session)
+        )
+        self.indexer_client = AsyncSearchIndexerClient(
+            endpoint=self.endpoint,
+            credential=self.credential,
+            **self._transport_kwargs(session)
+        )
+        
+        print("✅ Azure AI Search (비동기) 초기화 완료")
+    
+    @staticmethod
+    def _transport_kwargs(session: aiohttp.ClientSession) -> Dict:
+        """공유 세션이 있으면 그 세션을 쓰는 transport (세션 종료는 소유자가 담당)"""
+        if session is None:
+            return {}
+        return {"transport": AioHttpTransport(session=session, session_owner=False)}
+    
+    async def run_indexer(self) -> bool:
+        """인덱서 수동 실행 (즉시 동기화)"""
+        try:
+            await self.indexer_client.run_indexer(self.indexer_name)
+            print(f"✅ 인덱서 실행 시작: {self.indexer_name}")
+            return True
+        except Exception as e:
+            print(f"❌ 인덱서 실행 실패: {str(e)}")
+            record_error("indexer_run")
+            return False
+    
+    async def get_indexer_status(self) -> Dict:
+        """인덱서 상태 확인"""
+        try:
+            status = await self.indexer_client.get_indexer_status(self.indexer_name)
+            return _to_indexer_status(status)
+        except Exception as e:
+            print(f"❌ 상태 조회 실패: {str(e)}")
+            record_error("indexer_status")
+            return {}
+    
+    async def hybrid_search(
+        self,
+        query: str,
+        query_vector: Optional[List[float]],
+        top: int = 5,
+        filters: Optional[Dict] = None
+    ) -> List[Dict]:
+        """하이브리드 검색 (키워드 + 벡터, 벡터가 없으면 키워드만, filters: query_filters 형식)"""
+        return await self._search(query, query_vector, top, filters)
+    
+    async def keyword_search(self, query: str, top: int = 50, filters: Optional[Dict] = None) -> List[Dict]:
+        """키워드 검색만 실행"""
+        return await self._search(query, None, top, filters)
+    
+    async def vector_search(self, query_vector: List[float], top: int = 5, filters: Optional[Dict] = None) -> List[Dict]:
+        """벡터 검색만 실행"""
+        return await self._search(None, query_vector, top, filters)
+    
+    async def get_document(self, doc_id: str) -> Optional[Dict]:
+        """
+        문서 전체 조회 (없으면 None, 그 밖의 오류는 예외 전파)
+        
+        청크 색인이면 parent_id가 같은 청크를 모두 가져와서 이어 붙인다.
+        """
+        try:
+            if self.index_mode == "chunk":
+                results = await self.search_client.search(
+                    search_text="*",
+                    filter=_chunk_filter(doc_id),
+                    select=[*DOCUMENT_FIELDS, *CHUNK_FIELDS],
+                    order_by=["chunk_index"],
+                    top=_MAX_CHUNKS_PER_DOCUMENT
+                )
+                chunks = [dict(result) async for result in results]
+                return merge_chunk_document(doc_id, chunks) if chunks else None
+            
+            result = await self.search_client.get_document(key=doc_id, selected_fields=list(DOCUMENT_FIELDS))
+            return {field: result.get(field) for field in DOCUMENT_FIELDS}
+        except ResourceNotFoundError:
+            return None
+        except Exception:
+            record_error("document")
+            raise
+    
+    async def _search(
+        self,
+        search_text: Optional[str],
+        query_vector: Optional[List[float]],
+        top: int,
+        filters: Optional[Dict] = None
+    ) -> List[Dict]:
+        try:
+            results = await self.search_client.search(
+                search_text=search_text,
+                vector_queries=_vector_queries(query_vector, top),
+                top=top,
+                **_search_options(search_text, self.index_mode == "chunk", filters)
             )
             
-            documents = []
-            for result in results:
-                documents.append({
-                    "id": result["id"],
-                    "title": result["title"],
-                    "content": result["content"],
-                    "source": result["source"],
-                    "date": result["date"],
-                    "sender": result.get("sender", ""),
-                    "score": result["@search.score"]
-                })
+            documents = [_to_document(result) async for result in results]
             
             print(f"✅ 검색 완료: {len(documents)}개 문서 발견")
             return documents
             
         except Exception as e:
             print(f"❌ 검색 실패: {str(e)}")
-            return []
\ No newline at end of file
+            record_error("search")
+            return []
+    
+    async def close(self):
+        """내부 비동기 클라이언트 정리"""
+        await self.search_client.close()
+        await self.indexer_client.close()
\ No newline at end of file
@@ -0,0 +1,173 @@
+"""
+JSON Lines 배치 Blob (KITE_BLOB_LAYOUT=jsonl)
+
+문서마다 Blob 하나({id}.json) 대신 여러 문서를 크기 제한이 있는 .jsonl Blob 하나에 묶는다.
+PUT / 목록 페이지 / 인덱서 Blob 처리 횟수가 문서 수가 아니라 배치 수에 비례한다.
+
+- 배치: jsonl/{실행 시각}-{번호}.jsonl (한 줄에 문서 하나, KITE_BLOB_BATCH_BYTES 이하)
+  인덱서는 parsing_mode=jsonLines로 줄마다 검색 문서 하나를 만든다 (데이터 소스는 jsonl/ 아래만 읽음).
+- 변경분(delta): 문서별 해시 매니페스트(manifest/jsonl-manifest.json)와 비교해서
+  새 문서 / 바뀐 문서만 새 배치 Blob으로 올린다 (인덱서는 새로 생긴 Blob만 처리).
+- 삭제: 원본에서 사라진 문서는 {"id": ..., "is_deleted": "true"} 줄(tombstone)로 올리고,
+  데이터 소스의 soft delete 정책이 인덱스에서 지운다.
+- 압축(compact): 전체 문서를 새 배치로 다시 쓰고 이전 배치를 지운다 (변경분 배치가 많이 쌓였을 때).
+
+청크 색인(KITE_INDEX_MODE=chunk)은 원본 문서 키가 Blob 경로 + 줄 번호로 정해지므로
+변경분 배치로 올린 문서는 이전 청크를 덮어쓰지 않는다 (문서 색인과 함께 쓰는 것을 권장).
+"""
+import os
+import json
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+from dotenv import load_dotenv
+from backend.service.blob_manifest import content_md5, serialize_document
+
+load_dotenv()
+
+BATCH_PREFIX = "jsonl/"
+MANIFEST_BLOB = "manifest/jsonl-manifest.json"
+JSONL_CONTENT_TYPE = "application/x-ndjson"
+
+# 인덱스에서 문서를 지울 때 쓰는 soft delete 열 / 값 (데이터 소스 삭제 감지 정책과 같게)
+SOFT_DELETE_COLUMN = "is_deleted"
+SOFT_DELETE_MARKER = "true"
+
+
+def blob_layout() -> str:
+    """KITE_BLOB_LAYOUT (document: 문서마다 Blob / jsonl: JSON Lines 배치, 알 수 없는 값이면 document)"""
+    layout = os.getenv("KITE_BLOB_LAYOUT", "document").strip().lower()
+    return layout if layout in ("document", "jsonl") else "document"
+
+
+def batch_max_bytes() -> int:
+    """KITE_BLOB_BATCH_BYTES (배치 Blob 하나의 최대 크기, 기본 4MB)"""
+    return max(int(os.getenv("KITE_BLOB_BATCH_BYTES", str(4 * 1024 * 1024))), 1024)
+
+
+def tombstone(doc_id: str) -> Dict:
+    """삭제 표시 줄"""
+    return {"id": doc_id, SOFT_DELETE_COLUMN: SOFT_DELETE_MARKER}
+
+
+def pack_lines(lines: Iterable[bytes], max_bytes: int) -> Iterator[bytes]:
+    """
+    줄들을 max_bytes 이하 배치로 묶기 (줄 하나가 max_bytes보다 크면 그 줄만 배치 하나)
+    """
+    batch: List[bytes] = []
+    size = 0
+    for line in lines:
+        if batch and size + len(line) + 1 > max_bytes:
+            yield b"\n".join(batch) + b"\n"
+            batch, size = [], 0
+        batch.append(line)
+        size += len(line) + 1
+    if batch:
+        yield b"\n".join(batch) + b"\n"
+
+
+def _run_id() -> str:
+    """배치 이름 접두어 (UTC 시각, 이름 순서 = 올린 순서)"""
+    return datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+
+
+def load_manifest(blob_service) -> Dict[str, str]:
+    """{문서 ID: 줄 MD5 hex} (처음이면 빈 딕셔너리)"""
+    data = blob_service.download_bytes(MANIFEST_BLOB)
+    return json.loads(data) if data else {}
+
+
+def sync_batches(
+    blob_service,
+    documents: Iterable[Dict],
+    delete_missing: bool = False,
+    compact: bool = False,
+    max_concurrency: int = None,
+    on_progress: Optional[Callable[[Dict], None]] = None
+) -> Dict:
+    """
+    원본 문서를 JSON Lines 배치 Blob으로 동기화
+    
+    매니페스트와 해시가 다른 문서(+ delete_missing이면 사라진 문서의 tombstone)만
+    이번 실행의 배치 Blob들에 담아 올린다. 배치가 하나라도 실패하면 매니페스트를 갱신하지 않으므로
+    다음 실행에서 같은 변경분을 다시 올린다 (같은 문서를 다시 색인해도 결과는 같음).
+    
+    Args:
+        blob_service: AzureBlobService / LocalBlobService
+        documents: 원본 문서 전체 (이터러블)
+        delete_missing: 원본에 없는 문서를 인덱스에서 삭제 (tombstone)
+        compact: 바뀌지 않은 문서까지 모두 새 배치로 다시 쓰고 이전 배치 Blob 삭제
+    
+    Returns:
+        {"documents", "changed", "unchanged", "deleted", "batches", "failed", "removed_batches", ...} 개수
+    """
+    manifest = load_manifest(blob_service)
+    previous_batches = blob_service.list_blobs(prefix=BATCH_PREFIX) if compact else []
+    updated: Dict[str, str] = {}
+    counts = {"documents": 0, "changed": 0, "unchanged": 0, "deleted": 0}
+    
+    def lines() -> Iterator[bytes]:
+        for document in documents:
+            counts["documents"] += 1
+            line = serialize_document(document)
+            digest = content_md5(line).hex()
+            updated[document["id"]] = digest
+            if not compact and manifest.get(document["id"]) == digest:
+                counts["unchanged"] += 1
+                continue
+            counts["changed"] += 1
+            yield line
+        
+        for doc_id in sorted(set(manifest) - set(updated)):
+            if delete_missing:
+                counts["deleted"] += 1
+                yield serialize_document(tombstone(doc_id))
+            else:
+                updated[doc_id] = manifest[doc_id]
+    
+    run_id = _run_id()
+    batches = (
+        (f"{BATCH_PREFIX}{run_id}-{number:05d}.jsonl", data)
+        for number, data in enumerate(pack_lines(lines(), batch_max_bytes()))
+    )
+    progress = blob_service.upload_blobs(
+        batches,
+        max_concurrency=max_concurrency,
+        on_progress=on_progress,
+        content_type=JSONL_CONTENT_TYPE
+    )
+    
+    removed = 0
+    if progress["failed"] == 0 and updated != manifest:
+        blob_service.upload_blobs(
+            [(MANIFEST_BLOB, json.dumps(updated, separators=(",", ":")).encode("utf-8"))],
+            content_type="application/json"
+        )
+    if progress["failed"] == 0 and compact and previous_batches:
+        removed = blob_service.delete_blobs(previous_batches)
+    
+    return {
+        **counts,
+        "batches": progress["succeeded"],
+        "failed": progress["failed"],
+        "bytes": progress["bytes"],
+        "removed_batches": removed
+    }
+
+
+def read_batches(blob_service) -> List[Dict]:
+    """
+    배치 Blob을 올린 순서대로 읽어서 현재 문서 목록 복원 (로컬 검색용)
+    
+    같은 ID는 나중 줄이 이기고, tombstone이면 지운다 (인덱서가 하는 일과 같음).
+    """
+    documents: Dict[str, Dict] = {}
+    for name in blob_service.list_blobs(prefix=BATCH_PREFIX):
+        for line in (blob_service.download_bytes(name) or b"").splitlines():
+            if not line.strip():
+                continue
+            document = json.loads(line)
+            if str(document.get(SOFT_DELETE_COLUMN)).lower() == SOFT_DELETE_MARKER:
+                documents.pop(document["id"], None)
+            else:
+                documents[document["id"]] = document
+    return list(documents.values())
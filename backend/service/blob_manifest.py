@@ -0,0 +1,78 @@
+"""
+Blob 증분 동기화 (콘텐츠 해시 매니페스트)
+
+문서마다 업로드할 JSON 바이트의 MD5를 Blob의 Content-MD5로 같이 저장해 두고,
+다음 업로드 때 list_blobs 한 번으로 {Blob 이름: MD5} 매니페스트를 만들어 비교한다.
+- 새 문서 / 내용이 바뀐 문서만 업로드 (안 바뀐 Blob은 last-modified가 그대로라 인덱서도 건너뜀)
+- delete_missing이면 원본에 없는 Blob 삭제
+
+매니페스트를 Blob 속성에 두므로 로컬 파일과 컨테이너가 어긋날 일이 없다.
+"""
+import json
+import hashlib
+from typing import Callable, Dict, Iterable, Iterator, Optional
+
+
+def blob_name(document: Dict) -> str:
+    """문서 Blob 이름 ({id}.json)"""
+    return f"{document['id']}.json"
+
+
+def serialize_document(document: Dict) -> bytes:
+    """업로드용 JSON (공백 없는 UTF-8, 들여쓰기한 JSON보다 작고 빠름)"""
+    return json.dumps(document, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def content_md5(data: bytes) -> bytes:
+    """Content-MD5 값 (16바이트 digest)"""
+    return hashlib.md5(data).digest()
+
+
+def sync_documents(
+    blob_service,
+    documents: Iterable[Dict],
+    delete_missing: bool = False,
+    max_concurrency: int = None,
+    on_progress: Optional[Callable[[Dict], None]] = None
+) -> Dict:
+    """
+    바뀐 문서만 업로드 (+ 선택적으로 원본에 없는 Blob 삭제)
+    
+    Args:
+        blob_service: AzureBlobService / LocalBlobService
+        documents: 원본 문서 전체 (이터러블)
+        delete_missing: 원본에 없는 Blob 삭제 여부
+    
+    Returns:
+        {"uploaded", "unchanged", "failed", "deleted", "stale"} 개수
+    """
+    remote_hashes = blob_service.blob_hashes()
+    seen = set()
+    result = {}
+    
+    def track(items: Iterable[Dict]) -> Iterator[Dict]:
+        for document in items:
+            seen.add(blob_name(document))
+            yield document
+    
+    def report(progress: Dict):
+        result.update(progress)
+        if on_progress:
+            on_progress(progress)
+    
+    uploaded = blob_service.upload_documents(
+        track(documents),
+        max_concurrency=max_concurrency,
+        on_progress=report,
+        remote_hashes=remote_hashes
+    )
+    
+    stale = sorted(set(remote_hashes) - seen)
+    deleted = blob_service.delete_blobs(stale) if delete_missing and stale else 0
+    return {
+        "uploaded": uploaded,
+        "unchanged": result.get("skipped", 0),
+        "failed": result.get("failed", 0),
+        "deleted": deleted,
+        "stale": len(stale)
+    }
@@ -0,0 +1,303 @@
+"""
+BM25 역색인 (키워드 검색)
+한국어 조사 제거 + 글자 bigram 토큰화, 배열 기반 posting, MaxScore 방식 조기 종료
+"""
+import re
+import sys
+import math
+import heapq
+import threading
+import unicodedata
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+
+_TOKEN_PATTERN = re.compile(r"[가-힣]+|[a-z0-9]+(?:[._-][a-z0-9]+)*")
+
+# 체언 뒤에 붙는 조사 / 어미 (긴 것부터 검사)
+KOREAN_PARTICLES = sorted([
+    "에서부터", "으로부터", "에서는", "에게서", "한테서", "까지는", "부터는", "이라고", "라고",
+    "에서", "에게", "한테", "께서", "으로", "까지", "부터", "마다", "처럼", "보다", "이랑", "하고",
+    "이나", "이며", "이고", "에는", "에도", "와는", "과는", "로는", "으론", "이야", "이지", "인가",
+    "은", "는", "이", "가", "을", "를", "의", "에", "도", "로", "와", "과", "만", "랑", "야", "요"
+], key=len, reverse=True)
+_PARTICLE_SET = set(KOREAN_PARTICLES)
+
+
+def strip_particle(word: str) -> str:
+    """
+    한국어 단어 끝의 조사 제거
+    
+    어간이 최소 2글자 남을 때만 제거한다 ("프로젝트에서" → "프로젝트", "회의" → "회의").
+    """
+    for particle in KOREAN_PARTICLES:
+        if word.endswith(particle) and len(word) - len(particle) >= 2:
+            return word[:-len(particle)]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    검색용 토큰화
+    
+    - 유니코드 정규화(NFKC) + 소문자
+    - 영문 / 숫자: 단어 그대로 ("chub", "redis")
+    - 한글: 조사를 뗀 어간 + 어간의 글자 bigram
+      예: "CHUB 프로젝트에서" → ["chub", "프로젝트", "#프로", "#로젝", "#젝트"]
+      (bigram은 "#" 접두어로 어간 토큰과 구분 → 조사 제거가 틀려도 부분 일치)
+    - 영문 뒤에 붙은 조사("DBA는" → "dba", "는")는 따로 떨어지므로 버림
+    """
+    text = unicodedata.normalize("NFKC", text).lower()
+    tokens = []
+    for word in _TOKEN_PATTERN.findall(text):
+        if "가" <= word[0] <= "힣":
+            if word in _PARTICLE_SET:
+                continue
+            stem = strip_particle(word)
+            tokens.append(stem)
+            if len(stem) > 2:
+                tokens.extend("#" + stem[i:i + 2] for i in range(len(stem) - 1))
+        else:
+            tokens.append(word)
+    return tokens
+
+
+class BM25Index:
+    """
+    메모리 BM25 역색인
+    
+    - posting: 용어마다 문서 번호 / 빈도를 array('I') / array('H') 두 개에 저장 (문서 번호 오름차순)
+    - 점수 계산: 용어 단위(term-at-a-time)로 numpy 벡터 연산
+    - 조기 종료(MaxScore): 용어별 점수 상한을 미리 계산해두고, 현재 k번째 점수가
+      남은 용어 상한의 합보다 크면 새 후보를 만들지 않고 기존 후보만 갱신,
+      k번째와 k+1번째 차이가 남은 상한보다 크면 즉시 종료
+    - 삭제: 문서를 비활성 표시하고, 비활성 비율이 compact_ratio를 넘으면 posting 재구성
+      df(용어별 문서 수)는 살아 있는 문서만 세도록 따로 관리하므로 압축 전에도 점수가 정확하다
+      (문서마다 고유 용어 목록을 들고 있다가 삭제 / 교체할 때 df를 줄임)
+    - 같은 ID로 다시 추가하면 기존 문서를 삭제하고 추가 (upsert)
+    """
+    
+    def __init__(self, k1: float = 1.2, b: float = 0.75, compact_ratio: float = 0.25):
+        self.k1 = k1
+        self.b = b
+        self.compact_ratio = compact_ratio
+        
+        self._lock = threading.RLock()
+        self._reset()
+    
+    def _reset(self):
+        self._doc_ids: List[Optional[str]] = []
+        self._numbers: Dict[str, int] = {}
+        self._doc_lengths = array("I")
+        self._alive = array("B")
+        self._postings: Dict[str, Tuple[array, array]] = {}
+        self._max_tf: Dict[str, int] = {}
+        self._df: Dict[str, int] = {}
+        self._doc_terms: List[Optional[Tuple[str, ...]]] = []
+        self._total_length = 0
+        self._deleted = 0
+    
+    def __len__(self) -> int:
+        return len(self._numbers)
+    
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._numbers
+    
+    def add(self, doc_id: str, text: str):
+        """문서 추가 (이미 있으면 교체)"""
+        self.add_many([(doc_id, text)])
+    
+    def add_many(self, items: Iterable[Tuple[str, str]]):
+        """여러 문서 추가 [(문서 ID, 텍스트)]"""
+        with self._lock:
+            for doc_id, text in items:
+                if doc_id in self._numbers:
+                    self._delete_one(doc_id)
+                
+                tokens = tokenize(text)
+                number = len(self._doc_ids)
+                self._doc_ids.append(doc_id)
+                self._numbers[doc_id] = number
+                self._doc_lengths.append(len(tokens))
+                self._alive.append(1)
+                self._total_length += len(tokens)
+                
+                counts: Dict[str, int] = {}
+                for token in tokens:
+                    counts[token] = counts.get(token, 0) + 1
+                self._doc_terms.append(tuple(sys.intern(token) for token in counts))
+                for token, tf in counts.items():
+                    self._df[token] = self._df.get(token, 0) + 1
+                    postings = self._postings.get(token)
+                    if postings is None:
+                        postings = self._postings[token] = (array("I"), array("H"))
+                    postings[0].append(number)
+                    postings[1].append(min(tf, 65535))
+                    if tf > self._max_tf.get(token, 0):
+                        self._max_tf[token] = tf
+            
+            self._maybe_compact()
+    
+    def delete(self, ids: Iterable[str]) -> int:
+        """
+        문서 삭제 (없는 ID는 무시)
+        
+        Returns:
+            삭제된 개수
+        """
+        with self._lock:
+            deleted = sum(1 for doc_id in ids if self._delete_one(doc_id))
+            self._maybe_compact()
+        return deleted
+    
+    def _delete_one(self, doc_id: str) -> bool:
+        number = self._numbers.pop(doc_id, None)
+        if number is None:
+            return False
+        self._alive[number] = 0
+        self._total_length -= self._doc_lengths[number]
+        for token in self._doc_terms[number]:
+            self._df[token] -= 1
+        self._doc_terms[number] = None
+        self._deleted += 1
+        return True
+    
+    def _maybe_compact(self):
+        """비활성 문서가 많으면 살아 있는 문서만으로 posting 재구성"""
+        if not self._deleted or self._deleted < self.compact_ratio * len(self._doc_ids):
+            return
+        
+        # 번호 재배정표 (삭제된 문서 → -1)
+        alive = np.frombuffer(self._alive, dtype=np.uint8).astype(bool)
+        remap = np.full(len(self._doc_ids), -1, dtype=np.int64)
+        remap[alive] = np.arange(int(alive.sum()))
+        
+        postings, max_tf = {}, {}
+        for token, (numbers, tfs) in self._postings.items():
+            numbers = remap[np.frombuffer(numbers, dtype=np.uint32)]
+            keep = numbers >= 0
+            if not keep.any():
+                continue
+            kept_tfs = np.frombuffer(tfs, dtype=np.uint16)[keep]
+            postings[token] = (array("I", numbers[keep].astype(np.uint32).tobytes()),
+                               array("H", kept_tfs.tobytes()))
+            max_tf[token] = int(kept_tfs.max())
+        
+        doc_ids = [doc_id for doc_id, flag in zip(self._doc_ids, alive) if flag]
+        self._doc_terms = [terms for terms, flag in zip(self._doc_terms, alive) if flag]
+        self._df = {token: df for token, df in self._df.items() if df > 0}
+        doc_lengths = array("I", np.frombuffer(self._doc_lengths, dtype=np.uint32)[alive].tobytes())
+        
+        self._doc_ids = doc_ids
+        self._numbers = {doc_id: i for i, doc_id in enumerate(doc_ids)}
+        self._doc_lengths = doc_lengths
+        self._alive = array("B", [1]) * len(doc_ids)
+        self._postings, self._max_tf = postings, max_tf
+        self._deleted = 0
+    
+    def _idf(self, token: str) -> float:
+        # 살아 있는 문서 기준 (삭제 표시된 문서의 posting은 df에서 이미 빠짐)
+        n = max(len(self._numbers), 1)
+        df = self._df[token]
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+    
+    def search(self, query: str, k: int = 10, allowed: Optional[Iterable[str]] = None) -> List[Tuple[str, float]]:
+        """
+        BM25 top-k
+        
+        allowed를 넘기면 그 문서들 안에서만 검색한다 (필터 조건에 맞는 후보, pre-filter).
+        
+        Returns:
+            [(문서 ID, 점수)] (점수 내림차순, 점수 0인 문서 제외)
+        """
+        with self._lock:
+            if not self._numbers or k <= 0:
+                return []
+            
+            # 살아 있는 문서에 없는 용어는 점수에 기여하지 않음
+            tokens = [token for token in dict.fromkeys(tokenize(query)) if self._df.get(token)]
+            if not tokens:
+                return []
+            
+            k1, b = self.k1, self.b
+            doc_lengths = np.frombuffer(self._doc_lengths, dtype=np.uint32)
+            avg_length = self._total_length / len(self._numbers) or 1.0
+            min_norm = k1 * (1 - b + b * (doc_lengths.min() if len(doc_lengths) else 0) / avg_length)
+            
+            # 용어별 점수 상한 (가장 높은 tf + 가장 짧은 문서 기준), 상한 큰 순서로 처리
+            terms = []
+            for token in tokens:
+                idf = self._idf(token)
+                max_tf = self._max_tf[token]
+                upper = idf * max_tf * (k1 + 1) / (max_tf + min_norm)
+                terms.append((upper, idf, token))
+            terms.sort(reverse=True)
+            remaining = [sum(upper for upper, _, _ in terms[i:]) for i in range(len(terms) + 1)]
+            
+            scores = np.zeros(len(self._doc_ids), dtype=np.float32)
+            seen = np.zeros(len(self._doc_ids), dtype=bool)
+            alive = np.frombuffer(self._alive, dtype=np.uint8).astype(bool)
+            if allowed is not None:
+                permitted = np.zeros(len(self._doc_ids), dtype=bool)
+                permitted[[self._numbers[doc_id] for doc_id in allowed if doc_id in self._numbers]] = True
+                alive &= permitted
+            candidates = None
+            
+            for i, (upper, idf, token) in enumerate(terms):
+                numbers, tfs = self._postings[token]
+                numbers = np.frombuffer(numbers, dtype=np.uint32)
+                tfs = np.frombuffer(tfs, dtype=np.uint16).astype(np.float32)
+                
+                if candidates is not None:
+                    # 새 후보를 만들 수 없는 단계: 기존 후보에 해당하는 posting만 계산
+                    mask = seen[numbers]
+                    numbers, tfs = numbers[mask], tfs[mask]
+                
+                norm = k1 * (1 - b + b * doc_lengths[numbers] / avg_length)
+                scores[numbers] += idf * tfs * (k1 + 1) / (tfs + norm)
+                seen[numbers] = True
+                
+                live = np.flatnonzero(seen & alive)
+                if len(live) <= k:
+                    continue
+                top = np.partition(scores[live], len(live) - k - 1)[len(live) - k - 1:]
+                kth, next_best = np.partition(top, 1)[1], top.min()
+                
+                # k번째 점수보다 남은 상한 합이 작으면 처음 보는 문서는 top-k에 들 수 없음
+                if candidates is None and kth >= remaining[i + 1]:
+                    candidates = live
+                # k번째와 k+1번째 차이가 남은 상한 합보다 크면 top-k 구성이 바뀌지 않음
+                # → 남은 용어는 top-k 문서의 점수(순서)만 마저 계산
+                if kth - next_best > remaining[i + 1]:
+                    in_top = np.zeros(len(self._doc_ids), dtype=bool)
+                    in_top[live[scores[live] >= kth]] = True
+                    for _, rest_idf, rest_token in terms[i + 1:]:
+                        numbers, tfs = self._postings[rest_token]
+                        numbers = np.frombuffer(numbers, dtype=np.uint32)
+                        mask = in_top[numbers]
+                        numbers = numbers[mask]
+                        tfs = np.frombuffer(tfs, dtype=np.uint16)[mask].astype(np.float32)
+                        norm = k1 * (1 - b + b * doc_lengths[numbers] / avg_length)
+                        scores[numbers] += rest_idf * tfs * (k1 + 1) / (tfs + norm)
+                    break
+            
+            live = np.flatnonzero(seen & alive)
+            if len(live) > k:
+                live = live[np.argpartition(scores[live], len(live) - k)[len(live) - k:]]
+            # 동점이면 먼저 추가된 문서 우선
+            ranked = heapq.nlargest(k, live.tolist(), key=lambda n: (scores[n], -n))
+            return [(self._doc_ids[n], float(scores[n])) for n in ranked if scores[n] > 0]
+    
+    def stats(self) -> Dict:
+        """인덱스 상태"""
+        return {
+            "documents": len(self._numbers),
+            "deleted_pending": self._deleted,
+            "terms": len(self._postings),
+            "postings": sum(len(numbers) for numbers, _ in self._postings.values()),
+            "postings_bytes": sum(
+                numbers.itemsize * len(numbers) + tfs.itemsize * len(tfs)
+                for numbers, tfs in self._postings.values()
+            ),
+            "avg_length": round(self._total_length / len(self._numbers), 2) if self._numbers else 0.0
+        }
@@ -0,0 +1,230 @@
+"""
+문서 청크 분할 / passage 묶기
+긴 문서를 섹션 → 문장 단위로 나눠 겹침(overlap)이 있는 청크로 만들고,
+검색된 청크를 원본 문서별로 다시 묶는다.
+
+KITE_INDEX_MODE=chunk 로 선택 (기본값 document: 문서 전체를 벡터 하나로 색인).
+"""
+import os
+import re
+from typing import Dict, List, Tuple
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# 청크 최대 길이 / 이전 청크와 겹치는 길이 (글자 수)
+CHUNK_SIZE = int(os.getenv("KITE_CHUNK_SIZE", "500"))
+CHUNK_OVERLAP = int(os.getenv("KITE_CHUNK_OVERLAP", "80"))
+
+# 검색 시 문서 하나당 가져올 청크 후보 수 (top 문서 × 이 값만큼 청크 검색)
+CHUNK_CANDIDATES_PER_DOCUMENT = 3
+
+# 문서 하나에 남길 passage 최대 개수
+PASSAGES_PER_DOCUMENT = int(os.getenv("KITE_PASSAGES_PER_DOCUMENT", "2"))
+
+# 청크 색인 / 검색 결과에 추가되는 필드
+CHUNK_FIELDS = ("parent_id", "chunk_index")
+
+# 인접 청크 겹침으로 보는 최소 길이 (글자 수)
+_MIN_OVERLAP_CHARS = 20
+
+# 빈 줄 = 섹션 경계, 구분선(---) / 마크다운 제목 / "[제목]"만 있는 줄 = 새 섹션 시작
+_SECTION_BREAK = re.compile(r"\n[ \t]*\n")
+_HEADING = re.compile(r"^(?:#{1,6}\s+\S.*|\[[^\]]+\]|[-=_]{3,})$")
+_SENTENCE_END = re.compile(r"(?<=[.!?。])\s+")
+
+
+def index_mode() -> str:
+    """KITE_INDEX_MODE (document / chunk, 알 수 없는 값이면 document)"""
+    mode = os.getenv("KITE_INDEX_MODE", "document").strip().lower()
+    return mode if mode in ("document", "chunk") else "document"
+
+
+def _sections(text: str) -> List[List[str]]:
+    """텍스트를 섹션(줄 목록)으로 분리"""
+    sections = []
+    for block in _SECTION_BREAK.split(text):
+        lines = [line.rstrip() for line in block.splitlines() if line.strip()]
+        current = []
+        for line in lines:
+            if _HEADING.match(line.strip()) and current:
+                sections.append(current)
+                current = []
+            current.append(line)
+        if current:
+            sections.append(current)
+    return sections
+
+
+def _units(text: str, size: int, overlap: int) -> List[Tuple[int, str, str]]:
+    """
+    청크를 만드는 최소 단위 목록 [(섹션 번호, 앞 구분자, 텍스트)]
+    
+    한 줄 = 한 단위 (채팅 메시지 / 목록 항목), 긴 줄은 문장으로,
+    그래도 size보다 긴 문장은 글자 단위로 (overlap만큼 겹치게) 자른다.
+    """
+    units = []
+    step = max(size - overlap, 1)
+    for section_no, lines in enumerate(_sections(text)):
+        for line_no, line in enumerate(lines):
+            sentences = [line] if len(line) <= size else _SENTENCE_END.split(line)
+            for sentence_no, sentence in enumerate(sentences):
+                separator = " " if sentence_no else ("\n" if line_no else "\n\n")
+                pieces = [sentence[i:i + size] for i in range(0, max(len(sentence) - overlap, 1), step)]
+                for piece_no, piece in enumerate(pieces):
+                    units.append((section_no, "" if piece_no else separator, piece))
+    return units
+
+
+def _join(units: List[Tuple[int, str, str]]) -> str:
+    return "".join(
+        (separator if i else "") + text for i, (_, separator, text) in enumerate(units)
+    ).strip()
+
+
+def chunk_text(text: str, size: int = CHUNK_SIZE, overlap: int = CHUNK_OVERLAP) -> List[str]:
+    """
+    섹션 / 문장 경계를 지키는 청크 분할
+    
+    - 단위(줄 / 문장)를 size 글자까지 이어 붙인다 (단위 중간에서 자르지 않음)
+    - 새 섹션은 새 청크에서 시작 (현재 청크가 size의 절반도 안 차면 이어 붙임)
+    - 같은 섹션 안에서 청크가 넘어가면 직전 청크의 마지막 단위들을 overlap 글자까지 다시 포함
+    """
+    chunks = []
+    current: List[Tuple[int, str, str]] = []
+    length = 0
+    
+    for unit in _units(text or "", size, overlap):
+        section_no, separator, piece = unit
+        added = len(separator) + len(piece) if current else len(piece)
+        new_section = bool(current) and section_no != current[-1][0]
+        
+        if current and (length + added > size or (new_section and length >= size // 2)):
+            chunks.append(_join(current))
+            # 같은 섹션이면 뒤쪽 단위를 overlap 글자까지 이어받음
+            carried, carried_length = [], 0
+            if not new_section:
+                for previous in reversed(current):
+                    if carried_length + len(previous[2]) > overlap:
+                        break
+                    carried.insert(0, previous)
+                    carried_length += len(previous[1]) + len(previous[2])
+            current, length = carried, carried_length
+            added = len(separator) + len(piece) if current else len(piece)
+        
+        current.append(unit)
+        length += added
+    
+    if current:
+        chunks.append(_join(current))
+    return chunks
+
+
+def attach_chunks(document: Dict, size: int = CHUNK_SIZE, overlap: int = CHUNK_OVERLAP) -> Dict:
+    """
+    업로드용 문서에 청크 목록 추가 (인덱서가 청크별로 임베딩 / 색인)
+    
+    {"chunks": [{"chunk_index": 0, "content": "..."}, ...]}
+    """
+    chunks = chunk_text(document.get("content", ""), size, overlap)
+    return {
+        **document,
+        "chunks": [{"chunk_index": i, "content": content} for i, content in enumerate(chunks)]
+    }
+
+
+def chunk_documents(document: Dict) -> List[Dict]:
+    """
+    문서 하나를 청크 문서 목록으로 변환 (로컬 색인용)
+    
+    업로드 시 만든 chunks가 있으면 그대로 쓰고, 없으면 여기서 분할한다.
+    청크 ID는 "{문서 ID}_chunk{번호}", parent_id로 원본 문서를 가리킨다.
+    """
+    chunks = document.get("chunks") or attach_chunks(document)["chunks"]
+    return [
+        {
+            "id": f"{document['id']}_chunk{chunk['chunk_index']}",
+            "parent_id": document["id"],
+            "chunk_index": chunk["chunk_index"],
+            "title": document.get("title"),
+            "content": chunk["content"],
+            "source": document.get("source"),
+            "date": document.get("date"),
+            "sender": document.get("sender")
+        }
+        for chunk in chunks
+    ]
+
+
+def group_passages(
+    chunks: List[Dict],
+    top: int,
+    passages_per_document: int = PASSAGES_PER_DOCUMENT
+) -> List[Dict]:
+    """
+    검색된 청크를 원본 문서별로 묶기
+    
+    문서 순서는 가장 좋은 청크의 순서, score도 가장 좋은 청크의 점수를 쓴다.
+    passages는 관련도 순, content는 passage를 문서 안 순서대로 이어 붙인 것.
+    
+    Returns:
+        문서 딕셔너리 목록 (id = parent_id, passages 필드 추가)
+    """
+    documents: Dict[str, Dict] = {}
+    for chunk in chunks:
+        parent_id = chunk.get("parent_id") or chunk["id"]
+        document = documents.get(parent_id)
+        if document is None:
+            if len(documents) >= top:
+                continue
+            document = documents[parent_id] = {
+                **{key: value for key, value in chunk.items() if key not in CHUNK_FIELDS},
+                "id": parent_id,
+                "passages": []
+            }
+        if len(document["passages"]) < passages_per_document:
+            document["passages"].append({
+                "chunk_index": chunk.get("chunk_index", 0),
+                "content": chunk["content"],
+                "score": chunk.get("score")
+            })
+    
+    for document in documents.values():
+        in_order = sorted(document["passages"], key=lambda passage: passage["chunk_index"])
+        document["content"] = "\n\n".join(passage["content"] for passage in in_order)
+    return list(documents.values())
+
+
+def overlap_length(before: str, after: str) -> int:
+    """before의 끝과 after의 앞이 겹치는 길이 (청크 overlap, _MIN_OVERLAP_CHARS보다 짧으면 0)"""
+    for size in range(min(len(before), len(after)), _MIN_OVERLAP_CHARS - 1, -1):
+        if before.endswith(after[:size]):
+            return size
+    return 0
+
+
+def merge_chunks(chunks: List[Dict]) -> str:
+    """청크들을 순서대로 이어 붙여 원문 복원 (겹치는 부분은 한 번만)"""
+    text = ""
+    for chunk in sorted(chunks, key=lambda chunk: chunk.get("chunk_index") or 0):
+        content = chunk.get("content") or ""
+        overlap = overlap_length(text, content) if text else 0
+        if overlap:
+            # 겹친 뒤의 나머지는 원래 구분자(줄바꿈 / 공백)부터 시작
+            text += content[overlap:]
+        else:
+            text += ("\n\n" if text else "") + content
+    return text
+
+
+def merge_chunk_document(parent_id: str, chunks: List[Dict]) -> Dict:
+    """같은 문서의 청크들로 원본 문서 딕셔너리 복원 (GET /documents/{id}용)"""
+    first = chunks[0]
+    return {
+        "id": parent_id,
+        "title": first.get("title"),
+        "content": merge_chunks(chunks),
+        "source": first.get("source"),
+        "date": first.get("date"),
+        "sender": first.get("sender")
+    }
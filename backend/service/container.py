@@ -0,0 +1,116 @@
+"""
+서비스 컨테이너
+FastAPI lifespan에서 한 번 생성해서 모든 라우트 / 서비스가 공유하는 클라이언트 묶음
+"""
+import os
+from typing import Optional
+import aiohttp
+import httpx
+from openai import AsyncAzureOpenAI
+from dotenv import load_dotenv
+
+from backend.service.azure_search import AsyncAzureSearchService
+from backend.service.embedding_cache import EmbeddingCache
+from backend.service.local_backend import AsyncLocalOpenAI, use_local_backend
+from backend.service.local_search import AsyncLocalSearchService, use_local_search
+from backend.service.query_cache import QueryResultCache, SemanticCache
+from backend.service.rag_service import AsyncRAGService
+from backend.service.single_flight import SingleFlight
+
+load_dotenv()
+
+
+def create_search_service(session: aiohttp.ClientSession):
+    """검색 서비스 생성 (KITE_SEARCH_BACKEND=local이면 프로세스 내 검색)"""
+    if use_local_search():
+        return AsyncLocalSearchService()
+    return AsyncAzureSearchService(session=session)
+
+
+def create_openai_client(http_client: httpx.AsyncClient):
+    """OpenAI 클라이언트 생성 (KITE_BACKEND=local이면 가짜 모델)"""
+    if use_local_backend():
+        return AsyncLocalOpenAI()
+    return AsyncAzureOpenAI(
+        api_key=os.getenv("AZURE_OPENAI_API_KEY"),
+        api_version=os.getenv("AZURE_OPENAI_API_VERSION"),
+        azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
+        http_client=http_client
+    )
+
+
+class ServiceContainer:
+    """
+    앱 전체 공유 서비스
+    
+    - 업스트림마다 keep-alive 커넥션 풀 하나
+      (Azure OpenAI: httpx.AsyncClient, Azure AI Search: aiohttp.ClientSession)
+    - 풀 크기는 KITE_HTTP_MAX_CONNECTIONS / KITE_HTTP_MAX_KEEPALIVE 로 조정
+    - 캐시 / single-flight도 여기서 하나씩만 생성
+    
+    aiohttp 세션은 이벤트 루프 안에서 만들어야 하므로 lifespan 안에서 생성한다.
+    KITE_BACKEND=local이면 검색 / OpenAI 대신 로컬 백엔드를 사용한다 (local_backend.py).
+    KITE_SEARCH_BACKEND=local이면 검색만 프로세스 안에서 처리한다 (local_search.py).
+    """
+    
+    def __init__(self):
+        max_connections = int(os.getenv("KITE_HTTP_MAX_CONNECTIONS", "100"))
+        max_keepalive = int(os.getenv("KITE_HTTP_MAX_KEEPALIVE", "20"))
+        keepalive_expiry = float(os.getenv("KITE_HTTP_KEEPALIVE_EXPIRY", "30"))
+        timeout = float(os.getenv("KITE_HTTP_TIMEOUT", "60"))
+        
+        # Azure OpenAI 커넥션 풀
+        self.openai_http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive,
+                keepalive_expiry=keepalive_expiry
+            ),
+            timeout=httpx.Timeout(timeout, connect=10.0)
+        )
+        
+        # Azure AI Search 커넥션 풀 (azure-core AioHttpTransport 기본 설정과 동일하게
+        # 쿠키 미사용 / 압축 해제는 azure-core가 처리)
+        self.search_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=max_connections,
+                keepalive_timeout=keepalive_expiry
+            ),
+            cookie_jar=aiohttp.DummyCookieJar(),
+            auto_decompress=False,
+            trust_env=True
+        )
+        
+        # 캐시 / 요청 합치기
+        self.query_cache = QueryResultCache()
+        self.semantic_cache = SemanticCache()
+        self.embedding_cache = EmbeddingCache()
+        self.single_flight = SingleFlight()
+        
+        # 검색 / RAG 서비스 (설정 누락 등으로 실패하면 None → 라우트에서 오류 응답)
+        self.search_service: Optional[AsyncAzureSearchService] = None
+        self.rag_service: Optional[AsyncRAGService] = None
+        try:
+            self.search_service = create_search_service(self.search_session)
+            self.rag_service = AsyncRAGService(
+                search_service=self.search_service,
+                semantic_cache=self.semantic_cache if self.semantic_cache.enabled else None,
+                embedding_cache=self.embedding_cache,
+                openai_client=create_openai_client(self.openai_http_client)
+            )
+            print("✅ RAG 서비스 초기화 완료")
+        except Exception as e:
+            print(f"⚠️ RAG 서비스 초기화 실패: {str(e)}")
+            self.search_service = None
+            self.rag_service = None
+    
+    async def close(self):
+        """커넥션 풀 / 캐시 정리"""
+        if self.rag_service:
+            await self.rag_service.close()
+        elif self.search_service:
+            await self.search_service.close()
+        
+        await self.openai_http_client.aclose()
+        await self.search_session.close()
+        self.embedding_cache.close()
@@ -0,0 +1,218 @@
+"""
+프롬프트 컨텍스트 패킹
+검색된 문서 / passage를 관련도 순으로 토큰 예산 안에 채워 넣는다.
+
+- 토큰 수: tiktoken (KITE_TOKENIZER_ENCODING, 기본 cl100k_base = gpt-4)
+  인코딩을 불러올 수 없으면(오프라인 등) 글자 수 기반 추정으로 대체
+- 중복 제거: 같은 내용 / 이미 넣은 내용에 포함된 passage는 건너뛰고,
+  같은 문서의 인접 청크끼리 겹치는 부분(overlap)은 잘라냄
+- 예산: KITE_SUMMARY_CONTEXT_TOKENS / KITE_ACTION_ITEMS_CONTEXT_TOKENS
+"""
+import os
+import re
+import math
+from typing import Callable, Dict, List, Optional
+from dotenv import load_dotenv
+
+from backend.service.chunking import overlap_length
+from backend.service.metrics import record_prompt_tokens
+
+load_dotenv()
+
+# 프롬프트별 컨텍스트 토큰 예산
+SUMMARY_CONTEXT_TOKENS = int(os.getenv("KITE_SUMMARY_CONTEXT_TOKENS", "1500"))
+ACTION_ITEMS_CONTEXT_TOKENS = int(os.getenv("KITE_ACTION_ITEMS_CONTEXT_TOKENS", "600"))
+
+# 같은 문서에서 고른 passage 사이 구분자 (문서 사이 구분자는 pack_context의 separator)
+PASSAGE_SEPARATOR = "\n\n"
+
+# 남은 예산이 이보다 작으면 잘라서라도 넣지 않음 (너무 짧은 조각은 도움이 안 됨)
+MIN_FRAGMENT_TOKENS = 48
+
+_HANGUL_OR_CJK = re.compile(r"[ᄀ-ᇿ぀-ヿ㄰-㆏一-鿿가-힣]")
+_WHITESPACE = re.compile(r"\s+")
+
+_encoding = None
+_encoding_loaded = False
+
+
+def _get_encoding():
+    """tiktoken 인코딩 (처음 한 번만 로드, 실패하면 None)"""
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        _encoding_loaded = True
+        name = os.getenv("KITE_TOKENIZER_ENCODING", "cl100k_base")
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding(name)
+        except Exception as e:
+            print(f"⚠️ tiktoken 인코딩 로드 실패 ({name}), 글자 수로 토큰 추정: {str(e)[:100]}")
+            _encoding = None
+    return _encoding
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    토큰 수 추정 (tiktoken이 없을 때)
+    
+    한글 / 한자 / 가나는 글자당 1토큰, 나머지는 4글자당 1토큰 (cl100k_base 기준 약간 넉넉하게)
+    """
+    wide = len(_HANGUL_OR_CJK.findall(text))
+    return wide + math.ceil((len(text) - wide) / 4)
+
+
+def count_tokens(text: str) -> int:
+    """텍스트 토큰 수"""
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """앞에서부터 max_tokens 토큰까지만 남기기"""
+    if max_tokens <= 0:
+        return ""
+    encoding = _get_encoding()
+    if encoding is not None:
+        tokens = encoding.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return text
+        # 잘린 멀티바이트 글자는 버림
+        return encoding.decode(tokens[:max_tokens]).rstrip("�")
+    
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    # 추정치가 예산 안에 들어올 때까지 이분 탐색
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if estimate_tokens(text[:middle]) <= max_tokens:
+            low = middle
+        else:
+            high = middle - 1
+    return text[:low]
+
+
+def _normalize(text: str) -> str:
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def _units(document: Dict) -> List[Dict]:
+    """문서의 컨텍스트 후보 단위 (passage가 있으면 passage, 없으면 본문 전체), 관련도 순"""
+    passages = document.get("passages")
+    if not passages:
+        return [{"chunk_index": 0, "content": (document.get("content") or "").strip()}]
+    return [{"chunk_index": p.get("chunk_index", 0), "content": p["content"].strip()} for p in passages]
+
+
+def pack_context(
+    documents: List[Dict],
+    budget_tokens: int,
+    header: Callable[[Dict], str],
+    separator: str = "\n\n"
+) -> Dict:
+    """
+    문서를 토큰 예산 안에 관련도 순으로 채워 컨텍스트 텍스트 만들기
+    
+    - 문서 순서(검색 순위) → 문서 안 passage 순서(관련도)대로 넣을 수 있는 것부터 넣는다
+    - 들어가지 않는 단위는 건너뛰고 다음 단위를 시도 (남은 예산이 충분하면 잘라서 넣음)
+    - 문서마다 header(doc) 한 번 + 고른 passage를 문서 안 순서대로 이어 붙인다
+    
+    Args:
+        documents: 검색 결과 (관련도 순)
+        budget_tokens: 컨텍스트 토큰 예산 (header / 구분자 포함)
+        header: 문서 머리말 생성 함수 (예: "[메일] 제목\\n내용: ")
+        separator: 문서 사이 구분자
+    
+    Returns:
+        {"text", "tokens", "budget", "documents", "passages", "truncated", "skipped"}
+    """
+    separator_tokens = count_tokens(separator)
+    remaining = budget_tokens
+    seen: List[str] = []
+    selected: Dict[int, Dict] = {}
+    truncated = skipped = 0
+    
+    for position, document in enumerate(documents):
+        header_text = header(document)
+        for unit in _units(document):
+            content = unit["content"]
+            normalized = _normalize(content)
+            # 이미 넣은 내용과 같거나 그 안에 포함된 passage (인용된 메일 등)
+            if not normalized or any(normalized in text for text in seen):
+                skipped += 1
+                continue
+            
+            entry = selected.get(position)
+            if entry:
+                # 같은 문서의 바로 앞 / 뒤 청크와 겹치는 부분 제거
+                for chosen in entry["units"]:
+                    if chosen["chunk_index"] == unit["chunk_index"] - 1:
+                        content = content[overlap_length(chosen["content"], content):].lstrip()
+                    elif chosen["chunk_index"] == unit["chunk_index"] + 1:
+                        content = content[:len(content) - overlap_length(content, chosen["content"])].rstrip()
+                if not content:
+                    skipped += 1
+                    continue
+                cost = count_tokens(PASSAGE_SEPARATOR + content)
+            else:
+                cost = count_tokens(header_text + content) + (separator_tokens if selected else 0)
+            
+            if cost > remaining:
+                overhead = cost - count_tokens(content)
+                room = remaining - overhead
+                if room < MIN_FRAGMENT_TOKENS:
+                    skipped += 1
+                    continue
+                content = truncate_to_tokens(content, room)
+                cost = overhead + count_tokens(content)
+                truncated += 1
+            
+            if entry is None:
+                entry = selected[position] = {"header": header_text, "units": []}
+            entry["units"].append({"chunk_index": unit["chunk_index"], "content": content})
+            seen.append(normalized)
+            remaining -= cost
+    
+    blocks = []
+    for position in sorted(selected):
+        entry = selected[position]
+        units = sorted(entry["units"], key=lambda unit: unit["chunk_index"])
+        blocks.append(entry["header"] + PASSAGE_SEPARATOR.join(unit["content"] for unit in units))
+    text = separator.join(blocks)
+    
+    return {
+        "text": text,
+        "tokens": count_tokens(text),
+        "budget": budget_tokens,
+        "documents": len(selected),
+        "passages": sum(len(entry["units"]) for entry in selected.values()),
+        "truncated": truncated,
+        "skipped": skipped
+    }
+
+
+def record_usage(usage: Optional[Dict], prompt: str, packed: Dict, prompt_tokens: int):
+    """
+    패킹 결과 기록 (Prometheus 히스토그램 + 로그)
+    
+    usage 딕셔너리를 넘기면 {prompt: 사용량}도 함께 기록한다 (응답 metadata용).
+    """
+    record_prompt_tokens(prompt, packed["tokens"])
+    print(
+        f"📏 {prompt} 컨텍스트: {packed['tokens']}/{packed['budget']} 토큰 "
+        f"(문서 {packed['documents']}개, passage {packed['passages']}개, 프롬프트 {prompt_tokens} 토큰)"
+    )
+    if usage is None:
+        return
+    usage[prompt] = {
+        "context_tokens": packed["tokens"],
+        "budget": packed["budget"],
+        "prompt_tokens": prompt_tokens,
+        "documents": packed["documents"],
+        "passages": packed["passages"],
+        "truncated": packed["truncated"]
+    }
@@ -0,0 +1,140 @@
+"""
+임베딩 캐시
+텍스트 해시 + 배포 이름을 키로, 메모리(LRU) → 디스크(SQLite) 2단계로 저장
+"""
+import os
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, List, Iterable
+import numpy as np
+from cachetools import LRUCache
+from dotenv import load_dotenv
+
+from backend.service.metrics import CACHE_REQUESTS
+
+load_dotenv()
+
+# SQLite IN (...) 절 하나에 넣을 최대 키 개수
+_SQLITE_BATCH = 500
+
+
+class EmbeddingCache:
+    """
+    내용 기반(content-addressed) 임베딩 캐시
+    
+    - 키: sha256(배포 이름 + 텍스트) → 같은 텍스트라도 모델이 다르면 다른 키
+    - 메모리 LRU 계층: 프로세스 안에서 반복 조회 (float32 ndarray로 보관, 1536차원 하나에 약 6KB)
+      조회 결과만 list[float]로 바꿔서 반환한다 (파이썬 float 리스트로 들고 있으면 벡터당 약 49KB)
+    - 디스크 계층 (SQLite, float32 BLOB): 재시작 후에도 유지
+    - path가 빈 문자열이면 디스크 계층 없이 메모리만 사용
+    """
+    
+    def __init__(self, path: str = None, memory_size: int = None):
+        if path is None:
+            path = os.getenv("KITE_EMBEDDING_CACHE_PATH", ".cache/embeddings.sqlite3")
+        if memory_size is None:
+            memory_size = int(os.getenv("KITE_EMBEDDING_CACHE_SIZE", "10000"))
+        
+        self.path = path
+        self._memory = LRUCache(maxsize=max(memory_size, 1))
+        self._lock = threading.Lock()
+        self._db = None
+        
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            # 여러 프로세스(API 서버 + 인덱싱 스크립트)가 동시에 읽고 쓸 수 있도록 WAL 사용
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "key TEXT PRIMARY KEY, dim INTEGER NOT NULL, vector BLOB NOT NULL)"
+            )
+            self._db.commit()
+        
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def make_key(text: str, deployment: str) -> str:
+        """캐시 키 생성"""
+        return hashlib.sha256(f"{deployment}\x00{text}".encode("utf-8")).hexdigest()
+    
+    def get_many(self, keys: Iterable[str]) -> Dict[str, List[float]]:
+        """
+        여러 키를 한 번에 조회
+        
+        Returns:
+            {키: 벡터} (없는 키는 포함되지 않음)
+        """
+        found = {}
+        missing = []
+        
+        with self._lock:
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    found[key] = vector.tolist()
+                    self.memory_hits += 1
+                else:
+                    missing.append(key)
+            
+            if self._db and missing:
+                for i in range(0, len(missing), _SQLITE_BATCH):
+                    batch = missing[i:i + _SQLITE_BATCH]
+                    rows = self._db.execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(batch))})",
+                        batch
+                    ).fetchall()
+                    for key, blob in rows:
+                        vector = np.frombuffer(blob, dtype=np.float32)
+                        found[key] = vector.tolist()
+                        self._memory[key] = vector
+                        self.disk_hits += 1
+            
+            misses = sum(1 for key in missing if key not in found)
+            self.misses += misses
+        
+        # 키 단위 카운터 (배치 하나에 여러 키)
+        memory_hits = len(found) - (len(missing) - misses)
+        CACHE_REQUESTS.labels("embedding", "memory_hit").inc(memory_hits)
+        CACHE_REQUESTS.labels("embedding", "disk_hit").inc(len(missing) - misses)
+        CACHE_REQUESTS.labels("embedding", "miss").inc(misses)
+        
+        return found
+    
+    def put_many(self, items: Dict[str, List[float]]):
+        """여러 벡터를 메모리 / 디스크에 저장"""
+        if not items:
+            return
+        
+        vectors = {key: np.asarray(vector, dtype=np.float32) for key, vector in items.items()}
+        with self._lock:
+            self._memory.update(vectors)
+            
+            if self._db:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, dim, vector) VALUES (?, ?, ?)",
+                    [(key, len(vector), vector.tobytes()) for key, vector in vectors.items()]
+                )
+                self._db.commit()
+    
+    def stats(self) -> Dict:
+        """캐시 상태 (헬스 체크용)"""
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "path": self.path or None,
+            "memory_size": len(self._memory),
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0
+        }
+    
+    def close(self):
+        """디스크 계층 연결 종료"""
+        if self._db:
+            self._db.close()
+            self._db = None
@@ -0,0 +1,490 @@
+"""
+스트리밍 수집 파이프라인 (원본 읽기 → 정리 → 청크 → 임베딩 → Blob / 인덱스 쓰기)
+
+단계마다 제너레이터 하나를 스레드 하나에서 돌리고, 단계 사이를 크기 제한이 있는 큐로 잇는다.
+뒤 단계가 느리면 큐가 차서 앞 단계가 기다리므로(backpressure) 코퍼스 크기와 관계없이
+메모리에는 큐 크기 × 단계 수 정도의 문서만 올라간다.
+
+- 쓰기 대상(sinks)
+    blob: 문서마다 {id}.json (인덱서가 임베딩 / 색인, KITE_BLOB_LAYOUT=document)
+    index: 클라이언트 임베딩 후 검색 인덱스에 바로 merge_or_upload (push_indexer.py)
+- 체크포인트: 쓰기가 끝난 다음 원본 위치 + 실패한 문서 ID를 파일에 저장하고,
+  다시 실행하면 그 위치 앞의 실패한 문서를 먼저 다시 쓰고 그 위치부터 이어서 처리한다
+  (단계 안의 순서가 그대로 유지되므로 위치 하나로 충분). 끝까지 처리하고 실패한 문서가 없을 때만 완료로 표시.
+- 통계: 단계별 처리 개수 / 작업 시간 / 큐 대기 시간, 큐 깊이(현재 / 평균 / 최대), 처리량
+
+KITE_PIPELINE_QUEUE_SIZE: 단계 사이 큐 크기 (기본 64)
+KITE_PIPELINE_BATCH_SIZE: 쓰기 단계에서 한 번에 올리는 원본 문서 수 (기본 64)
+"""
+import os
+import json
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from dotenv import load_dotenv
+from backend.service.azure_blob import AzureBlobService
+from backend.service.blob_batches import blob_layout
+from backend.service.blob_manifest import blob_name, serialize_document
+from backend.service.chunking import attach_chunks, index_mode
+from backend.service.local_backend import LocalBlobService, use_local_backend
+from backend.service.push_indexer import PushIndexer, pack_by_bytes, push_embedding_batch, to_index_document
+from backend.service.query_filters import attach_filter_fields
+
+load_dotenv()
+
+SINKS = ("blob", "index")
+
+# 큐 대기 중에 중단 여부를 확인하는 간격 (초)
+_POLL_SECONDS = 0.1
+
+_END = object()
+
+
+def pipeline_queue_size() -> int:
+    """KITE_PIPELINE_QUEUE_SIZE (기본 64)"""
+    return max(int(os.getenv("KITE_PIPELINE_QUEUE_SIZE", "64")), 1)
+
+
+def pipeline_batch_size() -> int:
+    """KITE_PIPELINE_BATCH_SIZE (기본 64)"""
+    return max(int(os.getenv("KITE_PIPELINE_BATCH_SIZE", "64")), 1)
+
+
+def read_documents(path: str) -> Iterator[Dict]:
+    """문서 파일 읽기 (.jsonl은 한 줄씩 읽어서 전체를 메모리에 올리지 않음 / .json은 문서 배열)"""
+    if path.endswith(".jsonl"):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        yield from json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+class _StageStats:
+    """단계 하나의 처리 개수 / 시간"""
+    
+    def __init__(self, name: str):
+        self.name = name
+        self.items_in = 0
+        self.items_out = 0
+        self.started = None
+        self.finished = None
+        self.wait_input = 0.0
+        self.wait_output = 0.0
+    
+    def as_dict(self) -> Dict:
+        elapsed = ((self.finished or time.perf_counter()) - self.started) if self.started else 0.0
+        busy = max(elapsed - self.wait_input - self.wait_output, 0.0)
+        return {
+            "stage": self.name,
+            "items_in": self.items_in,
+            "items_out": self.items_out,
+            "busy_seconds": round(busy, 3),
+            "wait_input_seconds": round(self.wait_input, 3),
+            "wait_output_seconds": round(self.wait_output, 3),
+            "items_per_busy_second": round(max(self.items_in, self.items_out) / busy, 1) if busy else None
+        }
+
+
+class _Channel:
+    """단계 사이 큐 (크기 제한 + 깊이 통계, 중단되면 대기를 풀어줌)"""
+    
+    def __init__(self, name: str, size: int, stop: threading.Event):
+        self.name = name
+        self.queue = queue.Queue(maxsize=size)
+        self.size = size
+        self.stop = stop
+        self.depth_sum = 0
+        self.depth_samples = 0
+        self.depth_max = 0
+    
+    def put(self, item) -> float:
+        started = time.perf_counter()
+        while not self.stop.is_set():
+            try:
+                self.queue.put(item, timeout=_POLL_SECONDS)
+                break
+            except queue.Full:
+                continue
+        depth = self.queue.qsize()
+        self.depth_sum += depth
+        self.depth_samples += 1
+        self.depth_max = max(self.depth_max, depth)
+        return time.perf_counter() - started
+    
+    def get(self) -> Tuple[object, float]:
+        started = time.perf_counter()
+        while not self.stop.is_set():
+            try:
+                return self.queue.get(timeout=_POLL_SECONDS), time.perf_counter() - started
+            except queue.Empty:
+                continue
+        return _END, time.perf_counter() - started
+    
+    def as_dict(self) -> Dict:
+        return {
+            "queue": self.name,
+            "size": self.size,
+            "depth": self.queue.qsize(),
+            "depth_avg": round(self.depth_sum / self.depth_samples, 1) if self.depth_samples else 0.0,
+            "depth_max": self.depth_max
+        }
+
+
+class StreamingPipeline:
+    """
+    제너레이터 단계들을 스레드 + 크기 제한 큐로 연결
+    
+    stages: [(이름, 함수)] — 첫 단계는 입력 없이 호출되어 항목을 만들고(함수(None)),
+    나머지는 앞 단계 출력 이터레이터를 받아 항목을 내보낸다. 마지막 단계 출력은 run()이 받아서 on_result로 넘긴다.
+    한 단계에서 예외가 나면 모든 단계를 멈추고 run()이 그 예외를 다시 올린다.
+    """
+    
+    def __init__(self, stages: Sequence[Tuple[str, Callable]], queue_size: int = None):
+        self.stages = list(stages)
+        self.queue_size = queue_size or pipeline_queue_size()
+        self.stop = threading.Event()
+        self.stats = [_StageStats(name) for name, _ in self.stages]
+        self.channels = [
+            _Channel(f"{self.stages[i][0]} → {self.stages[i + 1][0]}", self.queue_size, self.stop)
+            for i in range(len(self.stages) - 1)
+        ]
+        self.error: Optional[BaseException] = None
+    
+    def _inputs(self, index: int) -> Iterator:
+        channel, stats = self.channels[index - 1], self.stats[index]
+        while True:
+            item, waited = channel.get()
+            stats.wait_input += waited
+            if item is _END:
+                return
+            stats.items_in += 1
+            yield item
+    
+    def _run_stage(self, index: int, output: Callable[[object], float]):
+        name, function = self.stages[index]
+        stats = self.stats[index]
+        stats.started = time.perf_counter()
+        try:
+            for item in function(self._inputs(index) if index else None):
+                stats.items_out += 1
+                stats.wait_output += output(item)
+                if self.stop.is_set():
+                    break
+        except BaseException as e:
+            if self.error is None:
+                self.error = e
+            self.stop.set()
+        finally:
+            stats.finished = time.perf_counter()
+            if index < len(self.channels):
+                self.channels[index].put(_END)
+    
+    def snapshot(self) -> Dict:
+        """현재 단계 / 큐 통계"""
+        return {"stages": [stats.as_dict() for stats in self.stats], "queues": [channel.as_dict() for channel in self.channels]}
+    
+    def run(
+        self,
+        on_result: Callable[[object], None],
+        on_progress: Optional[Callable[[Dict], None]] = None,
+        progress_interval: float = 2.0
+    ) -> Dict:
+        """모든 단계를 실행하고 끝나면 통계 반환 (on_result는 호출한 스레드에서 순서대로 호출)"""
+        last = len(self.stages) - 1
+        results: "queue.Queue" = queue.Queue(maxsize=self.queue_size)
+        
+        def deliver(item) -> float:
+            started = time.perf_counter()
+            while not self.stop.is_set():
+                try:
+                    results.put(item, timeout=_POLL_SECONDS)
+                    break
+                except queue.Full:
+                    continue
+            return time.perf_counter() - started
+        
+        threads = [
+            threading.Thread(
+                target=self._run_stage,
+                args=(index, deliver if index == last else self.channels[index].put),
+                name=f"pipeline-{name}",
+                daemon=True
+            )
+            for index, (name, _) in enumerate(self.stages)
+        ]
+        started = last_report = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        
+        try:
+            while threads[last].is_alive() or not results.empty():
+                try:
+                    on_result(results.get(timeout=_POLL_SECONDS))
+                except queue.Empty:
+                    pass
+                if on_progress and time.perf_counter() - last_report >= progress_interval:
+                    last_report = time.perf_counter()
+                    on_progress({**self.snapshot(), "elapsed_seconds": round(last_report - started, 2)})
+        except BaseException:
+            self.stop.set()
+            raise
+        finally:
+            for thread in threads:
+                thread.join(timeout=5)
+        
+        if self.error is not None:
+            raise self.error
+        return {**self.snapshot(), "elapsed_seconds": round(time.perf_counter() - started, 2)}
+
+
+class Checkpoint:
+    """
+    수집 체크포인트 (JSON 파일, 임시 파일에 쓴 뒤 교체)
+    
+    {"source", "sinks", "next_offset", "failed_ids", "completed", "updated_at"}
+    """
+    
+    def __init__(self, path: str, source: str, sinks: Sequence[str]):
+        self.path = Path(path)
+        self.source = source
+        self.sinks = list(sinks)
+        self.state = {"source": source, "sinks": self.sinks, "next_offset": 0, "failed_ids": [], "completed": False}
+        
+        if self.path.exists():
+            saved = json.loads(self.path.read_text(encoding="utf-8"))
+            if saved.get("source") != source or saved.get("sinks") != self.sinks:
+                raise ValueError(
+                    f"체크포인트({self.path})의 원본 / 쓰기 대상이 다릅니다: "
+                    f"{saved.get('source')} {saved.get('sinks')} (--restart로 처음부터)"
+                )
+            self.state.update(saved)
+    
+    @property
+    def next_offset(self) -> int:
+        return self.state["next_offset"]
+    
+    def commit(
+        self,
+        next_offset: int,
+        written_ids: Iterable[str] = (),
+        failed_ids: Iterable[str] = (),
+        completed: bool = False
+    ):
+        """진행 저장 (written_ids: 이번에 쓴 문서, 그중 failed_ids를 뺀 것은 실패 목록에서 제거)"""
+        failed = (set(self.state["failed_ids"]) - set(written_ids)) | set(failed_ids)
+        self.state.update(
+            next_offset=max(next_offset, self.state["next_offset"]),
+            failed_ids=sorted(failed),
+            completed=completed,
+            updated_at=datetime.now(timezone.utc).isoformat()
+        )
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp_path.write_text(json.dumps(self.state, ensure_ascii=False, indent=2), encoding="utf-8")
+        tmp_path.replace(self.path)
+
+
+def _source_stage(documents: Iterable[Dict], skip: int, retry_ids: Iterable[str] = ()):
+    """skip 위치부터 전부 + 그 앞에서는 지난 실행에서 실패한 문서(retry_ids)만"""
+    retry_ids = set(retry_ids)
+    
+    def stage(_):
+        for offset, document in enumerate(documents):
+            if offset >= skip or (retry_ids and str(document.get("id")) in retry_ids):
+                yield {"offset": offset, "document": document}
+    return stage
+
+
+def _normalize_stage(items: Iterator[Dict]) -> Iterator[Dict]:
+    """id 없는 문서 제외, id 문자열화, 날짜 / 작성자 필터 필드 추가"""
+    for item in items:
+        document = item["document"]
+        if not document.get("id"):
+            print(f"⚠️ id가 없는 문서 건너뜀 (위치 {item['offset']})")
+            item["document"] = None
+        else:
+            item["document"] = attach_filter_fields({**document, "id": str(document["id"])})
+        yield item
+
+
+def _chunk_stage(sinks: Sequence[str]):
+    """blob: 청크 색인이면 청크 목록 추가 / index: 인덱스 문서 준비"""
+    chunked = index_mode() == "chunk"
+    
+    def stage(items: Iterator[Dict]) -> Iterator[Dict]:
+        for item in items:
+            document = item["document"]
+            if document is not None:
+                if "blob" in sinks and chunked:
+                    item["document"] = attach_chunks(document)
+                if "index" in sinks:
+                    item["index_document"] = to_index_document(document)
+            yield item
+    return stage
+
+
+def _embed_stage(indexer, batch_size: int):
+    """인덱스 문서를 batch_size개 이상 모아서 한 번에 임베딩 (실패하면 그 묶음은 인덱스 쓰기 실패로 표시)"""
+    def flush(group: List[Dict]) -> List[Dict]:
+        targets = [item["index_document"] for item in group if item.get("index_document")]
+        if targets:
+            try:
+                vectors = indexer.embed([doc.get("content") or doc.get("title") or "-" for doc in targets])
+                for doc, vector in zip(targets, vectors):
+                    doc["content_vector"] = vector
+            except Exception as e:
+                print(f"❌ 임베딩 실패: {len(targets)}개, {str(e)}")
+                for item in group:
+                    item["embedding_failed"] = bool(item.get("index_document"))
+        return group
+    
+    def stage(items: Iterator[Dict]) -> Iterator[Dict]:
+        group, pending = [], 0
+        for item in items:
+            group.append(item)
+            pending += 1 if item.get("index_document") else 0
+            if pending >= batch_size:
+                yield from flush(group)
+                group, pending = [], 0
+        if group:
+            yield from flush(group)
+    return stage
+
+
+def _write_stage(sinks: Sequence[str], blob_service, indexer, batch_size: int):
+    """
+    원본 문서 batch_size개씩 Blob / 인덱스에 쓰고 {"next_offset", "documents", "written_ids", "failed_ids"} 내보내기
+    
+    Blob 업로드는 묶음 단위로만 성공 여부를 알 수 있으므로 한 건이라도 실패하면 묶음 전체를 실패로 기록한다
+    (다시 올려도 같은 결과라 안전).
+    """
+    def write(group: List[Dict]) -> Dict:
+        documents = [item for item in group if item["document"] is not None]
+        failed = set()
+        if "blob" in sinks and documents:
+            progress = blob_service.upload_blobs(
+                [(blob_name(item["document"]), serialize_document(item["document"])) for item in documents]
+            )
+            if progress["failed"]:
+                failed.update(item["document"]["id"] for item in documents)
+        if "index" in sinks and documents:
+            failed.update(item["document"]["id"] for item in documents if item.get("embedding_failed"))
+            targets = [item["index_document"] for item in documents if not item.get("embedding_failed")]
+            for batch in pack_by_bytes(targets, indexer.max_bytes):
+                failed.update(indexer.upload(batch)["failed"])
+        return {
+            "next_offset": group[-1]["offset"] + 1,
+            "documents": len(documents),
+            "written_ids": [item["document"]["id"] for item in documents],
+            "failed_ids": sorted(failed)
+        }
+    
+    def stage(items: Iterator[Dict]) -> Iterator[Dict]:
+        group = []
+        for item in items:
+            group.append(item)
+            if len(group) >= batch_size:
+                yield write(group)
+                group = []
+        if group:
+            yield write(group)
+    return stage
+
+
+def ingest(
+    documents: Iterable[Dict],
+    source: str,
+    sinks: Sequence[str] = ("blob",),
+    checkpoint_path: str = None,
+    blob_service=None,
+    indexer=None,
+    queue_size: int = None,
+    batch_size: int = None,
+    on_progress: Optional[Callable[[Dict], None]] = None
+) -> Dict:
+    """
+    원본 문서 스트림을 파이프라인으로 수집
+    
+    Args:
+        documents: 원본 문서 이터러블 (체크포인트 위치까지는 지난 실행에서 실패한 문서만 다시 쓰고 나머지는 버림)
+        source: 체크포인트에 기록할 원본 이름 (같은 원본이어야 이어서 처리)
+        sinks: "blob" / "index" 중 쓰기 대상
+            (KITE_BACKEND=local이면 로컬 검색이 Blob 디렉터리를 바로 읽으므로 index도 blob으로 저장)
+        checkpoint_path: 체크포인트 파일 (없으면 이어서 처리하지 않음)
+    
+    Returns:
+        {"documents", "failed_ids", "resumed_from", "stages", "queues", "elapsed_seconds", "documents_per_second"}
+    """
+    sinks = [sink for sink in SINKS if sink in sinks]
+    if not sinks:
+        raise ValueError(f"쓰기 대상은 {', '.join(SINKS)} 중 하나 이상이어야 합니다")
+    if "index" in sinks and indexer is None and use_local_backend():
+        print("💡 KITE_BACKEND=local: 로컬 검색이 Blob 디렉터리를 바로 읽으므로 index 대신 blob으로 저장합니다")
+        sinks = ["blob"]
+    if "blob" in sinks and blob_layout() != "document":
+        raise ValueError("blob 쓰기는 KITE_BLOB_LAYOUT=document에서만 지원합니다 (jsonl은 scripts/upload_to_blob.py)")
+    
+    batch_size = batch_size or pipeline_batch_size()
+    if "blob" in sinks and blob_service is None:
+        blob_service = LocalBlobService() if use_local_backend() else AzureBlobService()
+    if "index" in sinks and indexer is None:
+        indexer = PushIndexer()
+    
+    checkpoint = Checkpoint(checkpoint_path, source, sinks) if checkpoint_path else None
+    skip = checkpoint.next_offset if checkpoint else 0
+    retry_ids = checkpoint.state["failed_ids"] if checkpoint else []
+    if checkpoint and checkpoint.state["completed"]:
+        print(f"✅ 체크포인트상 이미 끝난 수집입니다: {checkpoint_path} (--restart로 처음부터)")
+        return {"documents": 0, "failed_ids": [], "resumed_from": skip,
+                "stages": [], "queues": [], "elapsed_seconds": 0.0, "documents_per_second": 0.0}
+    if skip:
+        print(f"⏩ 체크포인트에서 이어서 처리: 원본 위치 {skip}부터" + (f" (실패했던 문서 {len(retry_ids)}개 다시 쓰기)" if retry_ids else ""))
+    
+    stages = [
+        ("read", _source_stage(documents, skip, retry_ids)),
+        ("normalize", _normalize_stage),
+        ("chunk", _chunk_stage(sinks))
+    ]
+    if "index" in sinks:
+        stages.append(("embed", _embed_stage(indexer, push_embedding_batch())))
+    stages.append(("write", _write_stage(sinks, blob_service, indexer, batch_size)))
+    
+    totals = {"documents": 0, "failed_ids": set(retry_ids), "next_offset": skip}
+    
+    def on_result(result: Dict):
+        totals["documents"] += result["documents"]
+        totals["failed_ids"] = (totals["failed_ids"] - set(result["written_ids"])) | set(result["failed_ids"])
+        totals["next_offset"] = max(totals["next_offset"], result["next_offset"])
+        if checkpoint:
+            checkpoint.commit(result["next_offset"], result["written_ids"], result["failed_ids"])
+    
+    pipeline = StreamingPipeline(stages, queue_size)
+    
+    def progress(snapshot: Dict):
+        if on_progress:
+            elapsed = max(snapshot["elapsed_seconds"], 1e-9)
+            on_progress({
+                **snapshot,
+                "documents": totals["documents"],
+                "next_offset": totals["next_offset"],
+                "failed": len(totals["failed_ids"]),
+                "documents_per_second": round(totals["documents"] / elapsed, 1)
+            })
+    
+    stats = pipeline.run(on_result, on_progress=progress)
+    if checkpoint:
+        # 실패한 문서가 남아 있으면 완료로 표시하지 않음 (다시 실행하면 그 문서들만 다시 씀)
+        checkpoint.commit(totals["next_offset"], completed=not checkpoint.state["failed_ids"])
+    
+    return {
+        **stats,
+        "documents": totals["documents"],
+        "failed_ids": sorted(totals["failed_ids"]),
+        "resumed_from": skip,
+        "documents_per_second": round(totals["documents"] / max(stats["elapsed_seconds"], 1e-9), 1)
+    }
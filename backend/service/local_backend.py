@@ -0,0 +1,339 @@
+"""
+로컬(오프라인) 백엔드
+Azure OpenAI / AI Search / Blob Storage 대신 프로세스 안에서 동작하는 대체 구현
+
+KITE_BACKEND=local 로 선택하며, 네트워크 없이 앱 전체를 실행하고 부하 테스트 / 프로파일링할 때 사용한다.
+- 임베딩: 단어 / 글자 bigram 해시 기반 결정적 벡터 (같은 텍스트 → 항상 같은 벡터)
+- 검색: 로컬 Blob 디렉터리를 읽어 메모리에 올린 문서 저장소 (local_search.py)
+- Blob: 로컬 디렉터리에 문서별 JSON 파일
+- 채팅: 문서 제목 / 내용으로 답변을 조립하는 가짜 모델 (지연 시간 / 토큰 속도 설정 가능)
+"""
+import os
+import re
+import json
+import time
+import asyncio
+import hashlib
+from pathlib import Path
+from types import SimpleNamespace
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Optional
+import numpy as np
+from dotenv import load_dotenv
+from backend.service.blob_manifest import blob_name as document_blob_name, content_md5, serialize_document
+
+load_dotenv()
+
+# 임베딩 캐시 키에 쓰는 배포 이름 (실제 Azure 임베딩과 섞이지 않도록 분리)
+LOCAL_EMBEDDING_DEPLOYMENT = "local-hash-embedding"
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+def use_local_backend() -> bool:
+    """KITE_BACKEND=local 이면 True"""
+    return os.getenv("KITE_BACKEND", "azure").strip().lower() == "local"
+
+
+def _env_float(name: str, default: str) -> float:
+    return float(os.getenv(name, default))
+
+
+def _tokenize(text: str) -> List[str]:
+    return _WORD_PATTERN.findall(text.lower())
+
+
+def _features(text: str) -> List[str]:
+    """
+    해시 임베딩용 특징
+    
+    단어 전체 + 단어 안의 글자 bigram.
+    조사가 붙은 한국어 단어("테이블을" / "테이블")도 bigram이 겹쳐 가까운 벡터가 된다.
+    """
+    features = []
+    for word in _tokenize(text):
+        features.append(word)
+        features.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return features
+
+
+def hash_embedding(text: str, dim: int = None) -> List[float]:
+    """
+    결정적 해시 임베딩 (L2 정규화)
+    
+    특징마다 blake2b 해시로 차원 / 부호를 정해서 더한다 (feature hashing).
+    파이썬 hash()와 달리 프로세스가 달라도 같은 값이 나온다.
+    """
+    if dim is None:
+        dim = int(os.getenv("KITE_LOCAL_EMBEDDING_DIM", "1536"))
+    
+    vector = np.zeros(dim, dtype=np.float32)
+    for feature in _features(text):
+        digest = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+        vector[(digest >> 1) % dim] += 1.0 if digest & 1 else -1.0
+    
+    norm = np.linalg.norm(vector)
+    if norm > 0:
+        vector /= norm
+    return vector.tolist()
+
+
+# ============================================================
+# Blob Storage
+# ============================================================
+
+class LocalBlobService:
+    """
+    로컬 디렉터리 Blob 저장소 (AzureBlobService와 같은 메서드)
+    
+    KITE_LOCAL_BLOB_DIR 아래에 문서마다 {id}.json 파일 하나
+    """
+    
+    def __init__(self, root: str = None):
+        self.root = Path(root or os.getenv("KITE_LOCAL_BLOB_DIR", ".cache/local_blob"))
+        self.root.mkdir(parents=True, exist_ok=True)
+        print(f"✅ 로컬 Blob 저장소 초기화 완료: {self.root}")
+    
+    def upload_document(self, document: Dict, blob_name: str = None) -> bool:
+        """단일 문서 저장"""
+        try:
+            if blob_name is None:
+                blob_name = document_blob_name(document)
+            self._write(blob_name, serialize_document(document))
+            return True
+        
+        except Exception as e:
+            print(f"❌ 문서 저장 실패: {blob_name}, {str(e)}")
+            return False
+    
+    def _write(self, blob_name: str, data: bytes):
+        # 쓰는 도중 인덱서가 읽지 않도록 임시 파일에 쓴 뒤 교체
+        path = self.root / blob_name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        tmp_path.write_bytes(data)
+        tmp_path.replace(path)
+    
+    def upload_documents(
+        self,
+        documents: Iterable[Dict],
+        max_concurrency: int = None,
+        on_progress=None,
+        remote_hashes: Dict[str, str] = None
+    ) -> int:
+        """여러 문서 저장 (성공 개수 반환, remote_hashes와 MD5가 같은 문서는 건너뜀)"""
+        remote_hashes = remote_hashes or {}
+        
+        def blobs():
+            for doc in documents:
+                name = document_blob_name(doc)
+                data = serialize_document(doc)
+                yield name, (None if remote_hashes.get(name) == content_md5(data).hex() else data)
+        
+        return self.upload_blobs(blobs(), max_concurrency, on_progress)["succeeded"]
+    
+    def upload_blobs(self, blobs, max_concurrency: int = None, on_progress=None, content_type: str = None, total: int = None) -> Dict:
+        """
+        (Blob 이름, 내용) 목록 저장 (내용이 None이면 건너뜀으로 집계)
+        
+        로컬 디스크라 순서대로 저장한다 (max_concurrency / content_type은 AzureBlobService와 시그니처를 맞추기 위한 것).
+        on_progress는 마지막에 한 번 AzureBlobService와 같은 형식으로 호출한다.
+        """
+        stats = {"total": total, "done": 0, "succeeded": 0, "skipped": 0, "failed": 0, "retries": 0, "bytes": 0}
+        started = time.perf_counter()
+        for name, data in blobs:
+            stats["done"] += 1
+            if data is None:
+                stats["skipped"] += 1
+                continue
+            try:
+                self._write(name, data)
+                stats["succeeded"] += 1
+                stats["bytes"] += len(data)
+            except Exception as e:
+                stats["failed"] += 1
+                print(f"❌ 저장 실패: {name}, {str(e)}")
+        
+        elapsed = max(time.perf_counter() - started, 1e-9)
+        progress = {
+            **stats,
+            "total": stats["done"],
+            "elapsed_seconds": round(elapsed, 2),
+            "docs_per_second": round(stats["done"] / elapsed, 1),
+            "mb_per_second": round(stats["bytes"] / elapsed / 1e6, 2)
+        }
+        if on_progress:
+            on_progress(progress)
+        print(f"📊 일괄 저장 완료: {stats['succeeded']}/{stats['done'] - stats['skipped']}개 성공, {stats['skipped']}개 변경 없음")
+        return progress
+    
+    def blob_hashes(self) -> Dict[str, str]:
+        """{Blob 이름: 파일 내용 MD5 hex} 매니페스트 (AzureBlobService.blob_hashes와 같은 형식)"""
+        return {path.name: content_md5(path.read_bytes()).hex() for path in self.root.glob("*.json")}
+    
+    def delete_blobs(self, blob_names: List[str]) -> int:
+        """여러 Blob 삭제 (삭제한 개수 반환)"""
+        return sum(1 for name in blob_names if self.delete_blob(name))
+    
+    def list_blobs(self, prefix: str = None) -> List[str]:
+        """
+        저장된 Blob 이름 목록
+        
+        prefix가 없으면 문서 Blob({id}.json)만, 있으면 그 경로 아래 모든 Blob ("jsonl/..." 같은 하위 경로 포함)
+        """
+        if prefix is None:
+            return sorted(path.name for path in self.root.glob("*.json"))
+        names = (path.relative_to(self.root).as_posix() for path in self.root.rglob("*") if path.is_file())
+        return sorted(name for name in names if name.startswith(prefix) and not name.endswith(".tmp"))
+    
+    def download_bytes(self, blob_name: str) -> Optional[bytes]:
+        """Blob 내용 그대로 (없으면 None)"""
+        path = self.root / blob_name
+        return path.read_bytes() if path.exists() else None
+    
+    def download_blob(self, blob_name: str) -> Dict:
+        """Blob 읽기 + JSON 파싱 (실패 시 빈 딕셔너리)"""
+        try:
+            return json.loads((self.root / blob_name).read_text(encoding="utf-8"))
+        except Exception as e:
+            print(f"❌ Blob 읽기 실패: {blob_name}, {str(e)}")
+            return {}
+    
+    def delete_blob(self, blob_name: str) -> bool:
+        """Blob 삭제"""
+        try:
+            (self.root / blob_name).unlink()
+            return True
+        except Exception as e:
+            print(f"❌ Blob 삭제 실패: {blob_name}, {str(e)}")
+            return False
+    
+    def get_blob_url(self, blob_name: str) -> str:
+        """Blob 파일 URL (디버깅용)"""
+        return (self.root / blob_name).resolve().as_uri()
+
+
+# ============================================================
+# OpenAI
+# ============================================================
+
+class _FakeModel:
+    """
+    가짜 채팅 / 임베딩 모델 (동기 / 비동기 클라이언트 공용)
+    
+    - 임베딩: 요청마다 KITE_LOCAL_EMBEDDING_LATENCY_MS 지연
+    - 채팅: 첫 토큰까지 KITE_LOCAL_CHAT_LATENCY_MS, 이후 KITE_LOCAL_TOKENS_PER_SECOND 속도로 생성
+      (0이면 지연 없이 한 번에)
+    """
+    
+    def __init__(self):
+        self.embedding_latency = _env_float("KITE_LOCAL_EMBEDDING_LATENCY_MS", "30") / 1000
+        self.first_token_latency = _env_float("KITE_LOCAL_CHAT_LATENCY_MS", "300") / 1000
+        tokens_per_second = _env_float("KITE_LOCAL_TOKENS_PER_SECOND", "50")
+        self.token_interval = 1 / tokens_per_second if tokens_per_second > 0 else 0.0
+    
+    @staticmethod
+    def embed(texts: List[str], dimensions: int = None) -> SimpleNamespace:
+        return SimpleNamespace(
+            data=[SimpleNamespace(embedding=hash_embedding(text, dimensions), index=i) for i, text in enumerate(texts)],
+            model=LOCAL_EMBEDDING_DEPLOYMENT
+        )
+    
+    @staticmethod
+    def tokens(messages: List[Dict]) -> List[str]:
+        """프롬프트에서 질문 / 문서를 뽑아 답변을 조립한 뒤 토큰(단어 + 공백) 단위로 분리"""
+        system = messages[0]["content"] if messages else ""
+        prompt = messages[-1]["content"] if messages else ""
+        
+        query_match = re.search(r"(?:사용자 질문|질문):\s*(.+)", prompt)
+        query = query_match.group(1).strip() if query_match else ""
+        
+        if "액션 아이템" in system:
+            # "관련 정보:" 아래 문서 내용의 앞부분 몇 줄을 항목으로 사용
+            context = prompt.split("관련 정보:", 1)[-1]
+            lines = [
+                line.strip() for line in context.splitlines()
+                if line.strip() and not line.strip().startswith("각 항목")
+            ][:4]
+            items = [f"- {line[:40]} 확인 후 후속 조치" for line in lines]
+            items.append(f"- '{query}' 관련 진행 상황 공유")
+            text = "\n".join(items)
+        else:
+            # build_summary_messages 형식: "[출처] 제목" 다음 줄이 "작성일: ..."
+            sources = re.findall(r"^\[([^\]]+)\] (.+)\n작성일: (.*)$", prompt, re.MULTILINE)
+            references = "\n".join(f"- [{source}] {title.strip()} ({date})" for source, title, date in sources)
+            text = (
+                "## 📋 업무 맥락 분석 결과\n\n"
+                f"### 🎯 핵심 요약\n'{query}'에 대한 관련 문서 {len(sources)}개를 바탕으로 정리한 로컬 모델 응답입니다.\n\n"
+                f"### 🔑 핵심 내용\n{references}\n"
+            )
+        
+        return re.findall(r"\S+\s*|\s+", text)
+    
+    @staticmethod
+    def completion(tokens: List[str]) -> SimpleNamespace:
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content="".join(tokens)), finish_reason="stop")],
+            usage=SimpleNamespace(completion_tokens=len(tokens))
+        )
+    
+    @staticmethod
+    def chunk(token: str) -> SimpleNamespace:
+        return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=token))])
+
+
+class LocalOpenAI:
+    """AzureOpenAI 대체 (동기). embeddings.create / chat.completions.create만 지원"""
+    
+    def __init__(self):
+        self._model = _FakeModel()
+        self.embeddings = SimpleNamespace(create=self._create_embeddings)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create_completion))
+    
+    def _create_embeddings(self, model: str = None, input=None, dimensions: int = None, **kwargs):
+        time.sleep(self._model.embedding_latency)
+        return self._model.embed(input if isinstance(input, list) else [input], dimensions)
+    
+    def _create_completion(self, model: str = None, messages: List[Dict] = None, stream: bool = False, **kwargs):
+        tokens = self._model.tokens(messages or [])
+        if stream:
+            return self._stream(tokens)
+        time.sleep(self._model.first_token_latency + self._model.token_interval * len(tokens))
+        return self._model.completion(tokens)
+    
+    def _stream(self, tokens: List[str]) -> Iterator[SimpleNamespace]:
+        time.sleep(self._model.first_token_latency)
+        for token in tokens:
+            yield self._model.chunk(token)
+            time.sleep(self._model.token_interval)
+    
+    def close(self):
+        """정리할 연결 없음 (AzureOpenAI 호환)"""
+
+
+class AsyncLocalOpenAI:
+    """AsyncAzureOpenAI 대체 (비동기). embeddings.create / chat.completions.create만 지원"""
+    
+    def __init__(self):
+        self._model = _FakeModel()
+        self.embeddings = SimpleNamespace(create=self._create_embeddings)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create_completion))
+    
+    async def _create_embeddings(self, model: str = None, input=None, dimensions: int = None, **kwargs):
+        await asyncio.sleep(self._model.embedding_latency)
+        return self._model.embed(input if isinstance(input, list) else [input], dimensions)
+    
+    async def _create_completion(self, model: str = None, messages: List[Dict] = None, stream: bool = False, **kwargs):
+        tokens = self._model.tokens(messages or [])
+        if stream:
+            return self._stream(tokens)
+        await asyncio.sleep(self._model.first_token_latency + self._model.token_interval * len(tokens))
+        return self._model.completion(tokens)
+    
+    async def _stream(self, tokens: List[str]) -> AsyncIterator[SimpleNamespace]:
+        await asyncio.sleep(self._model.first_token_latency)
+        for token in tokens:
+            yield self._model.chunk(token)
+            await asyncio.sleep(self._model.token_interval)
+    
+    async def close(self):
+        """정리할 연결 없음 (AsyncAzureOpenAI 호환)"""
@@ -0,0 +1,442 @@
+"""
+프로세스 내 검색 서비스
+Azure AI Search 대신 메모리에 올린 문서 / 벡터 인덱스로 hybrid_search 처리
+
+KITE_SEARCH_BACKEND=local 로 선택 (기본값은 KITE_BACKEND를 따름).
+- 문서 출처: 로컬 Blob 디렉터리(KITE_BACKEND=local) 또는 Azure AI Search 인덱스 스냅샷
+- 벡터: VectorIndex (float32 행렬, 정확한 코사인 top-k / KITE_VECTOR_COMPRESSION이면 양자화 + 재계산)
+- 키워드: BM25Index (한국어 조사 제거 + 글자 bigram)
+- 결합: RRF (Azure AI Search 하이브리드 검색과 같은 방식)
+"""
+import os
+import asyncio
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Set
+from dotenv import load_dotenv
+
+from backend.service.azure_search import DOCUMENT_FIELDS, AzureSearchService
+from backend.service.blob_batches import BATCH_PREFIX, blob_layout, read_batches, sync_batches
+from backend.service.bm25_index import BM25Index
+from backend.service.chunking import CHUNK_FIELDS, chunk_documents, index_mode, merge_chunk_document
+from backend.service.local_backend import LocalBlobService, hash_embedding, use_local_backend
+from backend.service.query_filters import FilterIndex
+from backend.service.rank_fusion import reciprocal_rank_fusion
+from backend.service.snippets import highlight_snippet, lead_snippet
+from backend.service.vector_compression import (
+    embedding_request_options,
+    vector_compression,
+    vector_oversampling,
+    vector_rescore
+)
+from backend.service.vector_store import VectorIndex
+
+load_dotenv()
+
+# 하이브리드 검색에서 키워드 검색 후보 수 (Azure AI Search 하이브리드 쿼리의 텍스트 후보 수와 동일)
+KEYWORD_CANDIDATES = 50
+
+# 스냅샷을 내려받을 때 요청 하나의 문서 수 (Azure AI Search top 최대값)
+_SNAPSHOT_PAGE_SIZE = 1000
+
+
+def use_local_search() -> bool:
+    """KITE_SEARCH_BACKEND=local 이면 True (설정이 없으면 KITE_BACKEND를 따름)"""
+    default = "local" if use_local_backend() else "azure"
+    return os.getenv("KITE_SEARCH_BACKEND", default).strip().lower() == "local"
+
+
+class BlobDocumentSource:
+    """
+    로컬 Blob 디렉터리 문서 출처
+    
+    content_vector는 해시 임베딩으로 계산한다 (로컬 백엔드의 쿼리 임베딩과 같은 공간, 같은 차원).
+    KITE_INDEX_MODE=chunk 이면 문서를 청크로 나눠 청크마다 색인한다.
+    KITE_BLOB_LAYOUT=jsonl 이면 JSON Lines 배치를 올린 순서대로 읽는다 (변경분 / tombstone 반영).
+    디렉터리가 비어 있으면 샘플 문서로 채운다 (KITE_LOCAL_SEED_SAMPLES=false로 끄기).
+    """
+    
+    def __init__(self, blob_service: LocalBlobService = None):
+        self.blob_service = blob_service or LocalBlobService()
+        self.layout = blob_layout()
+        
+        if not self._blob_names() and os.getenv("KITE_LOCAL_SEED_SAMPLES", "true").lower() == "true":
+            from data.sample_documents import get_sample_documents
+            if self.layout == "jsonl":
+                sync_batches(self.blob_service, get_sample_documents())
+            else:
+                self.blob_service.upload_documents(get_sample_documents())
+    
+    def _blob_names(self) -> List[str]:
+        return self.blob_service.list_blobs(prefix=BATCH_PREFIX if self.layout == "jsonl" else None)
+    
+    def version(self) -> Optional[str]:
+        """디렉터리 변경 감지용 버전 (파일 개수 + 가장 최근 수정 시각)"""
+        paths = [self.blob_service.root / name for name in self._blob_names()]
+        latest = max((path.stat().st_mtime_ns for path in paths), default=0)
+        return f"{len(paths)}:{latest}"
+    
+    def load(self) -> List[Dict]:
+        chunked = index_mode() == "chunk"
+        dimensions = embedding_request_options().get("dimensions")
+        if self.layout == "jsonl":
+            sources = read_batches(self.blob_service)
+        else:
+            sources = (self.blob_service.download_blob(name) for name in self.blob_service.list_blobs())
+        documents = []
+        for doc in sources:
+            if not doc:
+                continue
+            for item in (chunk_documents(doc) if chunked else [doc]):
+                item["content_vector"] = hash_embedding(f"{item.get('title', '')}\n{item.get('content', '')}", dimensions)
+                documents.append(item)
+        return documents
+    
+    def trigger(self) -> bool:
+        """원격 인덱서 없음 (load가 곧 인덱싱)"""
+        return True
+
+
+class AzureIndexSnapshotSource:
+    """
+    Azure AI Search 인덱스 스냅샷 출처
+    
+    인덱서가 만든 문서 + content_vector를 내려받아 메모리에서 검색한다.
+    Azure 인덱서의 마지막 성공 시각이 바뀌면 다시 내려받는다.
+    skip 페이지네이션은 100,000건에서 끊기므로 id 순으로 정렬해서 "id gt 마지막 id" 조건으로 페이지를 넘긴다
+    (id 필드가 filterable / sortable이어야 함, create_index 참고).
+    """
+    
+    def __init__(self, search_service: AzureSearchService = None):
+        self.search_service = search_service or AzureSearchService()
+    
+    def version(self) -> Optional[str]:
+        return self.search_service.get_indexer_status().get("last_success_time")
+    
+    def load(self) -> List[Dict]:
+        chunk_fields = CHUNK_FIELDS if self.search_service.index_mode == "chunk" else ()
+        client = self.search_service.get_search_client()
+        documents: List[Dict] = []
+        while True:
+            after = documents[-1]["id"].replace("'", "''") if documents else None
+            results = client.search(
+                search_text="*",
+                select=[*DOCUMENT_FIELDS, *chunk_fields, "content_vector"],
+                filter=f"id gt '{after}'" if after is not None else None,
+                order_by=["id asc"],
+                top=_SNAPSHOT_PAGE_SIZE
+            )
+            page = [dict(result) for result in results]
+            documents.extend(page)
+            if len(page) < _SNAPSHOT_PAGE_SIZE:
+                return documents
+    
+    def trigger(self) -> bool:
+        return self.search_service.run_indexer()
+
+
+def _stored_fields(doc: Dict) -> Dict:
+    """메모리에 보관할 필드 (청크면 parent_id / chunk_index 포함)"""
+    fields = DOCUMENT_FIELDS + CHUNK_FIELDS if doc.get("parent_id") else DOCUMENT_FIELDS
+    return {field: doc.get(field) for field in fields}
+
+
+def default_document_source():
+    """KITE_BACKEND=local이면 로컬 Blob 디렉터리, 아니면 Azure 인덱스 스냅샷"""
+    if use_local_backend():
+        return BlobDocumentSource()
+    return AzureIndexSnapshotSource()
+
+
+class LocalSearchService:
+    """
+    메모리 문서 저장소 기반 검색 서비스 (AzureSearchService와 같은 메서드)
+    
+    - 인덱서 실행 / 상태 조회 시 출처 버전이 바뀌었으면 바뀐 문서만 반영 (추가 / 수정 / 삭제)
+    - upsert_documents / delete_documents로 직접 갱신 가능
+    - 하이브리드 검색 = 키워드(BM25) 순위 + 벡터(코사인) 순위를 RRF로 결합
+    - 필터(채널 / 작성자 / 날짜)가 있으면 조건에 맞는 문서 안에서만 검색 (pre-filter)
+    """
+    
+    def __init__(self, source=None):
+        self.source = source or default_document_source()
+        chunked = index_mode() == "chunk"
+        self.index_name = "kite-chunks" if chunked else "kite-documents"
+        self.indexer_name = "kite-chunk-indexer" if chunked else "kite-indexer"
+        
+        self._lock = threading.RLock()
+        self._documents: Dict[str, Dict] = {}
+        self._chunks_by_parent: Dict[str, set] = {}
+        self._vectors = VectorIndex(
+            compression=vector_compression(),
+            rescore=vector_rescore(),
+            oversampling=vector_oversampling()
+        )
+        self._keywords = BM25Index()
+        self._filters = FilterIndex()
+        self._history: List[Dict] = []
+        self._source_version = None
+        
+        self.refresh()
+        print(f"✅ 로컬 검색 서비스 초기화 완료 (문서 {len(self._documents)}개)")
+    
+    # Azure 설정 단계는 로컬에서 할 일이 없음 (scripts/setup_indexer.py 호환)
+    def create_data_source(self) -> bool:
+        return True
+    
+    def create_index(self) -> bool:
+        return True
+    
+    def create_skillset(self) -> bool:
+        return True
+    
+    def create_indexer(self) -> bool:
+        return True
+    
+    def __len__(self) -> int:
+        return len(self._documents)
+    
+    def upsert_documents(self, documents: List[Dict]) -> int:
+        """
+        문서 추가 / 수정 (content_vector 필드 필요)
+        
+        Returns:
+            반영한 문서 개수
+        """
+        documents = [doc for doc in documents if doc.get("id") and doc.get("content_vector")]
+        if not documents:
+            return 0
+        
+        with self._lock:
+            self._vectors.add([doc["id"] for doc in documents], [doc["content_vector"] for doc in documents])
+            # 제목은 두 번 넣어서 가중치
+            self._keywords.add_many(
+                (doc["id"], f"{doc.get('title') or ''}\n{doc.get('title') or ''}\n{doc.get('content') or ''}")
+                for doc in documents
+            )
+            for doc in documents:
+                self._documents[doc["id"]] = _stored_fields(doc)
+                self._filters.add(doc["id"], doc)
+                if doc.get("parent_id"):
+                    self._chunks_by_parent.setdefault(doc["parent_id"], set()).add(doc["id"])
+        
+        return len(documents)
+    
+    def delete_documents(self, ids: Iterable[str]) -> int:
+        """
+        문서 삭제
+        
+        Returns:
+            삭제한 문서 개수
+        """
+        with self._lock:
+            ids = [doc_id for doc_id in ids if doc_id in self._documents]
+            self._keywords.delete(ids)
+            self._vectors.delete(ids)
+            for doc_id in ids:
+                self._filters.remove(doc_id)
+                parent_id = self._documents.pop(doc_id).get("parent_id")
+                if parent_id:
+                    siblings = self._chunks_by_parent[parent_id]
+                    siblings.discard(doc_id)
+                    if not siblings:
+                        del self._chunks_by_parent[parent_id]
+        return len(ids)
+    
+    def refresh(self, force: bool = False) -> bool:
+        """
+        출처 버전이 바뀌었으면 문서를 다시 읽어서 바뀐 것만 반영
+        
+        Returns:
+            성공 여부 (바뀐 것이 없어도 True)
+        """
+        try:
+            version = self.source.version()
+            if not force and self._history and version == self._source_version:
+                return True
+            
+            start_time = datetime.now(timezone.utc)
+            documents = {doc["id"]: doc for doc in self.source.load() if doc.get("id")}
+            
+            with self._lock:
+                changed = [
+                    doc for doc_id, doc in documents.items()
+                    if self._documents.get(doc_id) != _stored_fields(doc)
+                ]
+                removed = [doc_id for doc_id in self._documents if doc_id not in documents]
+                
+                self.upsert_documents(changed)
+                self.delete_documents(removed)
+                self._source_version = version
+                
+                self._history.insert(0, {
+                    "status": "success",
+                    "start_time": start_time.isoformat(),
+                    "end_time": datetime.now(timezone.utc).isoformat(),
+                    "items_processed": len(changed) + len(removed),
+                    "items_failed": 0
+                })
+                del self._history[5:]
+            
+            print(f"✅ 로컬 인덱스 갱신: 변경 {len(changed)}개 / 삭제 {len(removed)}개 (전체 {len(documents)}개)")
+            return True
+        
+        except Exception as e:
+            print(f"❌ 로컬 인덱스 갱신 실패: {str(e)}")
+            return False
+    
+    def run_indexer(self) -> bool:
+        """원격 인덱서 실행(있으면) + 로컬 인덱스 갱신"""
+        return self.source.trigger() and self.refresh(force=True)
+    
+    def get_indexer_status(self) -> Dict:
+        """
+        인덱서 상태 (AzureSearchService.get_indexer_status와 같은 형식)
+        
+        출처가 바뀌었으면 먼저 갱신하므로, 주기적인 상태 조회(main.watch_corpus_version)가
+        Azure 인덱서의 스케줄 실행처럼 동작한다.
+        """
+        self.refresh()
+        
+        with self._lock:
+            history = list(self._history)
+        
+        last = history[0] if history else None
+        return {
+            "status": "running",
+            "last_result": last["status"] if last else None,
+            "execution_history": len(history),
+            "last_success_time": next(
+                (run["end_time"] for run in history if run["status"] == "success"), None
+            )
+        }
+    
+    def get_document(self, doc_id: str) -> Optional[Dict]:
+        """문서 전체 조회 (청크 색인이면 청크를 이어 붙여 복원, 없으면 None)"""
+        with self._lock:
+            chunk_ids = self._chunks_by_parent.get(doc_id)
+            if chunk_ids:
+                return merge_chunk_document(doc_id, [self._documents[chunk_id] for chunk_id in chunk_ids])
+            document = self._documents.get(doc_id)
+            return {field: document.get(field) for field in DOCUMENT_FIELDS} if document else None
+    
+    def _result(self, doc_id: str, score: float, query: str = None) -> Dict:
+        """검색 결과 한 건 (질문이 있으면 일치 단어 스니펫, 없으면 앞부분)"""
+        document = self._documents[doc_id]
+        content = document.get("content") or ""
+        snippet = highlight_snippet(content, query) if query else lead_snippet(content)
+        return {**document, "score": score, "snippet": snippet}
+    
+    def _candidates(self, filters: Optional[Dict]) -> Optional[Set[str]]:
+        """필터 조건에 맞는 문서 ID (필터가 없으면 None = 전체, 필드별 posting으로 계산)"""
+        return self._filters.candidates(filters)
+    
+    def keyword_search(self, query: str, k: int = KEYWORD_CANDIDATES, filters: Dict = None) -> List[Dict]:
+        """키워드(BM25) 검색만 실행"""
+        with self._lock:
+            return [
+                self._result(doc_id, score, query)
+                for doc_id, score in self._keywords.search(query, k, self._candidates(filters))
+            ]
+    
+    def _vector_ranking(self, query_vector: List[float], k: int, allowed: Optional[Set[str]] = None) -> List[str]:
+        if not query_vector or len(query_vector) != self._vectors.dim:
+            return []
+        return [doc_id for doc_id, _ in self._vectors.search(query_vector, k, allowed)]
+    
+    def vector_search(self, query_vector: List[float], k: int = 5, filters: Dict = None) -> List[Dict]:
+        """벡터(코사인) 검색만 실행"""
+        with self._lock:
+            if not query_vector or len(query_vector) != self._vectors.dim:
+                return []
+            return [
+                self._result(doc_id, score)
+                for doc_id, score in self._vectors.search(query_vector, k, self._candidates(filters))
+            ]
+    
+    def hybrid_search(
+        self,
+        query: str,
+        query_vector: List[float],
+        top: int = 5,
+        filters: Dict = None
+    ) -> List[Dict]:
+        """하이브리드 검색 (키워드 + 벡터, RRF 결합)"""
+        with self._lock:
+            allowed = self._candidates(filters)
+            keyword_ranking = [
+                doc_id for doc_id, _ in self._keywords.search(query, max(top, KEYWORD_CANDIDATES), allowed)
+            ]
+            fused = reciprocal_rank_fusion(
+                [keyword_ranking, self._vector_ranking(query_vector, top, allowed)],
+                limit=top
+            )
+            return [self._result(doc_id, score, query) for doc_id, score in fused]
+    
+    def stats(self) -> Dict:
+        """인덱스 상태 (헬스 체크용)"""
+        return {
+            "documents": len(self._documents),
+            "keywords": self._keywords.stats(),
+            "vectors": self._vectors.stats()
+        }
+
+
+class AsyncLocalSearchService:
+    """
+    LocalSearchService 비동기 래퍼 (AsyncAzureSearchService와 같은 메서드)
+    
+    KITE_LOCAL_SEARCH_LATENCY_MS 만큼 네트워크 왕복 지연을 흉내 낸다
+    (기본값: 로컬 백엔드에서는 20ms, Azure 대신 쓰는 경우에는 0).
+    """
+    
+    def __init__(self, search_service: LocalSearchService = None):
+        self.search_service = search_service or LocalSearchService()
+        self.index_name = self.search_service.index_name
+        self.indexer_name = self.search_service.indexer_name
+        default_latency = "20" if use_local_backend() else "0"
+        self.latency = float(os.getenv("KITE_LOCAL_SEARCH_LATENCY_MS", default_latency)) / 1000
+    
+    async def run_indexer(self) -> bool:
+        """인덱서 실행 (이벤트 루프를 막지 않도록 스레드에서)"""
+        return await asyncio.to_thread(self.search_service.run_indexer)
+    
+    async def get_indexer_status(self) -> Dict:
+        """인덱서 상태 (출처 확인 / 갱신이 있으므로 스레드에서)"""
+        return await asyncio.to_thread(self.search_service.get_indexer_status)
+    
+    async def hybrid_search(
+        self,
+        query: str,
+        query_vector: List[float],
+        top: int = 5,
+        filters: Dict = None
+    ) -> List[Dict]:
+        """하이브리드 검색"""
+        return await self._run(self.search_service.hybrid_search, query, query_vector, top, filters)
+    
+    async def _run(self, func, *args):
+        """
+        지연 흉내 후 스레드에서 실행
+        
+        문서 수와 관계없이 항상 스레드에서 실행한다. 검색은 refresh()가 감시 스레드에서 잡고 있는
+        RLock을 기다릴 수 있어서, 이벤트 루프에서 바로 실행하면 갱신 한 번에 모든 요청이 멈춘다.
+        """
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return await asyncio.to_thread(func, *args)
+    
+    async def get_document(self, doc_id: str) -> Optional[Dict]:
+        """문서 전체 조회"""
+        return await self._run(self.search_service.get_document, doc_id)
+    
+    async def keyword_search(self, query: str, top: int = KEYWORD_CANDIDATES, filters: Dict = None) -> List[Dict]:
+        """키워드 검색만 실행"""
+        return await self._run(self.search_service.keyword_search, query, top, filters)
+    
+    async def vector_search(self, query_vector: List[float], top: int = 5, filters: Dict = None) -> List[Dict]:
+        """벡터 검색만 실행"""
+        return await self._run(self.search_service.vector_search, query_vector, top, filters)
+    
+    async def close(self):
+        """정리할 연결 없음 (AsyncAzureSearchService 호환)"""
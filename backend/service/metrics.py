@@ -0,0 +1,99 @@
+"""
+파이프라인 지표 (Prometheus)
+단계별 지연 시간 / 프롬프트 토큰 히스토그램, 오류 / 캐시 카운터, 진행 중 요청 게이지
+"""
+import time
+from contextlib import contextmanager
+from typing import Awaitable, Dict, Optional
+from prometheus_client import Counter, Gauge, Histogram, generate_latest, CONTENT_TYPE_LATEST
+
+# LLM 호출까지 고려한 버킷 (5ms ~ 30s)
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 15.0, 30.0)
+
+STAGE_LATENCY = Histogram(
+    "kite_stage_duration_seconds",
+    "파이프라인 단계별 소요 시간",
+    ["stage"],
+    buckets=_LATENCY_BUCKETS
+)
+STAGE_ERRORS = Counter(
+    "kite_stage_errors_total",
+    "파이프라인 단계별 오류 수",
+    ["stage"]
+)
+STAGE_INFLIGHT = Gauge(
+    "kite_stage_inflight",
+    "현재 진행 중인 단계 수",
+    ["stage"]
+)
+CACHE_REQUESTS = Counter(
+    "kite_cache_requests_total",
+    "캐시 조회 결과 수",
+    ["cache", "result"]
+)
+
+PROMPT_CONTEXT_TOKENS = Histogram(
+    "kite_prompt_context_tokens",
+    "프롬프트에 넣은 문서 컨텍스트 토큰 수",
+    ["prompt"],
+    buckets=(64, 128, 256, 512, 1024, 1536, 2048, 3072, 4096, 8192)
+)
+
+# /metrics 응답 Content-Type
+METRICS_CONTENT_TYPE = CONTENT_TYPE_LATEST
+
+
+@contextmanager
+def track_stage(stage: str, timings: Optional[Dict] = None):
+    """
+    단계 실행 시간 / 오류 / 진행 중 개수 기록
+    
+    timings 딕셔너리를 넘기면 {stage: 밀리초}도 함께 기록한다 (응답 metadata용).
+    블록 안에서 예외가 나면 오류 카운터를 올리고 예외는 그대로 전파한다.
+    """
+    STAGE_INFLIGHT.labels(stage).inc()
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        STAGE_ERRORS.labels(stage).inc()
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_LATENCY.labels(stage).observe(elapsed)
+        STAGE_INFLIGHT.labels(stage).dec()
+        if timings is not None:
+            timings[stage] = round(elapsed * 1000, 1)
+
+
+async def timed(stage: str, awaitable: Awaitable, timings: Optional[Dict] = None):
+    """코루틴 하나를 track_stage로 감싸서 실행 (asyncio.gather와 함께 사용)"""
+    with track_stage(stage, timings):
+        return await awaitable
+
+
+def observe(stage: str, seconds: float, timings: Optional[Dict] = None):
+    """블록으로 감쌀 수 없는 구간(스트리밍 첫 토큰 등) 직접 기록"""
+    STAGE_LATENCY.labels(stage).observe(seconds)
+    if timings is not None:
+        timings[stage] = round(seconds * 1000, 1)
+
+
+def record_error(stage: str):
+    """내부에서 처리(기본값 대체)한 오류 기록"""
+    STAGE_ERRORS.labels(stage).inc()
+
+
+def record_cache(cache: str, result: str):
+    """캐시 조회 결과 기록 (result: hit / miss 등)"""
+    CACHE_REQUESTS.labels(cache, result).inc()
+
+
+def record_prompt_tokens(prompt: str, tokens: int):
+    """프롬프트 컨텍스트 토큰 수 기록 (prompt: summary / action_items)"""
+    PROMPT_CONTEXT_TOKENS.labels(prompt).observe(tokens)
+
+
+def render_metrics() -> bytes:
+    """Prometheus 텍스트 포맷으로 전체 지표 출력"""
+    return generate_latest()
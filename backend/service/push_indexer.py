@@ -0,0 +1,226 @@
+"""
+푸시 방식 색인 (Blob → 인덱서 스케줄(PT5M) → 스킬셋 임베딩을 거치지 않고 바로 인덱스에 올림)
+
+클라이언트에서 문서를 임베딩한 뒤 SearchClient의 merge_or_upload로 바로 올리므로
+업로드가 끝나면 몇 초 안에 검색된다. Blob / 인덱서 경로는 그대로 두고 대체 경로로 쓴다
+(문서 색인은 두 경로 모두 키가 문서 ID이고 임베딩 입력도 같으므로 같은 문서를 양쪽으로 올려도 한 건).
+
+- 임베딩: 스킬셋과 같은 입력(content)을 KITE_PUSH_EMBEDDING_BATCH개씩 한 번에 요청 (임베딩 캐시 사용)
+- 업로드: 요청 하나가 KITE_PUSH_BATCH_BYTES(기본 8MB, 서비스 한도 16MB) / 1000개를 넘지 않게 묶음
+  (벡터가 문서당 수십 KB라 개수보다 크기가 먼저 한도에 걸림)
+- 재시도: 요청 전체 실패(429 / 5xx / 연결 오류)는 배치를 다시, 일부 문서만 실패(207)하면
+  재시도 가능한 상태(409 / 422 / 429 / 503)의 문서만 다시 올린다 (지수 백오프 + 지터, KITE_PUSH_RETRIES회)
+
+청크 색인(KITE_INDEX_MODE=chunk)은 지원하지 않는다. 인덱서 경로의 청크 키는 인덱스 프로젝션이
+서비스에서 만들기 때문에 클라이언트가 같은 키로 올릴 수 없고, 양쪽으로 올리면 kite-chunks에
+같은 청크가 두 벌 남는다 (PushIndexer를 만들 때 ValueError).
+"""
+import os
+import json
+import time
+import random
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+from azure.core.exceptions import HttpResponseError, ServiceRequestError, ServiceResponseError
+from openai import AzureOpenAI
+from dotenv import load_dotenv
+from backend.service.azure_search import DOCUMENT_FIELDS, AzureSearchService
+from backend.service.chunking import index_mode
+from backend.service.embedding_cache import EmbeddingCache
+from backend.service.local_backend import LocalOpenAI, use_local_backend
+from backend.service.query_filters import attach_filter_fields
+from backend.service.rag_service import embed_texts
+
+load_dotenv()
+
+# Azure AI Search 인덱스 업로드 요청 하나의 최대 문서 수
+MAX_DOCUMENTS_PER_REQUEST = 1000
+
+# 문서 단위로 다시 올릴 상태 코드 (버전 충돌 / 인덱스 일시 불가 / 스로틀링)
+RETRYABLE_DOCUMENT_STATUS = {409, 422, 429, 503}
+RETRYABLE_REQUEST_STATUS = {408, 429, 500, 502, 503, 504}
+
+_RETRY_BASE_SECONDS = 0.5
+_RETRY_MAX_SECONDS = 30.0
+
+
+def push_batch_bytes() -> int:
+    """KITE_PUSH_BATCH_BYTES (업로드 요청 하나의 최대 크기, 기본 8MB)"""
+    return max(int(os.getenv("KITE_PUSH_BATCH_BYTES", str(8 * 1024 * 1024))), 64 * 1024)
+
+
+def push_embedding_batch() -> int:
+    """KITE_PUSH_EMBEDDING_BATCH (임베딩 요청 하나의 입력 수, 기본 256)"""
+    return max(int(os.getenv("KITE_PUSH_EMBEDDING_BATCH", "256")), 1)
+
+
+def push_retries() -> int:
+    """KITE_PUSH_RETRIES (기본 5)"""
+    return max(int(os.getenv("KITE_PUSH_RETRIES", "5")), 0)
+
+
+def _backoff(attempt: int) -> float:
+    return random.uniform(0, min(_RETRY_BASE_SECONDS * 2 ** attempt, _RETRY_MAX_SECONDS))
+
+
+def check_push_supported():
+    """푸시 색인은 문서 색인에서만 (청크 색인이면 ValueError, 모듈 docstring 참고)"""
+    if index_mode() == "chunk":
+        raise ValueError(
+            "청크 색인(KITE_INDEX_MODE=chunk)에서는 푸시 색인을 쓸 수 없습니다 "
+            "(청크 키가 인덱서와 달라 중복 청크가 생김). Blob / 인덱서 경로로 올리세요"
+        )
+
+
+def to_index_document(document: Dict) -> Dict:
+    """원본 문서 → 인덱스 문서 (인덱서의 필드 매핑과 같은 필드, content_vector는 아직 없음)"""
+    return attach_filter_fields({field: document.get(field) for field in DOCUMENT_FIELDS})
+
+
+def pack_by_bytes(documents: Iterable[Dict], max_bytes: int, max_count: int = MAX_DOCUMENTS_PER_REQUEST) -> Iterator[List[Dict]]:
+    """직렬화 크기 합이 max_bytes 이하(개수는 max_count 이하)가 되도록 묶기"""
+    batch, size = [], 0
+    for document in documents:
+        document_size = len(json.dumps(document, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+        if batch and (size + document_size > max_bytes or len(batch) >= max_count):
+            yield batch
+            batch, size = [], 0
+        batch.append(document)
+        size += document_size
+    if batch:
+        yield batch
+
+
+class PushIndexer:
+    """
+    클라이언트 임베딩 + merge_or_upload 배치 업로드
+    
+    push(documents)는 원본 문서 이터러블을 받아서 임베딩 배치 단위로 흘려보내므로
+    문서 수만큼 메모리를 쓰지 않는다.
+    """
+    
+    def __init__(self, search_client=None, openai_client=None, embedding_cache: EmbeddingCache = None):
+        check_push_supported()
+        self.search_client = search_client or AzureSearchService().get_search_client()
+        if openai_client is not None:
+            self.openai_client = openai_client
+        elif use_local_backend():
+            self.openai_client = LocalOpenAI()
+        else:
+            self.openai_client = AzureOpenAI(
+                api_key=os.getenv("AZURE_OPENAI_API_KEY"),
+                api_version=os.getenv("AZURE_OPENAI_API_VERSION"),
+                azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT")
+            )
+        self.embedding_cache = embedding_cache or EmbeddingCache()
+        self.max_bytes = push_batch_bytes()
+        self.embedding_batch = push_embedding_batch()
+        self.max_retries = push_retries()
+    
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """텍스트 목록 임베딩 (캐시에 없는 것만 KITE_PUSH_EMBEDDING_BATCH개씩 요청, 실패하면 예외 전파)"""
+        return embed_texts(self.openai_client, self.embedding_cache, texts, self.embedding_batch)
+    
+    def upload(self, documents: List[Dict]) -> Dict:
+        """
+        인덱스 문서 배치 업로드 (merge_or_upload, 실패한 문서만 재시도)
+        
+        Returns:
+            {"succeeded": 개수, "failed": [실패한 문서 키], "retries": 재시도 횟수}
+        """
+        pending = documents
+        failed: List[str] = []
+        retries = 0
+        for attempt in range(self.max_retries + 1):
+            try:
+                results = self.search_client.merge_or_upload_documents(documents=pending)
+            except (HttpResponseError, ServiceRequestError, ServiceResponseError) as e:
+                status = getattr(e, "status_code", None)
+                if (status is not None and status not in RETRYABLE_REQUEST_STATUS) or attempt == self.max_retries:
+                    print(f"❌ 인덱스 업로드 실패: {len(pending)}개, {str(e)}")
+                    break
+                retries += 1
+                time.sleep(_backoff(attempt))
+                continue
+            
+            by_key = {document["id"]: document for document in pending}
+            retry = []
+            for result in results:
+                if result.succeeded:
+                    continue
+                if result.status_code in RETRYABLE_DOCUMENT_STATUS and attempt < self.max_retries:
+                    retry.append(by_key[result.key])
+                else:
+                    failed.append(result.key)
+                    print(f"❌ 문서 색인 실패: {result.key}, HTTP {result.status_code} {result.error_message}")
+            pending = retry
+            if not retry:
+                break
+            retries += 1
+            time.sleep(_backoff(attempt))
+        
+        failed.extend(document["id"] for document in pending)
+        return {"succeeded": len(documents) - len(failed), "failed": failed, "retries": retries}
+    
+    def push(self, documents: Iterable[Dict], on_progress: Optional[Callable[[Dict], None]] = None) -> Dict:
+        """
+        원본 문서를 임베딩해서 인덱스에 바로 올리기
+        
+        Returns:
+            {"documents", "index_documents", "succeeded", "failed", "retries", "embedding_seconds",
+             "upload_seconds", "elapsed_seconds", "failed_ids"} (failed_ids: 실패한 원본 문서 ID)
+        """
+        stats = {
+            "documents": 0, "index_documents": 0, "succeeded": 0, "failed": 0, "retries": 0,
+            "embedding_seconds": 0.0, "upload_seconds": 0.0
+        }
+        failed_ids = set()
+        started = time.perf_counter()
+        
+        def with_vectors(group: List[Dict]) -> List[Dict]:
+            # 임베딩이 실패한 묶음은 실패로 집계하고 다음 묶음 계속
+            embedding_started = time.perf_counter()
+            try:
+                vectors = self.embed([document.get("content") or document.get("title") or "-" for document in group])
+            except Exception as e:
+                print(f"❌ 임베딩 실패: {len(group)}개, {str(e)}")
+                stats["index_documents"] += len(group)
+                stats["failed"] += len(group)
+                failed_ids.update(document["id"] for document in group)
+                return []
+            finally:
+                stats["embedding_seconds"] += time.perf_counter() - embedding_started
+            return [{**document, "content_vector": vector} for document, vector in zip(group, vectors)]
+        
+        def embedded() -> Iterator[Dict]:
+            group: List[Dict] = []
+            for document in documents:
+                stats["documents"] += 1
+                group.append(to_index_document(document))
+                if len(group) >= self.embedding_batch:
+                    yield from with_vectors(group)
+                    group = []
+            if group:
+                yield from with_vectors(group)
+        
+        for batch in pack_by_bytes(embedded(), self.max_bytes):
+            upload_started = time.perf_counter()
+            result = self.upload(batch)
+            stats["upload_seconds"] += time.perf_counter() - upload_started
+            stats["index_documents"] += len(batch)
+            stats["succeeded"] += result["succeeded"]
+            stats["failed"] += len(result["failed"])
+            stats["retries"] += result["retries"]
+            failed_ids.update(result["failed"])
+            if on_progress:
+                on_progress({**stats, "elapsed_seconds": round(time.perf_counter() - started, 2)})
+        
+        return {
+            **stats,
+            "embedding_seconds": round(stats["embedding_seconds"], 2),
+            "upload_seconds": round(stats["upload_seconds"], 2),
+            "elapsed_seconds": round(time.perf_counter() - started, 2),
+            "failed_ids": sorted(failed_ids)
+        }
+    
+    def close(self):
+        self.embedding_cache.close()
@@ -0,0 +1,304 @@
+"""
+/analyze 결과 캐시
+- QueryResultCache: 정규화된 질문 + 검색 파라미터를 키로 하는 TTL / LRU 캐시
+- SemanticCache: 질문 임베딩 유사도로 비슷한 질문의 답변을 재사용하는 캐시
+"""
+import os
+import re
+import json
+import time
+import threading
+import unicodedata
+from typing import Dict, List, Optional
+import numpy as np
+from cachetools import TTLCache
+from dotenv import load_dotenv
+
+from backend.service.metrics import record_cache
+
+load_dotenv()
+
+
+def normalize_query(query: str) -> str:
+    """
+    캐시 키용 질문 정규화
+    
+    유니코드 정규화(NFKC) → 소문자 → 연속 공백 정리 → 끝 문장부호 제거
+    예: "  마감일이   언제야?? " → "마감일이 언제야"
+    """
+    text = unicodedata.normalize("NFKC", query).lower()
+    text = re.sub(r"\s+", " ", text).strip()
+    return text.rstrip("?!.~ ")
+
+
+def make_cache_key(query: str, **params) -> str:
+    """정규화된 질문 + 검색 파라미터(top 등)로 캐시 키 생성"""
+    return json.dumps(
+        {"query": normalize_query(query), **params},
+        ensure_ascii=False,
+        sort_keys=True
+    )
+
+
+def is_cacheable(result: Dict) -> bool:
+    """오류 없이 문서를 찾은 결과만 캐시"""
+    return bool(result.get("documents")) and not result.get("metadata", {}).get("stage_errors")
+
+
+class QueryResultCache:
+    """
+    /analyze 결과 캐시 (TTL + LRU)
+    
+    - 최대 maxsize개까지 저장하고, 가득 차면 가장 오래 사용하지 않은 항목부터 제거
+    - 각 항목은 ttl초가 지나면 만료
+    - 인덱서가 새로 성공하면(corpus_version 변경) 전체 무효화
+    - maxsize가 0이면 캐시 비활성화
+    """
+    
+    def __init__(self, maxsize: int = None, ttl: float = None):
+        if maxsize is None:
+            maxsize = int(os.getenv("KITE_QUERY_CACHE_SIZE", "256"))
+        if ttl is None:
+            ttl = float(os.getenv("KITE_QUERY_CACHE_TTL", "600"))
+        
+        self.enabled = maxsize > 0
+        self._cache = TTLCache(maxsize=max(maxsize, 1), ttl=ttl)
+        self._lock = threading.Lock()
+        
+        # 캐시된 답변이 만들어진 코퍼스 버전 (인덱서 마지막 성공 시각)
+        self.corpus_version = None
+        
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key: str) -> Optional[Dict]:
+        """캐시 조회 (없거나 만료 / 무효화되었으면 None)"""
+        if not self.enabled:
+            return None
+        
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry[0] == self.corpus_version:
+                self.hits += 1
+                record_cache("query", "hit")
+                return entry[1]
+            self.misses += 1
+            record_cache("query", "miss")
+            return None
+    
+    def set(self, key: str, value: Dict, corpus_version: str = None):
+        """
+        캐시 저장
+        
+        corpus_version은 계산을 시작할 때의 버전. 계산 도중 인덱서가 새로
+        실행되었다면 이전 코퍼스로 만든 답변이므로 저장하지 않는다.
+        """
+        if not self.enabled:
+            return
+        
+        with self._lock:
+            if corpus_version != self.corpus_version:
+                return
+            self._cache[key] = (corpus_version, value)
+    
+    def update_corpus_version(self, version: Optional[str]) -> bool:
+        """
+        인덱서 마지막 성공 시각 반영
+        
+        Returns:
+            버전이 바뀌어 캐시를 비웠으면 True
+        """
+        if version is None:
+            return False
+        
+        with self._lock:
+            if version == self.corpus_version:
+                return False
+            self.corpus_version = version
+            self._cache.clear()
+            return True
+    
+    def clear(self):
+        """캐시 전체 삭제"""
+        with self._lock:
+            self._cache.clear()
+    
+    def stats(self) -> Dict:
+        """캐시 상태 (헬스 체크용)"""
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "size": len(self._cache),
+            "maxsize": self._cache.maxsize,
+            "ttl": self._cache.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "corpus_version": self.corpus_version
+        }
+
+
+class SemanticCache:
+    """
+    의미 기반 답변 캐시 (비슷한 질문이면 요약 / 액션 아이템 재사용)
+    
+    최근 질문의 임베딩을 (capacity, dim) float32 행렬 하나에 정규화해서 보관하고,
+    조회 시 행렬 곱 한 번으로 모든 항목과의 코사인 유사도를 계산한다.
+    가장 비슷한 항목의 유사도가 threshold 이상이면 저장된 답변을 반환한다.
+    
+    - 같은 검색 파라미터(top 등)로 만든 답변끼리만 비교
+    - 가득 차면 만료된 항목 → 가장 오래 사용하지 않은 항목 순으로 교체
+    - 코퍼스 버전이 바뀌면 전체 무효화
+    - capacity가 0이면 비활성화
+    """
+    
+    def __init__(self, capacity: int = None, threshold: float = None, ttl: float = None):
+        if capacity is None:
+            capacity = int(os.getenv("KITE_SEMANTIC_CACHE_SIZE", "1000"))
+        if threshold is None:
+            threshold = float(os.getenv("KITE_SEMANTIC_CACHE_THRESHOLD", "0.95"))
+        if ttl is None:
+            ttl = float(os.getenv("KITE_SEMANTIC_CACHE_TTL", "600"))
+        
+        self.enabled = capacity > 0
+        self.capacity = capacity
+        self.threshold = threshold
+        self.ttl = ttl
+        
+        # 임베딩 행렬은 첫 저장 시 차원을 보고 할당
+        self._vectors = None
+        self._entries = [None] * capacity
+        self._params = np.full(capacity, -1, dtype=np.int32)
+        self._created_at = np.zeros(capacity, dtype=np.float64)
+        self._last_used = np.zeros(capacity, dtype=np.float64)
+        self._size = 0
+        
+        # 검색 파라미터 문자열 → 정수 ID (행렬 마스크용)
+        self._param_ids = {}
+        
+        self.corpus_version = None
+        
+        self.hits = 0
+        self.misses = 0
+    
+    def _param_id(self, params_key: str) -> int:
+        if params_key not in self._param_ids:
+            self._param_ids[params_key] = len(self._param_ids)
+        return self._param_ids[params_key]
+    
+    @staticmethod
+    def _normalize(vector: List[float]) -> Optional[np.ndarray]:
+        v = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(v)
+        if norm == 0:
+            # 임베딩 실패 시의 더미 벡터
+            return None
+        return v / norm
+    
+    def lookup(self, vector: List[float], params_key: str = "") -> Optional[Dict]:
+        """
+        가장 비슷한 질문의 답변 조회
+        
+        Returns:
+            {"summary", "action_items", "query", "similarity"} 또는 None
+        """
+        if not self.enabled:
+            return None
+        
+        q = self._normalize(vector)
+        if q is None or self._size == 0 or q.shape[0] != self._vectors.shape[1]:
+            self.misses += 1
+            record_cache("semantic", "miss")
+            return None
+        
+        n = self._size
+        now = time.monotonic()
+        similarities = self._vectors[:n] @ q
+        
+        # 다른 검색 파라미터 / 만료된 항목은 후보에서 제외
+        valid = (self._params[:n] == self._param_ids.get(params_key, -2))
+        valid &= (now - self._created_at[:n]) <= self.ttl
+        similarities = np.where(valid, similarities, -np.inf)
+        
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.threshold:
+            self.misses += 1
+            record_cache("semantic", "miss")
+            return None
+        
+        self.hits += 1
+        record_cache("semantic", "hit")
+        self._last_used[best] = now
+        return {**self._entries[best], "similarity": float(similarities[best])}
+    
+    def add(
+        self,
+        vector: List[float],
+        query: str,
+        summary: str,
+        action_items: List[str],
+        params_key: str = "",
+        corpus_version: str = None
+    ):
+        """
+        답변 저장
+        
+        corpus_version은 계산을 시작할 때의 버전 (QueryResultCache.set과 동일한 규칙).
+        """
+        if not self.enabled or corpus_version != self.corpus_version:
+            return
+        
+        v = self._normalize(vector)
+        if v is None:
+            return
+        
+        if self._vectors is None or self._vectors.shape[1] != v.shape[0]:
+            self._vectors = np.zeros((self.capacity, v.shape[0]), dtype=np.float32)
+            self._size = 0
+        
+        now = time.monotonic()
+        if self._size < self.capacity:
+            slot = self._size
+            self._size += 1
+        else:
+            # 만료된 항목이 있으면 우선 교체, 없으면 LRU
+            expired = (now - self._created_at) > self.ttl
+            slot = int(np.argmax(expired)) if expired.any() else int(np.argmin(self._last_used))
+        
+        self._vectors[slot] = v
+        self._entries[slot] = {
+            "query": query,
+            "summary": summary,
+            "action_items": action_items
+        }
+        self._params[slot] = self._param_id(params_key)
+        self._created_at[slot] = now
+        self._last_used[slot] = now
+    
+    def update_corpus_version(self, version: Optional[str]) -> bool:
+        """인덱서 마지막 성공 시각 반영 (바뀌면 전체 무효화)"""
+        if version is None or version == self.corpus_version:
+            return False
+        
+        self.corpus_version = version
+        self.clear()
+        return True
+    
+    def clear(self):
+        """캐시 전체 삭제"""
+        self._size = 0
+        self._entries = [None] * self.capacity
+    
+    def stats(self) -> Dict:
+        """캐시 상태 (헬스 체크용)"""
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "size": self._size,
+            "capacity": self.capacity,
+            "threshold": self.threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "memory_bytes": self._vectors.nbytes if self._vectors is not None else 0
+        }
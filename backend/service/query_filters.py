@@ -0,0 +1,389 @@
+"""
+검색 필터 (채널 / 작성자 / 날짜 범위)
+검색 엔진에서 후보 문서를 먼저 줄이고(pre-filter) 그 안에서 키워드 / 벡터 검색한다.
+
+필터 딕셔너리 (있는 키만 적용, 키끼리는 AND / 목록 안은 OR):
+    {"sources": ["슬랙"], "senders": ["홍길동"], "date_from": "2024-10-01", "date_to": "2024-10-07"}
+
+- /analyze 요청 body의 filters (명시한 값이 우선)
+- 질문 문장에서 뽑은 필터 ("이번 주 슬랙에서 홍길동이 보낸 ..."), KITE_PARSE_QUERY_FILTERS=false로 끄기
+"""
+import os
+import re
+from bisect import bisect_left, bisect_right, insort
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional, Set, Tuple
+from dotenv import load_dotenv
+
+load_dotenv()
+
+FILTER_KEYS = ("sources", "senders", "date_from", "date_to")
+
+# 채널 별칭 → 문서 source 값
+SOURCE_ALIASES = {
+    "슬랙": "슬랙",
+    "slack": "슬랙",
+    "메일": "메일",
+    "email": "메일",
+    "컨플루언스": "컨플루언스",
+    "confluence": "컨플루언스",
+    "위키": "컨플루언스",
+    "지라": "지라",
+    "jira": "지라",
+    "캘린더": "구글 캘린더",
+    "calendar": "구글 캘린더"
+}
+
+# 별칭 앞은 단어 경계여야 함 ("이메일 주소"의 "메일"은 채널이 아님), 뒤에는 조사가 붙을 수 있음 ("슬랙에서")
+_ALIAS_PATTERNS = {
+    alias: re.compile(
+        rf"(?<![가-힣A-Za-z0-9]){re.escape(alias)}" + (r"(?![A-Za-z0-9])" if alias.isascii() else "")
+    )
+    for alias in SOURCE_ALIASES
+}
+
+# 질문 속 기간 표현 (위에서부터 먼저 일치한 것 하나만 사용)
+# "오늘까지 해야 할 일"처럼 "까지"가 붙으면 문서 날짜가 아니라 마감이므로 필터로 쓰지 않음
+_NOT_DEADLINE = r"(?!\s*(?:까지|안에|내로|중으로|마감))"
+_RECENT_DAYS = re.compile(r"(?:최근|지난)\s*(\d{1,3})\s*일")
+_RECENT_WEEKS = re.compile(r"(?:최근|지난)\s*(\d{1,2})\s*주")
+_PERIODS = [
+    (re.compile(r"오늘" + _NOT_DEADLINE), "today"),
+    (re.compile(r"어제" + _NOT_DEADLINE), "yesterday"),
+    (re.compile(r"(?:이번\s*주|금주)" + _NOT_DEADLINE), "this_week"),
+    (re.compile(r"(?:지난|저번)\s*주" + _NOT_DEADLINE), "last_week"),
+    (re.compile(r"이번\s*달" + _NOT_DEADLINE), "this_month"),
+    (re.compile(r"(?:지난|저번)\s*달" + _NOT_DEADLINE), "last_month")
+]
+
+# "홍길동이 보낸", "김영희님이 작성한"
+_SENDER = re.compile(r"(?<![가-힣])([가-힣]{2,4}?)(?:님|씨)?(?:이|가)?\s*(?:보낸|작성한|올린|쓴)")
+
+# 작성자 이름으로 보지 않을 대명사 / 직함 / 일반 명사 ("내가 쓴", "팀장님이 보낸", "전체 팀이 보낸")
+_NOT_SENDERS = {
+    "내", "나", "제", "저", "그", "그녀", "우리", "저희", "너", "네", "당신", "본인", "자기", "누가", "누구", "누군가",
+    "팀장", "부장", "과장", "차장", "대리", "사원", "주임", "사장", "대표", "이사", "상무", "전무", "실장",
+    "본부장", "매니저", "리더", "선배", "후배", "동료", "고객", "상사", "팀원", "담당자", "고객사",
+    "팀", "상대", "상대방", "상대편", "사람", "회사", "부서", "전체", "모두", "다들", "다른", "거래처", "업체", "외부"
+}
+
+# 작성자 후보에 섞여 들어오는 기간 표현 ("지라에서 어제 올린")
+_PERIOD_WORDS = {
+    "오늘", "어제", "그제", "내일", "금일", "금주", "이번", "이번주", "이번달", "지난", "지난주", "지난달",
+    "저번", "저번주", "저번달", "최근", "방금", "아까", "작년", "올해"
+}
+
+# 이름이 아니라 앞말에 붙는 격조사로 끝나는 후보 ("고객에게 보낸", "메일로 보낸")
+_CASE_PARTICLES = ("에게서", "한테서", "에게", "에서", "한테", "께서", "께", "으로", "로", "에", "부터", "까지")
+
+_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+
+def _today() -> date:
+    """KITE_TIMEZONE 기준 오늘 (기본 Asia/Seoul, 시간대 정보가 없으면 UTC+9)"""
+    name = os.getenv("KITE_TIMEZONE", "Asia/Seoul")
+    try:
+        from zoneinfo import ZoneInfo
+        tz = ZoneInfo(name)
+    except Exception:
+        tz = timezone(timedelta(hours=9))
+    return datetime.now(tz).date()
+
+
+def _as_list(value) -> List[str]:
+    if value is None:
+        return []
+    values = [value] if isinstance(value, str) else list(value)
+    return [str(item).strip() for item in values if str(item).strip()]
+
+
+def _check_date(value, key: str) -> Optional[str]:
+    if value in (None, ""):
+        return None
+    value = str(value).strip()[:10]
+    if not _DATE.match(value):
+        raise ValueError(f"{key}는 YYYY-MM-DD 형식이어야 합니다: {value}")
+    date.fromisoformat(value)
+    return value
+
+
+def normalize_filters(filters: Optional[Dict]) -> Dict:
+    """
+    필터 정리 (별칭 → source 값, 중복 제거 / 정렬, 빈 값 제거)
+    
+    캐시 키에 그대로 쓰므로 같은 조건이면 같은 딕셔너리가 나온다.
+    형식이 잘못되면 ValueError.
+    """
+    if not filters:
+        return {}
+    if not isinstance(filters, dict):
+        raise ValueError("filters는 객체여야 합니다")
+    unknown = set(filters) - set(FILTER_KEYS)
+    if unknown:
+        raise ValueError(f"알 수 없는 필터: {', '.join(sorted(unknown))}")
+    
+    normalized = {}
+    sources = {SOURCE_ALIASES.get(value.lower(), value) for value in _as_list(filters.get("sources"))}
+    senders = set(_as_list(filters.get("senders")))
+    if any("|" in value for value in sources | senders):
+        raise ValueError("필터 값에 '|'는 사용할 수 없습니다")
+    if sources:
+        normalized["sources"] = sorted(sources)
+    if senders:
+        normalized["senders"] = sorted(senders)
+    
+    date_from = _check_date(filters.get("date_from"), "date_from")
+    date_to = _check_date(filters.get("date_to"), "date_to")
+    if date_from and date_to and date_from > date_to:
+        raise ValueError(f"date_from({date_from})이 date_to({date_to})보다 늦습니다")
+    if date_from:
+        normalized["date_from"] = date_from
+    if date_to:
+        normalized["date_to"] = date_to
+    return normalized
+
+
+def _period_range(period: str, today: date) -> Tuple[date, date]:
+    if period == "today":
+        return today, today
+    if period == "yesterday":
+        yesterday = today - timedelta(days=1)
+        return yesterday, yesterday
+    monday = today - timedelta(days=today.weekday())
+    if period == "this_week":
+        return monday, monday + timedelta(days=6)
+    if period == "last_week":
+        return monday - timedelta(days=7), monday - timedelta(days=1)
+    first = today.replace(day=1)
+    if period == "this_month":
+        next_first = (first + timedelta(days=32)).replace(day=1)
+        return first, next_first - timedelta(days=1)
+    last_month_end = first - timedelta(days=1)
+    return last_month_end.replace(day=1), last_month_end
+
+
+def _is_sender_name(name: str) -> bool:
+    """
+    "OOO이 보낸"에서 뽑은 후보가 사람 이름으로 볼 만한지
+    
+    대명사 / 직함 / 일반 명사("팀이"), 채널 이름("메일 보낸"), 기간 표현("어제 올린"),
+    격조사로 끝나는 말("고객에게 보낸")은 이름이 아니다.
+    """
+    words = {name, name[:-1]} if name[-1] in "이가" else {name}
+    if any(word in _NOT_SENDERS or word in _PERIOD_WORDS or word in SOURCE_ALIASES for word in words):
+        return False
+    return not name.endswith(_CASE_PARTICLES)
+
+
+def parse_query_filters(query: str, today: date = None) -> Dict:
+    """
+    질문 문장에서 분명한 필터만 뽑기 (채널 이름 / 기간 표현 / "OOO이 보낸")
+    
+    예: "이번 주 슬랙 대화에서 결정된 것" → {"sources": ["슬랙"], "date_from": 월요일, "date_to": 일요일}
+    뽑은 필터는 추정이므로 검색 결과가 없으면 요청 필터만으로 다시 검색한다 (RAGService.analyze의 fallback_filters).
+    """
+    today = today or _today()
+    lowered = query.lower()
+    filters = {}
+    
+    sources = sorted({SOURCE_ALIASES[alias] for alias, pattern in _ALIAS_PATTERNS.items() if pattern.search(lowered)})
+    if sources:
+        filters["sources"] = sources
+    
+    senders = sorted({name for name in _SENDER.findall(query) if _is_sender_name(name)})
+    if senders:
+        filters["senders"] = senders
+    
+    period = None
+    days = _RECENT_DAYS.search(query)
+    weeks = _RECENT_WEEKS.search(query)
+    if days:
+        period = (today - timedelta(days=max(int(days.group(1)), 1) - 1), today)
+    elif weeks:
+        period = (today - timedelta(days=max(int(weeks.group(1)), 1) * 7 - 1), today)
+    else:
+        for pattern, name in _PERIODS:
+            if pattern.search(query):
+                period = _period_range(name, today)
+                break
+    if period:
+        filters["date_from"], filters["date_to"] = period[0].isoformat(), period[1].isoformat()
+    
+    return filters
+
+
+def resolve_filters(query: str, filters: Optional[Dict] = None) -> Dict:
+    """
+    요청 필터 + 질문에서 뽑은 필터 (같은 키는 요청 값 우선)
+    
+    형식이 잘못된 요청 필터는 ValueError.
+    """
+    explicit = normalize_filters(filters)
+    if os.getenv("KITE_PARSE_QUERY_FILTERS", "true").lower() != "true":
+        return explicit
+    parsed = normalize_filters(parse_query_filters(query))
+    return {**parsed, **explicit}
+
+
+def split_senders(sender: Optional[str]) -> List[str]:
+    """sender 필드("박민수, 홍길동")를 작성자 목록으로"""
+    return [name.strip() for name in (sender or "").split(",") if name.strip()]
+
+
+def attach_filter_fields(document: Dict) -> Dict:
+    """
+    업로드용 문서에 필터 전용 필드 추가
+    
+    - date_value: date를 Edm.DateTimeOffset으로 (범위 필터가 검색 엔진에서 실행됨)
+    - senders: 작성자 목록 (Collection(Edm.String), 여러 명이 있는 슬랙 대화도 한 명으로 필터)
+    """
+    try:
+        date_value = f"{date.fromisoformat(str(document.get('date'))[:10]).isoformat()}T00:00:00Z"
+    except ValueError:
+        date_value = None
+    return {**document, "date_value": date_value, "senders": split_senders(document.get("sender"))}
+
+
+def _odata_list(values: List[str]) -> str:
+    return "|".join(value.replace("'", "''") for value in values)
+
+
+def to_odata(filters: Optional[Dict]) -> Optional[str]:
+    """Azure AI Search OData 필터 식 (필터가 없으면 None)"""
+    if not filters:
+        return None
+    
+    clauses = []
+    if filters.get("sources"):
+        clauses.append(f"search.in(source, '{_odata_list(filters['sources'])}', '|')")
+    if filters.get("senders"):
+        clauses.append(f"senders/any(s: search.in(s, '{_odata_list(filters['senders'])}', '|'))")
+    if filters.get("date_from"):
+        clauses.append(f"date_value ge {filters['date_from']}T00:00:00Z")
+    if filters.get("date_to"):
+        end = date.fromisoformat(filters["date_to"]) + timedelta(days=1)
+        clauses.append(f"date_value lt {end.isoformat()}T00:00:00Z")
+    return " and ".join(clauses) or None
+
+
+def matches(document: Dict, filters: Optional[Dict]) -> bool:
+    """문서가 필터 조건을 만족하는지 (로컬 검색용, to_odata와 같은 의미)"""
+    if not filters:
+        return True
+    if filters.get("sources") and document.get("source") not in filters["sources"]:
+        return False
+    if filters.get("senders") and not set(split_senders(document.get("sender"))) & set(filters["senders"]):
+        return False
+    day = str(document.get("date") or "")[:10]
+    if filters.get("date_from") and not (_DATE.match(day) and day >= filters["date_from"]):
+        return False
+    if filters.get("date_to") and not (_DATE.match(day) and day <= filters["date_to"]):
+        return False
+    return True
+
+
+def _document_day(document: Dict) -> Optional[str]:
+    day = str(document.get("date") or "")[:10]
+    return day if _DATE.match(day) else None
+
+
+class FilterIndex:
+    """
+    필드별 posting (채널 / 작성자 / 날짜 → 문서 ID 집합), 로컬 검색용
+    
+    candidates(filters)는 matches()와 같은 조건의 문서 ID를 전체 문서를 훑지 않고
+    posting 집합의 합 / 교집합으로 계산한다 (작은 집합부터 교집합, 날짜는 남은 후보만 확인).
+    """
+    
+    def __init__(self):
+        self._sources: Dict[str, Set[str]] = {}
+        self._senders: Dict[str, Set[str]] = {}
+        self._days: Dict[str, Set[str]] = {}
+        self._sorted_days: List[str] = []
+        self._fields: Dict[str, Tuple[Optional[str], List[str], Optional[str]]] = {}
+    
+    def __len__(self) -> int:
+        return len(self._fields)
+    
+    @staticmethod
+    def _add_posting(postings: Dict[str, Set[str]], key: str, doc_id: str) -> bool:
+        """posting에 추가 (새 키면 True)"""
+        ids = postings.get(key)
+        if ids is None:
+            postings[key] = {doc_id}
+            return True
+        ids.add(doc_id)
+        return False
+    
+    @staticmethod
+    def _discard_posting(postings: Dict[str, Set[str]], key: str, doc_id: str) -> bool:
+        """posting에서 제거 (키가 비면 지우고 True)"""
+        ids = postings.get(key)
+        if ids is None:
+            return False
+        ids.discard(doc_id)
+        if ids:
+            return False
+        del postings[key]
+        return True
+    
+    def add(self, doc_id: str, document: Dict):
+        """문서 추가 / 교체"""
+        self.remove(doc_id)
+        source, senders, day = document.get("source"), split_senders(document.get("sender")), _document_day(document)
+        self._fields[doc_id] = (source, senders, day)
+        if source is not None:
+            self._add_posting(self._sources, source, doc_id)
+        for sender in senders:
+            self._add_posting(self._senders, sender, doc_id)
+        if day and self._add_posting(self._days, day, doc_id):
+            insort(self._sorted_days, day)
+    
+    def remove(self, doc_id: str):
+        """문서 삭제 (없으면 무시)"""
+        fields = self._fields.pop(doc_id, None)
+        if fields is None:
+            return
+        source, senders, day = fields
+        if source is not None:
+            self._discard_posting(self._sources, source, doc_id)
+        for sender in senders:
+            self._discard_posting(self._senders, sender, doc_id)
+        if day and self._discard_posting(self._days, day, doc_id):
+            del self._sorted_days[bisect_left(self._sorted_days, day)]
+    
+    @staticmethod
+    def _union(postings: Dict[str, Set[str]], values: List[str]) -> Set[str]:
+        """값들의 posting 합집합 (값이 하나면 복사하지 않고 posting 그대로, 읽기 전용)"""
+        if len(values) == 1:
+            return postings.get(values[0], set())
+        return set().union(*(postings.get(value, ()) for value in values))
+    
+    def candidates(self, filters: Optional[Dict]) -> Optional[Set[str]]:
+        """필터 조건에 맞는 문서 ID 집합 (필터가 없으면 None = 전체)"""
+        if not filters:
+            return None
+        
+        groups = [
+            self._union(postings, filters[key])
+            for key, postings in (("sources", self._sources), ("senders", self._senders))
+            if filters.get(key)
+        ]
+        date_from, date_to = filters.get("date_from"), filters.get("date_to")
+        
+        if not groups:
+            if not (date_from or date_to):
+                return set(self._fields)
+            start = bisect_left(self._sorted_days, date_from) if date_from else 0
+            end = bisect_right(self._sorted_days, date_to) if date_to else len(self._sorted_days)
+            return set().union(*(self._days[day] for day in self._sorted_days[start:end]))
+        
+        # 값이 하나면 posting을 그대로 쓰므로 intersection / 날짜 확인으로 항상 새 집합을 만들어 반환
+        groups.sort(key=len)
+        result = groups[0].intersection(*groups[1:])
+        if date_from or date_to:
+            # 채널 / 작성자 후보의 날짜만 확인 (날짜 범위 전체 posting을 합치지 않음)
+            # 날짜가 없는 문서("")는 어떤 범위에도 들지 않음
+            low, high = date_from or "0000-00-00", date_to or "9999-99-99"
+            result = {doc_id for doc_id in result if low <= (self._fields[doc_id][2] or "") <= high}
+        return result
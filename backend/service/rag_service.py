@@ -2,83 +2,47 @@
 RAG (Retrieval-Augmented Generation) 서비스
 검색된 문서를 기반으로 AI 응답 생성
 """
-from typing import List, Dict
-from openai import AzureOpenAI
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import AsyncIterator, List, Dict, Optional, Tuple
+from openai import AzureOpenAI, AsyncAzureOpenAI
 import os
 from dotenv import load_dotenv
 
-from backend.service.azure_search import AzureSearchService
+from backend.service.azure_search import AzureSearchService, AsyncAzureSearchService
+from backend.service.chunking import CHUNK_CANDIDATES_PER_DOCUMENT, group_passages, index_mode
+from backend.service.context_packer import (
+    ACTION_ITEMS_CONTEXT_TOKENS,
+    SUMMARY_CONTEXT_TOKENS,
+    count_tokens,
+    pack_context,
+    record_usage
+)
+from backend.service.embedding_cache import EmbeddingCache
+from backend.service.local_backend import (
+    LOCAL_EMBEDDING_DEPLOYMENT,
+    AsyncLocalOpenAI,
+    LocalOpenAI,
+    use_local_backend
+)
+from backend.service.local_search import (
+    KEYWORD_CANDIDATES,
+    AsyncLocalSearchService,
+    LocalSearchService,
+    use_local_search
+)
+from backend.service.metrics import track_stage, timed, observe, record_error
+from backend.service.rank_fusion import fuse_documents
+from backend.service.query_cache import SemanticCache
+from backend.service.vector_compression import embedding_request_options
+from backend.service.snippets import response_document
 
 load_dotenv()
 
 
-class RAGService:
-    """RAG 서비스 - 검색 + 생성"""
-    
-    def __init__(self):
-        # OpenAI 클라이언트
-        self.openai_client = AzureOpenAI(
-            api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-            api_version=os.getenv("AZURE_OPENAI_API_VERSION"),
-            azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT")
-        )
-        
-        # Search 서비스
-        self.search_service = AzureSearchService()
-        
-        print("✅ RAG 서비스 초기화 완료")
-    
-    def get_embedding(self, text: str) -> List[float]:
-        """텍스트를 벡터로 변환"""
-        try:
-            response = self.openai_client.embeddings.create(
-                model=os.getenv("AZURE_OPENAI_EMBEDDING_DEPLOYMENT"),
-                input=text
-            )
-            return response.data[0].embedding
-        except Exception as e:
-            print(f"⚠️ 임베딩 생성 실패: {str(e)}")
-            return [0.0] * 1536  # 더미 벡터
-    
-    def search_relevant_documents(
-        self,
-        query: str,
-        top: int = 5
-    ) -> List[Dict]:
-        """
-        쿼리에 관련된 문서 검색
-        """
-        # 쿼리를 벡터로 변환
-        query_vector = self.get_embedding(query)
-        
-        # 하이브리드 검색 실행
-        documents = self.search_service.hybrid_search(
-            query=query,
-            query_vector=query_vector,
-            top=top
-        )
-        
-        return documents
-    
-    def generate_context_aware_summary(
-        self,
-        query: str,
-        documents: List[Dict]
-    ) -> str:
-        """
-        검색된 문서를 기반으로 맥락 요약 생성
-        """
-        if not documents:
-            return "관련 문서를 찾을 수 없습니다. 검색 키워드를 변경해보세요."
-        
-        # 문서 컨텍스트 생성
-        context = "\n\n".join([
-            f"[{doc['source']}] {doc['title']}\n작성일: {doc['date']}\n내용: {doc['content'][:500]}"
-            for doc in documents[:3]  # 상위 3개만 사용
-        ])
-        
-        # 프롬프트 생성
-        system_prompt = """당신은 업무 맥락을 분석하는 AI 도우미입니다.
+SUMMARY_SYSTEM_PROMPT = """당신은 업무 맥락을 분석하는 AI 도우미입니다.
 주어진 문서들을 바탕으로 사용자의 질문에 답변해주세요.
 
 답변 형식:
@@ -104,7 +68,41 @@ class RAGService:
 
 간결하고 구조화된 형태로 작성해주세요."""
 
-        user_prompt = f"""
+ACTION_ITEMS_SYSTEM_PROMPT = "액션 아이템을 명확하고 실행 가능하게 작성합니다."
+
+NO_DOCUMENTS_SUMMARY = "관련 문서를 찾을 수 없습니다. 검색 키워드를 변경해보세요."
+SUMMARY_ERROR_MESSAGE = "AI 응답 생성 중 오류가 발생했습니다."
+NO_DOCUMENTS_ACTION_ITEMS = ["관련 문서가 없어 액션 아이템을 생성할 수 없습니다."]
+ACTION_ITEMS_ERROR_MESSAGE = ["액션 아이템 생성에 실패했습니다."]
+
+# Azure OpenAI 임베딩 요청 한 번에 보낼 수 있는 최대 입력 개수
+EMBEDDING_BATCH_SIZE = 2048
+
+# 검색 방식 (KITE_RETRIEVAL_MODE)
+# - hybrid: 임베딩 후 Azure AI Search 하이브리드 쿼리 한 번 (서버에서 RRF)
+# - fusion: 키워드 검색은 바로 시작하고, 임베딩이 준비되면 벡터 검색 → 두 결과를 직접 RRF로 결합
+#           (임베딩이 실패하거나 KITE_EMBEDDING_DEADLINE_MS 안에 끝나지 않으면 키워드 결과만 사용)
+RETRIEVAL_MODES = ("hybrid", "fusion")
+
+SEARCH_METHODS = {
+    ("hybrid", True): "hybrid (keyword + vector)",
+    ("hybrid", False): "hybrid (keyword only, embedding unavailable)",
+    ("fusion", True): "fusion (keyword + vector, client RRF)",
+    ("fusion", False): "fusion (keyword only, embedding unavailable)"
+}
+
+
+def build_summary_messages(query: str, documents: List[Dict], usage: Dict = None) -> List[Dict]:
+    """맥락 요약용 프롬프트 메시지 생성 (문서는 KITE_SUMMARY_CONTEXT_TOKENS 안에서 관련도 순)"""
+    # 문서 컨텍스트 생성
+    packed = pack_context(
+        documents,
+        SUMMARY_CONTEXT_TOKENS,
+        header=lambda doc: f"[{doc['source']}] {doc['title']}\n작성일: {doc['date']}\n내용: "
+    )
+    context = packed["text"]
+    
+    user_prompt = f"""
 사용자 질문: {query}
 
 관련 문서:
@@ -112,23 +110,238 @@ class RAGService:
 
 위 문서들을 바탕으로 사용자의 질문에 답변해주세요.
 """
+    record_usage(usage, "summary", packed, count_tokens(SUMMARY_SYSTEM_PROMPT) + count_tokens(user_prompt))
+
+    return [
+        {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+        {"role": "user", "content": user_prompt}
+    ]
+
+
+def build_action_item_messages(query: str, documents: List[Dict], usage: Dict = None) -> List[Dict]:
+    """액션 아이템용 프롬프트 메시지 생성 (문서는 KITE_ACTION_ITEMS_CONTEXT_TOKENS 안에서 관련도 순)"""
+    packed = pack_context(
+        documents,
+        ACTION_ITEMS_CONTEXT_TOKENS,
+        header=lambda doc: f"[{doc['source']}] ",
+        separator="\n"
+    )
+    context = packed["text"]
+    
+    prompt = f"""
+다음 업무 상황에서 해야 할 구체적인 액션 아이템을 4-5개 추출해주세요.
+
+질문: {query}
+
+관련 정보:
+{context}
+
+각 항목은 한 줄로 작성하고, "- "로 시작해주세요.
+"""
+    record_usage(usage, "action_items", packed, count_tokens(ACTION_ITEMS_SYSTEM_PROMPT) + count_tokens(prompt))
+
+    return [
+        {"role": "system", "content": ACTION_ITEMS_SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def embedding_deployment() -> str:
+    """임베딩 배포 이름 (캐시 키용, 로컬 백엔드는 별도 이름)"""
+    if use_local_backend():
+        return LOCAL_EMBEDDING_DEPLOYMENT
+    return os.getenv("AZURE_OPENAI_EMBEDDING_DEPLOYMENT")
+
+
+def embedding_cache_name(deployment: str, options: Dict) -> str:
+    """임베딩 캐시 키에 쓰는 이름 (차원을 줄이면 전체 차원 임베딩과 섞이지 않도록 구분)"""
+    return f"{deployment}@{options['dimensions']}" if options.get("dimensions") else deployment
+
+
+def retrieval_mode() -> str:
+    """KITE_RETRIEVAL_MODE (hybrid / fusion, 알 수 없는 값이면 hybrid)"""
+    mode = os.getenv("KITE_RETRIEVAL_MODE", "hybrid").strip().lower()
+    return mode if mode in RETRIEVAL_MODES else "hybrid"
+
+
+def embedding_deadline() -> float:
+    """fusion 모드에서 벡터 검색을 위해 임베딩을 기다리는 최대 시간 (초)"""
+    return float(os.getenv("KITE_EMBEDDING_DEADLINE_MS", "1000")) / 1000
+
+
+def _pending_embedding_batches(
+    keys: List[str],
+    texts: List[str],
+    found: Dict[str, List[float]],
+    batch_size: int = EMBEDDING_BATCH_SIZE
+) -> List[List[Tuple[str, str]]]:
+    """캐시에 없는 (키, 텍스트)를 중복 없이 요청 단위로 나누기"""
+    pending = list({key: text for key, text in zip(keys, texts) if key not in found}.items())
+    return [
+        pending[i:i + batch_size]
+        for i in range(0, len(pending), batch_size)
+    ]
+
+
+def embed_texts(
+    openai_client,
+    embedding_cache: EmbeddingCache,
+    texts: List[str],
+    batch_size: int = EMBEDDING_BATCH_SIZE
+) -> List[List[float]]:
+    """
+    여러 텍스트를 한 번에 벡터로 변환 (RAGService / PushIndexer 공용)
+    
+    캐시에 없는 텍스트만 모아서 embeddings.create를 batch_size개 단위로 요청한다.
+    실패 시 예외를 그대로 올린다.
+    """
+    deployment = embedding_deployment()
+    options = embedding_request_options()
+    keys = [EmbeddingCache.make_key(text, embedding_cache_name(deployment, options)) for text in texts]
+    found = embedding_cache.get_many(keys)
+    
+    for batch in _pending_embedding_batches(keys, texts, found, batch_size):
+        response = openai_client.embeddings.create(
+            model=deployment,
+            input=[text for _, text in batch],
+            **options
+        )
+        embedded = {batch[item.index][0]: item.embedding for item in response.data}
+        embedding_cache.put_many(embedded)
+        found.update(embedded)
+    
+    return [found[key] for key in keys]
+
+
+def semantic_params_key(top: int, filters: Optional[Dict] = None) -> str:
+    """의미 캐시 비교 범위 (같은 top / 같은 필터로 만든 답변끼리만 재사용)"""
+    if not filters:
+        return f"top={top}"
+    return f"top={top}|filters={json.dumps(filters, ensure_ascii=False, sort_keys=True)}"
+
+
+def parse_action_items(text: str) -> List[str]:
+    """모델 응답에서 "- "로 시작하는 줄만 액션 아이템으로 추출"""
+    items = text.strip().split('\n')
+    return [item.strip('- ').strip() for item in items if item.strip() and item.strip().startswith('-')]
+
+
+class RAGService:
+    """RAG 서비스 - 검색 + 생성"""
+    
+    def __init__(self, embedding_cache: EmbeddingCache = None):
+        # OpenAI 클라이언트 (KITE_BACKEND=local이면 오프라인 가짜 모델)
+        if use_local_backend():
+            self.openai_client = LocalOpenAI()
+        else:
+            self.openai_client = AzureOpenAI(
+                api_key=os.getenv("AZURE_OPENAI_API_KEY"),
+                api_version=os.getenv("AZURE_OPENAI_API_VERSION"),
+                azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT")
+            )
+        
+        # Search 서비스 (KITE_SEARCH_BACKEND=local이면 프로세스 내 검색)
+        self.search_service = LocalSearchService() if use_local_search() else AzureSearchService()
+        
+        # 임베딩 캐시 (메모리 + 디스크)
+        self.embedding_cache = embedding_cache or EmbeddingCache()
+        
+        # 검색 방식 (fusion이면 키워드 / 임베딩을 스레드에서 동시에 실행)
+        self.retrieval_mode = retrieval_mode()
+        self.index_mode = index_mode()
+        self.embedding_deadline = embedding_deadline()
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="kite-retrieval")
+        
+        print("✅ RAG 서비스 초기화 완료")
+    
+    def get_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """
+        여러 텍스트를 한 번에 벡터로 변환
+        
+        캐시에 없는 텍스트만 모아서 embeddings.create 한 번(최대 2048개 단위)으로 요청한다.
+        실패 시 예외를 그대로 올린다.
+        """
+        return embed_texts(self.openai_client, self.embedding_cache, texts)
+    
+    def get_embedding(self, text: str) -> Optional[List[float]]:
+        """텍스트를 벡터로 변환 (실패하면 None → 키워드 검색만)"""
+        try:
+            return self.get_embeddings([text])[0]
+        except Exception as e:
+            print(f"⚠️ 임베딩 생성 실패: {str(e)}")
+            return None
+    
+    def search_relevant_documents(
+        self,
+        query: str,
+        top: int = 5,
+        filters: Dict = None
+    ) -> List[Dict]:
+        """
+        쿼리에 관련된 문서 검색 (filters: 채널 / 작성자 / 날짜 범위, query_filters 형식)
+        """
+        # 청크 색인이면 청크를 넉넉히 가져와서 문서별로 묶음
+        search_top = top * CHUNK_CANDIDATES_PER_DOCUMENT if self.index_mode == "chunk" else top
+        
+        if self.retrieval_mode == "fusion":
+            documents = self._fusion_search(query, search_top, filters)
+        else:
+            # 쿼리를 벡터로 변환
+            query_vector = self.get_embedding(query)
+        
+            # 하이브리드 검색 실행
+            documents = self.search_service.hybrid_search(
+                query=query,
+                query_vector=query_vector,
+                top=search_top,
+                filters=filters
+            )
+        
+        if self.index_mode == "chunk":
+            documents = group_passages(documents, top)
+        return documents
+    
+    def _fusion_search(self, query: str, top: int, filters: Dict = None) -> List[Dict]:
+        """키워드 검색과 임베딩을 동시에 시작하고, 임베딩이 제때 오면 벡터 검색 후 RRF 결합"""
+        keyword_future = self._executor.submit(
+            self.search_service.keyword_search, query, max(top, KEYWORD_CANDIDATES), filters
+        )
+        embedding_future = self._executor.submit(self.get_embedding, query)
+        
+        try:
+            query_vector = embedding_future.result(timeout=self.embedding_deadline)
+        except FutureTimeoutError:
+            # 늦게 끝난 임베딩은 캐시에만 저장됨
+            print(f"⚠️ 임베딩 대기 시간 초과 ({self.embedding_deadline * 1000:.0f}ms) → 키워드 검색만 사용")
+            query_vector = None
+        
+        vector_documents = self.search_service.vector_search(query_vector, top, filters) if query_vector else []
+        return fuse_documents([keyword_future.result(), vector_documents], limit=top)
+    
+    def generate_context_aware_summary(
+        self,
+        query: str,
+        documents: List[Dict]
+    ) -> str:
+        """
+        검색된 문서를 기반으로 맥락 요약 생성
+        """
+        if not documents:
+            return NO_DOCUMENTS_SUMMARY
         
         try:
             response = self.openai_client.chat.completions.create(
                 model=os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME"),
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
+                messages=build_summary_messages(query, documents),
                 temperature=0.7,
                 max_tokens=1000
             )
             
             return response.choices[0].message.content
-            
+        
         except Exception as e:
             print(f"❌ AI 응답 생성 실패: {str(e)}")
-            return "AI 응답 생성 중 오류가 발생했습니다."
+            return SUMMARY_ERROR_MESSAGE
     
     def generate_action_items(
         self,
@@ -137,38 +350,554 @@ class RAGService:
     ) -> List[str]:
         """액션 아이템 생성"""
         if not documents:
-            return ["관련 문서가 없어 액션 아이템을 생성할 수 없습니다."]
-        
-        context = "\n".join([
-            f"[{doc['source']}] {doc['content'][:300]}"
-            for doc in documents[:2]
-        ])
-        
-        prompt = f"""
-다음 업무 상황에서 해야 할 구체적인 액션 아이템을 4-5개 추출해주세요.
-
-질문: {query}
-
-관련 정보:
-{context}
-
-각 항목은 한 줄로 작성하고, "- "로 시작해주세요.
-"""
+            return NO_DOCUMENTS_ACTION_ITEMS
         
         try:
             response = self.openai_client.chat.completions.create(
                 model=os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME"),
-                messages=[
-                    {"role": "system", "content": "액션 아이템을 명확하고 실행 가능하게 작성합니다."},
-                    {"role": "user", "content": prompt}
-                ],
+                messages=build_action_item_messages(query, documents),
                 temperature=0.5,
                 max_tokens=400
             )
             
-            items = response.choices[0].message.content.strip().split('\n')
-            return [item.strip('- ').strip() for item in items if item.strip() and item.strip().startswith('-')]
+            return parse_action_items(response.choices[0].message.content)
+        
+        except Exception as e:
+            print(f"❌ 액션 아이템 생성 실패: {str(e)}")
+            return ACTION_ITEMS_ERROR_MESSAGE
+
+
+class AsyncRAGService:
+    """
+    비동기 RAG 서비스 - 검색 + 생성
+
+    AsyncAzureOpenAI / AsyncAzureSearchService를 사용하므로
+    FastAPI 이벤트 루프를 막지 않고 여러 요청을 동시에 처리할 수 있다.
+    """
+    
+    def __init__(
+        self,
+        search_service: AsyncAzureSearchService = None,
+        semantic_cache: SemanticCache = None,
+        embedding_cache: EmbeddingCache = None,
+        openai_client: AsyncAzureOpenAI = None
+    ):
+        local = use_local_backend()
+        
+        # OpenAI 클라이언트 (비동기, 주입되지 않으면 직접 생성)
+        self.openai_client = openai_client or (AsyncLocalOpenAI() if local else AsyncAzureOpenAI(
+            api_key=os.getenv("AZURE_OPENAI_API_KEY"),
+            api_version=os.getenv("AZURE_OPENAI_API_VERSION"),
+            azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT")
+        ))
+        
+        # Search 서비스 (비동기)
+        self.search_service = search_service or (
+            AsyncLocalSearchService() if use_local_search() else AsyncAzureSearchService()
+        )
+        
+        # 의미 기반 답변 캐시 (없으면 항상 LLM 호출)
+        self.semantic_cache = semantic_cache
+        
+        # 임베딩 캐시 (메모리 + 디스크)
+        self.embedding_cache = embedding_cache or EmbeddingCache()
+        
+        # 검색 방식 (hybrid / fusion), 색인 방식 (document / chunk)
+        self.retrieval_mode = retrieval_mode()
+        self.index_mode = index_mode()
+        self.embedding_deadline = embedding_deadline()
+        
+        print("✅ 비동기 RAG 서비스 초기화 완료")
+    
+    async def get_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """
+        여러 텍스트를 한 번에 벡터로 변환
+        
+        캐시에 없는 텍스트만 모아서 embeddings.create 한 번(최대 2048개 단위)으로 요청한다.
+        실패 시 예외를 그대로 올린다.
+        """
+        deployment = embedding_deployment()
+        options = embedding_request_options()
+        keys = [EmbeddingCache.make_key(text, embedding_cache_name(deployment, options)) for text in texts]
+        # 캐시는 SQLite 읽기 / 쓰기(commit)를 하므로 이벤트 루프를 막지 않도록 스레드에서
+        found = await asyncio.to_thread(self.embedding_cache.get_many, keys)
+        
+        for batch in _pending_embedding_batches(keys, texts, found):
+            response = await self.openai_client.embeddings.create(
+                model=deployment,
+                input=[text for _, text in batch],
+                **options
+            )
+            embedded = {batch[item.index][0]: item.embedding for item in response.data}
+            await asyncio.to_thread(self.embedding_cache.put_many, embedded)
+            found.update(embedded)
+        
+        return [found[key] for key in keys]
+    
+    async def get_embedding(self, text: str, timings: Dict = None) -> Optional[List[float]]:
+        """텍스트를 벡터로 변환 (실패하면 None → 키워드 검색만)"""
+        try:
+            with track_stage("embedding", timings):
+                return (await self.get_embeddings([text]))[0]
+        except Exception as e:
+            print(f"⚠️ 임베딩 생성 실패: {str(e)}")
+            return None
+    
+    async def search_relevant_documents(
+        self,
+        query: str,
+        top: int = 5,
+        filters: Dict = None
+    ) -> List[Dict]:
+        """
+        쿼리에 관련된 문서 검색 (filters: 채널 / 작성자 / 날짜 범위, query_filters 형식)
+        """
+        documents, _, _ = await self._retrieve(query, top, filters=filters)
+        return documents
+    
+    async def _retrieve(
+        self,
+        query: str,
+        top: int,
+        timings: Dict = None,
+        filters: Dict = None
+    ) -> Tuple[List[Dict], Optional[List[float]], str]:
+        """
+        문서 검색
+        
+        청크 색인이면 top × CHUNK_CANDIDATES_PER_DOCUMENT개 청크를 검색해서
+        문서별로 묶은 뒤(관련 passage 포함) 상위 top개 문서를 반환한다.
+        filters가 있으면 검색 엔진에서 조건에 맞는 문서 안에서만 검색한다.
+        
+        Returns:
+            (문서 목록, 쿼리 임베딩(의미 캐시 조회용, 실패하면 None), 검색 방식 설명)
+        """
+        chunked = self.index_mode == "chunk"
+        search_top = top * CHUNK_CANDIDATES_PER_DOCUMENT if chunked else top
+        
+        with track_stage("retrieval", timings):
+            if self.retrieval_mode == "fusion":
+                documents, query_vector = await self._fusion_search(query, search_top, timings, filters)
+            else:
+                query_vector = await self.get_embedding(query, timings)
+                with track_stage("search", timings):
+                    documents = await self.search_service.hybrid_search(
+                        query=query,
+                        query_vector=query_vector,
+                        top=search_top,
+                        filters=filters
+                    )
+            if chunked:
+                documents = group_passages(documents, top)
+        return documents, query_vector, SEARCH_METHODS[(self.retrieval_mode, query_vector is not None)]
+    
+    async def _retrieve_with_fallback(
+        self,
+        query: str,
+        top: int,
+        timings: Dict,
+        filters: Optional[Dict],
+        fallback_filters: Optional[Dict]
+    ) -> Tuple[List[Dict], Optional[List[float]], str, Optional[Dict]]:
+        """
+        filters로 검색해서 결과가 없으면 fallback_filters(요청에서 명시한 필터만)로 다시 검색
+        
+        질문에서 뽑은 필터는 추정이라 틀릴 수 있으므로 결과를 0건으로 만들면 버린다.
+        
+        Returns:
+            (문서 목록, 쿼리 임베딩, 검색 방식 설명, 실제로 적용한 필터)
+        """
+        documents, query_vector, search_method = await self._retrieve(query, top, timings, filters)
+        if not documents and filters and fallback_filters is not None and fallback_filters != filters:
+            print(f"↩️ 질문에서 뽑은 필터로 찾은 문서가 없어 다시 검색: {filters} → {fallback_filters or '필터 없음'}")
+            documents, query_vector, search_method = await self._retrieve(query, top, timings, fallback_filters)
+            filters = fallback_filters
+        return documents, query_vector, search_method, filters
+    
+    async def _fusion_search(
+        self,
+        query: str,
+        top: int,
+        timings: Dict = None,
+        filters: Dict = None
+    ) -> Tuple[List[Dict], Optional[List[float]]]:
+        """
+        키워드 검색은 바로 시작하고, 임베딩이 준비되면 벡터 검색을 실행한 뒤 RRF로 결합
+        
+        임베딩이 실패하거나 마감 시간을 넘기면 벡터 검색은 건너뛴다.
+        마감 시간을 넘긴 임베딩 요청은 취소하지 않고 끝까지 실행해서 캐시에 저장한다.
+        """
+        keyword_task = asyncio.create_task(timed(
+            "keyword_search",
+            self.search_service.keyword_search(query, max(top, KEYWORD_CANDIDATES), filters),
+            timings
+        ))
+        try:
+            # 늦게 끝난 임베딩이 이미 반환된 응답의 timings를 바꾸지 않도록 따로 기록
+            embedding_timings = {}
+            embedding_task = asyncio.create_task(self.get_embedding(query, embedding_timings))
+            try:
+                query_vector = await asyncio.wait_for(asyncio.shield(embedding_task), self.embedding_deadline)
+                if timings is not None:
+                    timings.update(embedding_timings)
+            except asyncio.TimeoutError:
+                print(f"⚠️ 임베딩 대기 시간 초과 ({self.embedding_deadline * 1000:.0f}ms) → 키워드 검색만 사용")
+                record_error("embedding_deadline")
+                query_vector = None
             
+            vector_documents = []
+            if query_vector is not None:
+                vector_documents = await timed(
+                    "vector_search", self.search_service.vector_search(query_vector, top, filters), timings
+                )
+            keyword_documents = await keyword_task
+        finally:
+            # 클라이언트가 중간에 연결을 끊은 경우 키워드 검색 정리
+            if not keyword_task.done():
+                keyword_task.cancel()
+        
+        return fuse_documents([keyword_documents, vector_documents], limit=top), query_vector
+    
+    def _lookup_semantic_cache(
+        self,
+        query_vector: List[float],
+        top: int,
+        timings: Dict = None,
+        filters: Dict = None
+    ) -> Optional[Dict]:
+        """비슷한 질문의 답변 조회 (캐시 / 쿼리 임베딩이 없으면 None)"""
+        if not self.semantic_cache or query_vector is None:
+            return None
+        
+        with track_stage("semantic_cache", timings):
+            hit = self.semantic_cache.lookup(query_vector, params_key=semantic_params_key(top, filters))
+        if hit:
+            print(f"⚡ 의미 캐시 적중: \"{hit['query']}\" (유사도 {hit['similarity']:.3f})")
+        return hit
+    
+    def _store_semantic_cache(
+        self,
+        query: str,
+        query_vector: List[float],
+        top: int,
+        summary: str,
+        action_items: List[str],
+        corpus_version: Optional[str],
+        filters: Dict = None
+    ):
+        """오류 없이 생성된 답변을 의미 캐시에 저장"""
+        if self.semantic_cache and query_vector is not None:
+            self.semantic_cache.add(
+                query_vector,
+                query=query,
+                summary=summary,
+                action_items=action_items,
+                params_key=semantic_params_key(top, filters),
+                corpus_version=corpus_version
+            )
+    
+    async def _complete_summary(self, query: str, documents: List[Dict], usage: Dict = None) -> str:
+        """맥락 요약 chat completion 호출 (실패 시 예외 전파)"""
+        response = await self.openai_client.chat.completions.create(
+            model=os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME"),
+            messages=build_summary_messages(query, documents, usage),
+            temperature=0.7,
+            max_tokens=1000
+        )
+        return response.choices[0].message.content
+    
+    async def _complete_action_items(self, query: str, documents: List[Dict], usage: Dict = None) -> List[str]:
+        """액션 아이템 chat completion 호출 (실패 시 예외 전파)"""
+        response = await self.openai_client.chat.completions.create(
+            model=os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME"),
+            messages=build_action_item_messages(query, documents, usage),
+            temperature=0.5,
+            max_tokens=400
+        )
+        return parse_action_items(response.choices[0].message.content)
+    
+    async def generate_context_aware_summary(
+        self,
+        query: str,
+        documents: List[Dict]
+    ) -> str:
+        """
+        검색된 문서를 기반으로 맥락 요약 생성
+        """
+        if not documents:
+            return NO_DOCUMENTS_SUMMARY
+        
+        try:
+            return await self._complete_summary(query, documents)
+        except Exception as e:
+            print(f"❌ AI 응답 생성 실패: {str(e)}")
+            return SUMMARY_ERROR_MESSAGE
+    
+    async def stream_context_aware_summary(
+        self,
+        query: str,
+        documents: List[Dict],
+        usage: Dict = None
+    ) -> AsyncIterator[str]:
+        """
+        맥락 요약을 토큰(델타) 단위로 스트리밍
+        
+        generate_context_aware_summary와 같은 프롬프트를 사용하며,
+        모델이 생성하는 즉시 텍스트 조각을 내보낸다.
+        실패하면 예외를 그대로 올려서 호출 측이 단계 오류로 기록하게 한다.
+        """
+        if not documents:
+            yield NO_DOCUMENTS_SUMMARY
+            return
+        
+        stream = await self.openai_client.chat.completions.create(
+            model=os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME"),
+            messages=build_summary_messages(query, documents, usage),
+            temperature=0.7,
+            max_tokens=1000,
+            stream=True
+        )
+            
+        async for chunk in stream:
+            # Azure는 콘텐츠 필터 결과만 담긴 (choices가 빈) 청크를 보내기도 함
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                yield delta
+    
+    async def generate_action_items(
+        self,
+        query: str,
+        documents: List[Dict]
+    ) -> List[str]:
+        """액션 아이템 생성"""
+        if not documents:
+            return NO_DOCUMENTS_ACTION_ITEMS
+        
+        try:
+            return await self._complete_action_items(query, documents)
         except Exception as e:
             print(f"❌ 액션 아이템 생성 실패: {str(e)}")
-            return ["액션 아이템 생성에 실패했습니다."]
\ No newline at end of file
+            return ACTION_ITEMS_ERROR_MESSAGE
+    
+    async def generate_answer(
+        self,
+        query: str,
+        documents: List[Dict],
+        timings: Dict = None,
+        usage: Dict = None
+    ) -> Tuple[str, List[str], Dict]:
+        """
+        요약 / 액션 아이템 생성 단계를 동시에 실행
+
+        한 단계가 실패해도 다른 단계의 결과는 그대로 반환하고,
+        실패한 단계는 기본 문구로 대체한 뒤 stage_errors에 기록한다.
+        """
+        if not documents:
+            return NO_DOCUMENTS_SUMMARY, NO_DOCUMENTS_ACTION_ITEMS, {}
+        
+        summary, action_items = await asyncio.gather(
+            timed("summary", self._complete_summary(query, documents, usage), timings),
+            timed("action_items", self._complete_action_items(query, documents, usage), timings),
+            return_exceptions=True
+        )
+        
+        stage_errors = {}
+        if isinstance(summary, Exception):
+            print(f"❌ 요약 단계 실패: {str(summary)}")
+            stage_errors["summary"] = str(summary)
+            summary = SUMMARY_ERROR_MESSAGE
+        if isinstance(action_items, Exception):
+            print(f"❌ 액션 아이템 단계 실패: {str(action_items)}")
+            stage_errors["action_items"] = str(action_items)
+            action_items = ACTION_ITEMS_ERROR_MESSAGE
+        
+        return summary, action_items, stage_errors
+    
+    async def analyze(self, query: str, top: int = 5, filters: Dict = None, fallback_filters: Dict = None) -> Dict:
+        """
+        /analyze 전체 파이프라인 (검색 → 요약 + 액션 아이템)
+        
+        filters: 검색 필터 (채널 / 작성자 / 날짜 범위, query_filters 형식)
+        fallback_filters: filters로 찾은 문서가 없을 때 다시 검색할 필터 (요청에서 명시한 필터만)
+        
+        Returns:
+            query / summary / documents / action_items / metadata 딕셔너리
+            (documents는 본문 대신 스니펫만 포함, 전체 본문은 GET /documents/{id})
+        """
+        corpus_version = self.semantic_cache.corpus_version if self.semantic_cache else None
+        started = time.perf_counter()
+        timings = {}
+        context_usage = {}
+        
+        # 1. RAG로 관련 문서 검색
+        print(f"🔍 검색 쿼리: {query}" + (f" (필터: {filters})" if filters else ""))
+        documents, query_vector, search_method, filters = await self._retrieve_with_fallback(
+            query, top, timings, filters, fallback_filters
+        )
+        
+        # 2. 비슷한 질문에 대한 답변이 있으면 LLM 호출 생략
+        semantic_hit = self._lookup_semantic_cache(query_vector, top, timings, filters) if documents else None
+        if semantic_hit:
+            summary, action_items, stage_errors = semantic_hit["summary"], semantic_hit["action_items"], {}
+        else:
+            # 3~4. 맥락 요약 / 액션 아이템은 서로의 결과가 필요 없으므로 동시에 생성
+            print(f"🤖 AI 요약 + 액션 아이템 동시 생성 중... (문서 {len(documents)}개)")
+            summary, action_items, stage_errors = await self.generate_answer(query, documents, timings, context_usage)
+            if documents and not stage_errors:
+                self._store_semantic_cache(query, query_vector, top, summary, action_items, corpus_version, filters)
+        
+        return {
+            "query": query,
+            "summary": summary,
+            "documents": [response_document(doc) for doc in documents],
+            "action_items": action_items,
+            "metadata": self._build_metadata(
+                documents, search_method, stage_errors, semantic_hit, timings, started, context_usage, filters
+            )
+        }
+    
+    async def stream_analyze(
+        self,
+        query: str,
+        top: int = 5,
+        filters: Dict = None,
+        fallback_filters: Dict = None
+    ) -> AsyncIterator[Dict]:
+        """
+        /analyze/stream 파이프라인
+        
+        documents → summary (델타 여러 개) → action_items → done 순서로
+        {"type": ...} 이벤트 딕셔너리를 생성한다. 액션 아이템은 문서 검색 직후
+        백그라운드에서 생성을 시작하고, 요약 스트리밍이 끝난 뒤에 내보낸다.
+        filters / fallback_filters는 analyze와 같다.
+        """
+        corpus_version = self.semantic_cache.corpus_version if self.semantic_cache else None
+        started = time.perf_counter()
+        timings = {}
+        context_usage = {}
+        
+        # 1. RAG로 관련 문서 검색 → 즉시 전송
+        print(f"🔍 [stream] 검색 쿼리: {query}" + (f" (필터: {filters})" if filters else ""))
+        documents, query_vector, search_method, filters = await self._retrieve_with_fallback(
+            query, top, timings, filters, fallback_filters
+        )
+        yield {"type": "documents", "query": query, "documents": [response_document(doc) for doc in documents]}
+        
+        stage_errors = {}
+        semantic_hit = self._lookup_semantic_cache(query_vector, top, timings, filters) if documents else None
+        if semantic_hit:
+            # 비슷한 질문의 답변을 그대로 전송
+            yield {"type": "summary", "delta": semantic_hit["summary"]}
+            yield {"type": "action_items", "action_items": semantic_hit["action_items"]}
+            yield {
+                "type": "done",
+                "metadata": self._build_metadata(
+                    documents, search_method, stage_errors, semantic_hit, timings, started, filters=filters
+                )
+            }
+            return
+        
+        if not documents:
+            yield {"type": "summary", "delta": NO_DOCUMENTS_SUMMARY}
+            yield {"type": "action_items", "action_items": NO_DOCUMENTS_ACTION_ITEMS}
+            yield {
+                "type": "done",
+                "metadata": self._build_metadata(
+                    documents, search_method, stage_errors, None, timings, started, filters=filters
+                )
+            }
+            return
+        
+        # 2. 액션 아이템은 요약과 동시에 생성
+        summary_parts = []
+        action_items_task = asyncio.create_task(
+            timed("action_items", self._complete_action_items(query, documents, context_usage), timings)
+        )
+        
+        try:
+            # 3. 요약 토큰 스트리밍
+            try:
+                with track_stage("summary", timings):
+                    summary_started = time.perf_counter()
+                    async for delta in self.stream_context_aware_summary(query, documents, context_usage):
+                        if not summary_parts:
+                            observe("summary_first_token", time.perf_counter() - summary_started, timings)
+                        summary_parts.append(delta)
+                        yield {"type": "summary", "delta": delta}
+            except Exception as e:
+                print(f"❌ 요약 단계 실패: {str(e)}")
+                stage_errors["summary"] = str(e)
+                yield {"type": "summary", "delta": SUMMARY_ERROR_MESSAGE}
+            
+            try:
+                action_items = await action_items_task
+            except Exception as e:
+                print(f"❌ 액션 아이템 단계 실패: {str(e)}")
+                stage_errors["action_items"] = str(e)
+                action_items = ACTION_ITEMS_ERROR_MESSAGE
+        finally:
+            # 클라이언트가 중간에 연결을 끊은 경우 남은 작업 정리
+            if not action_items_task.done():
+                action_items_task.cancel()
+        
+        if not stage_errors:
+            self._store_semantic_cache(
+                query, query_vector, top, "".join(summary_parts), action_items, corpus_version, filters
+            )
+        
+        yield {"type": "action_items", "action_items": action_items}
+        yield {
+            "type": "done",
+            "metadata": self._build_metadata(
+                documents, search_method, stage_errors, None, timings, started, context_usage, filters
+            )
+        }
+    
+    def _build_metadata(
+        self,
+        documents: List[Dict],
+        search_method: str,
+        stage_errors: Dict,
+        semantic_hit: Optional[Dict] = None,
+        timings: Optional[Dict] = None,
+        started: Optional[float] = None,
+        context_usage: Optional[Dict] = None,
+        filters: Optional[Dict] = None
+    ) -> Dict:
+        """
+        응답 metadata 생성
+        
+        timings_ms: 단계별 소요 시간 (밀리초). 요약 / 액션 아이템은 동시에 실행되므로
+        단계 합계가 total보다 클 수 있다.
+        context_tokens: 프롬프트별 문서 컨텍스트 토큰 사용량 (LLM을 호출한 경우만)
+        filters: 실제로 적용한 검색 필터 (요청 + 질문에서 뽑은 것, 결과가 없어 다시 검색했으면 요청 필터만)
+        """
+        metadata = {
+            "documents_found": len(documents),
+            "search_method": search_method,
+            "index_mode": self.index_mode,
+            "filters": filters or {},
+            "ai_model": "gpt-4",
+            "stage_errors": stage_errors
+        }
+        if timings is not None:
+            if started is not None:
+                timings["total"] = round((time.perf_counter() - started) * 1000, 1)
+            metadata["timings_ms"] = timings
+        if context_usage:
+            metadata["context_tokens"] = context_usage
+        if self.semantic_cache:
+            metadata["semantic_cache"] = {
+                "hit": semantic_hit is not None,
+                "similarity": round(semantic_hit["similarity"], 4) if semantic_hit else None,
+                "matched_query": semantic_hit["query"] if semantic_hit else None
+            }
+        return metadata
+    
+    async def close(self):
+        """내부 비동기 클라이언트 정리"""
+        await self.openai_client.close()
+        await self.search_service.close()
+        self.embedding_cache.close()
@@ -0,0 +1,58 @@
+"""
+검색 결과 순위 결합
+"""
+from typing import Dict, List, Sequence, Tuple
+
+# Azure AI Search 하이브리드 검색과 같은 RRF 상수
+RRF_K = 60
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[str]],
+    k: int = RRF_K,
+    weights: Sequence[float] = None,
+    limit: int = None
+) -> List[Tuple[str, float]]:
+    """
+    Reciprocal Rank Fusion
+    
+    각 순위 목록에서 rank번째(1부터) 문서에 weight / (k + rank) 점수를 주고 합산한다.
+    점수 크기가 다른 검색(BM25 / 코사인)을 정규화 없이 순위만으로 결합할 수 있다.
+    
+    Args:
+        rankings: 문서 ID 순위 목록들 (좋은 순서)
+        k: 하위 순위 영향 완화 상수
+        weights: 순위 목록별 가중치 (없으면 모두 1)
+        limit: 반환할 최대 개수
+    
+    Returns:
+        [(문서 ID, RRF 점수)] (점수 내림차순)
+    """
+    if weights is None:
+        weights = [1.0] * len(rankings)
+    
+    scores: Dict[str, float] = {}
+    for ranking, weight in zip(rankings, weights):
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + weight / (k + rank)
+    
+    fused = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    return fused[:limit] if limit is not None else fused
+
+
+def fuse_documents(result_lists: Sequence[Sequence[Dict]], limit: int = None) -> List[Dict]:
+    """
+    검색 결과(문서 딕셔너리) 목록들을 RRF로 결합
+    
+    같은 ID는 처음 나온 문서를 사용하고, score는 RRF 점수로 바꾼다.
+    """
+    by_id: Dict[str, Dict] = {}
+    for documents in result_lists:
+        for document in documents:
+            by_id.setdefault(document["id"], document)
+    
+    fused = reciprocal_rank_fusion(
+        [[document["id"] for document in documents] for documents in result_lists],
+        limit=limit
+    )
+    return [{**by_id[doc_id], "score": score} for doc_id, score in fused]
@@ -0,0 +1,57 @@
+"""
+동일 요청 합치기 (single-flight)
+같은 키로 동시에 들어온 요청은 진행 중인 계산 하나를 함께 기다린다
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+
+class SingleFlight:
+    """
+    진행 중인 비동기 계산을 키별로 공유 (asyncio 이벤트 루프 안에서만 사용)
+    
+    - 첫 요청(leader)이 계산을 시작하고, 같은 키로 뒤따라온 요청은 그 결과를 공유
+    - 기다리던 요청 하나가 취소(클라이언트 연결 종료)되어도 공유 계산은 계속 진행
+    - 계산이 끝나면 키가 비워지므로, 이후 요청은 결과 캐시를 통해 처리
+    """
+    
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+        
+        self.leaders = 0
+        self.coalesced = 0
+    
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        key에 대해 fn()을 최대 한 번만 동시에 실행
+        
+        Returns:
+            (결과, 다른 요청의 계산을 공유했는지 여부)
+        """
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return await asyncio.shield(task), True
+        
+        task = asyncio.ensure_future(fn())
+        self._inflight[key] = task
+        task.add_done_callback(lambda done: self._forget(key, done))
+        self.leaders += 1
+        
+        return await asyncio.shield(task), False
+    
+    def get_inflight(self, key: str) -> Optional[asyncio.Task]:
+        """진행 중인 계산 조회 (없으면 None)"""
+        return self._inflight.get(key)
+    
+    def _forget(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+    
+    def stats(self) -> Dict:
+        """합치기 현황 (헬스 체크용)"""
+        return {
+            "inflight": len(self._inflight),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced
+        }
@@ -0,0 +1,109 @@
+"""
+검색 결과 스니펫
+/analyze 응답에는 본문 대신 질문과 관련된 짧은 발췌(스니펫)만 담는다.
+전체 본문은 GET /documents/{id}로 따로 조회.
+"""
+import os
+import re
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
+
+from backend.service.bm25_index import tokenize
+
+load_dotenv()
+
+# 스니펫 최대 길이 (글자 수)
+SNIPPET_CHARS = int(os.getenv("KITE_SNIPPET_CHARS", "200"))
+
+# 일치한 단어 강조 태그 (Streamlit 마크다운에서 굵게 표시)
+HIGHLIGHT_PRE_TAG = "**"
+HIGHLIGHT_POST_TAG = "**"
+
+# /analyze 응답 문서에 남기는 필드
+RESPONSE_DOCUMENT_FIELDS = ("id", "title", "source", "date", "sender", "score", "snippet")
+
+_WHITESPACE = re.compile(r"\s+")
+_HIGHLIGHTED = re.compile(f"{re.escape(HIGHLIGHT_PRE_TAG)}(.*?){re.escape(HIGHLIGHT_POST_TAG)}")
+
+
+def _flatten(text: str) -> str:
+    return _WHITESPACE.sub(" ", text or "").strip()
+
+
+def lead_snippet(content: str, max_chars: int = SNIPPET_CHARS) -> str:
+    """본문 앞부분 스니펫 (일치한 단어가 없을 때)"""
+    text = _flatten(content)
+    return text if len(text) <= max_chars else text[:max_chars].rstrip() + "…"
+
+
+def _query_terms(query: str) -> List[str]:
+    """스니펫에서 찾을 단어 (조사를 뗀 어간 / 영문 단어, 긴 것부터)"""
+    terms = {token for token in tokenize(query) if not token.startswith("#") and len(token) > 1}
+    return sorted(terms, key=len, reverse=True)
+
+
+def highlight_snippet(content: str, query: str, max_chars: int = SNIPPET_CHARS) -> str:
+    """
+    질문 단어가 가장 많이 모인 구간을 잘라 일치한 단어를 강조한 스니펫
+    
+    일치한 단어가 없으면 앞부분 스니펫.
+    """
+    text = _flatten(content)
+    terms = _query_terms(query)
+    if not text or not terms:
+        return lead_snippet(text, max_chars)
+    
+    pattern = re.compile("|".join(re.escape(term) for term in terms), re.IGNORECASE)
+    starts = [match.start() for match in pattern.finditer(text)]
+    if not starts:
+        return lead_snippet(text, max_chars)
+    
+    # 일치 위치가 가장 많이 들어가는 창 (첫 일치 앞에 약간의 맥락을 남김)
+    best_start, best_count, end = starts[0], 0, 0
+    for i, start in enumerate(starts):
+        while end < len(starts) and starts[end] < start + max_chars:
+            end += 1
+        if end - i > best_count:
+            best_start, best_count = start, end - i
+    begin = max(0, min(best_start - max_chars // 5, len(text) - max_chars))
+    window = text[begin:begin + max_chars]
+    
+    snippet = pattern.sub(lambda match: f"{HIGHLIGHT_PRE_TAG}{match.group(0)}{HIGHLIGHT_POST_TAG}", window)
+    return ("…" if begin > 0 else "") + snippet + ("…" if begin + max_chars < len(text) else "")
+
+
+def _truncate_highlighted(text: str, max_chars: int) -> str:
+    """강조 태그를 빼고 max_chars 글자까지 자르기 (강조 중간에서 잘리면 태그를 닫음)"""
+    pieces, last = [], 0
+    for match in _HIGHLIGHTED.finditer(text):
+        pieces += [(text[last:match.start()], False), (match.group(1), True)]
+        last = match.end()
+    pieces.append((text[last:], False))
+    if sum(len(piece) for piece, _ in pieces) <= max_chars:
+        return text
+    
+    kept, remaining = [], max_chars
+    for piece, highlighted in pieces:
+        piece = piece[:remaining]
+        remaining -= len(piece)
+        if piece:
+            kept.append(f"{HIGHLIGHT_PRE_TAG}{piece}{HIGHLIGHT_POST_TAG}" if highlighted else piece)
+        if not remaining:
+            break
+    return "".join(kept).rstrip() + "…"
+
+
+def search_highlight_snippet(highlights: Optional[Dict], content: str, max_chars: int = SNIPPET_CHARS) -> str:
+    """Azure AI Search @search.highlights로 스니펫 만들기 (최대 max_chars 글자, 없으면 앞부분)"""
+    fragments = (highlights or {}).get("content") or []
+    if not fragments:
+        return lead_snippet(content, max_chars)
+    return _truncate_highlighted(" … ".join(_flatten(fragment) for fragment in fragments[:2]), max_chars)
+
+
+def response_document(document: Dict) -> Dict:
+    """/analyze 응답용 문서 (본문 제외, 스니펫이 없으면 앞부분으로 채움)"""
+    summary = {field: document.get(field) for field in RESPONSE_DOCUMENT_FIELDS}
+    if not summary["snippet"]:
+        summary["snippet"] = lead_snippet(document.get("content") or "")
+    return summary
@@ -0,0 +1,94 @@
+"""
+벡터 압축 (임베딩 차원 축소 + 양자화)
+코퍼스가 커질수록 선형으로 늘어나는 벡터 메모리 / 인덱스 비용을 줄인다.
+
+- KITE_EMBEDDING_DIMENSIONS: 임베딩 차원 (text-embedding-3-small의 dimensions 파라미터,
+  기본 1536 = 축소 안 함). 바꾸면 인덱스를 다시 만들고 문서를 다시 색인해야 한다.
+- KITE_VECTOR_COMPRESSION: none / int8 (스칼라 양자화, 1/4) / binary (부호 비트, 1/32)
+- KITE_VECTOR_RESCORE: 양자화 점수로 뽑은 후보를 다시 계산하는 방식
+    originals: 원본 float32 벡터로 정확히 계산 (원본도 보관)
+    quantized: 원본을 버리고 float 쿼리 × 양자화 벡터로 계산 (메모리 최소)
+- KITE_VECTOR_OVERSAMPLING: 재계산할 후보 수 = k × 이 값
+"""
+import os
+from typing import Dict, Tuple
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# text-embedding-3-small 기본 차원
+EMBEDDING_MODEL_DIMENSIONS = 1536
+
+COMPRESSIONS = ("none", "int8", "binary")
+RESCORE_METHODS = ("originals", "quantized")
+
+
+def embedding_dimensions() -> int:
+    """KITE_EMBEDDING_DIMENSIONS (기본 1536)"""
+    return int(os.getenv("KITE_EMBEDDING_DIMENSIONS", str(EMBEDDING_MODEL_DIMENSIONS)))
+
+
+def embedding_request_options() -> Dict:
+    """embeddings.create 추가 파라미터 (축소할 때만 dimensions를 보냄, ada-002 호환)"""
+    dimensions = embedding_dimensions()
+    return {"dimensions": dimensions} if dimensions != EMBEDDING_MODEL_DIMENSIONS else {}
+
+
+def vector_compression() -> str:
+    """KITE_VECTOR_COMPRESSION (none / int8 / binary, 알 수 없는 값이면 none)"""
+    compression = os.getenv("KITE_VECTOR_COMPRESSION", "none").strip().lower()
+    return compression if compression in COMPRESSIONS else "none"
+
+
+def vector_rescore() -> str:
+    """KITE_VECTOR_RESCORE (originals / quantized, 알 수 없는 값이면 originals)"""
+    method = os.getenv("KITE_VECTOR_RESCORE", "originals").strip().lower()
+    return method if method in RESCORE_METHODS else "originals"
+
+
+def vector_oversampling() -> float:
+    """KITE_VECTOR_OVERSAMPLING (기본 4)"""
+    return max(float(os.getenv("KITE_VECTOR_OVERSAMPLING", "4")), 1.0)
+
+
+def reduce_dimensions(vectors: np.ndarray, dimensions: int) -> np.ndarray:
+    """
+    앞 dimensions개 차원만 남기고 다시 정규화
+    
+    text-embedding-3의 dimensions 파라미터와 같은 방식 (이미 만든 임베딩을 줄일 때 / 벤치마크용).
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)[..., :dimensions]
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def quantize_int8(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    행 단위 대칭 스칼라 양자화
+    
+    Returns:
+        (int8 코드, 행별 scale) → 원래 값 ≈ 코드 × scale
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    scales = np.abs(vectors).max(axis=-1) / 127
+    scales[scales == 0] = 1.0
+    codes = np.clip(np.rint(vectors / scales[..., None]), -127, 127).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def quantize_binary(vectors: np.ndarray) -> np.ndarray:
+    """부호 비트 양자화 (양수 = 1, 8차원씩 uint8 하나로 묶음)"""
+    return np.packbits(np.asarray(vectors) > 0, axis=-1)
+
+
+def binary_dot(query: np.ndarray, codes: np.ndarray) -> np.ndarray:
+    """
+    float 쿼리 × 부호 벡터(±1 / √dim) 내적 (원본 없이 재계산할 때)
+    
+    q·s = 2 × Σ(비트가 1인 차원의 q) − Σq
+    """
+    dim = query.shape[0]
+    bits = np.unpackbits(codes, axis=-1, count=dim).astype(np.float32)
+    return (2 * (bits @ query) - query.sum()) / np.sqrt(dim)
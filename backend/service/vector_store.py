@@ -0,0 +1,270 @@
+"""
+메모리 벡터 인덱스
+content_vector 임베딩을 연속된 행렬 하나에 보관하고 코사인 유사도 top-k 검색
+(KITE_VECTOR_COMPRESSION으로 int8 / binary 양자화 저장, vector_compression.py 참고)
+"""
+import math
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+
+from backend.service.vector_compression import binary_dot, quantize_binary, quantize_int8
+
+# int8 점수 계산 시 한 번에 float32로 바꾸는 행 수 (임시 메모리 제한)
+_INT8_BLOCK_ROWS = 4096
+
+
+class VectorIndex:
+    """
+    코사인 top-k 검색용 벡터 인덱스
+    
+    - 벡터는 추가할 때 L2 정규화해서 (capacity, dim) 행렬에 연속으로 저장
+      → 검색은 행렬-벡터 곱 한 번 + argpartition(부분 정렬)
+    - 행렬이 가득 차면 2배로 늘림 (추가 비용 분할 상환)
+    - 삭제는 마지막 행을 빈자리로 옮겨서(swap-with-last) 빈칸 없이 유지
+    - 같은 ID로 다시 추가하면 덮어쓰기 (upsert)
+    
+    compression (none / int8 / binary):
+    - int8: 행마다 scale 하나 + int8 코드 (float32의 1/4)
+    - binary: 부호 비트 (float32의 1/32), 해밍 거리로 후보 선택
+    - 양자화 점수로 k × oversampling개 후보를 뽑은 뒤 rescore 방식으로 다시 계산
+      (originals: 원본 float32 보관 후 정확한 코사인, quantized: 원본 없이 양자화 벡터로)
+    """
+    
+    def __init__(
+        self,
+        dim: int = None,
+        initial_capacity: int = 1024,
+        compression: str = "none",
+        rescore: str = "originals",
+        oversampling: float = 4.0
+    ):
+        if compression not in ("none", "int8", "binary"):
+            raise ValueError(f"알 수 없는 압축 방식: {compression}")
+        self.dim = dim
+        self.compression = compression
+        self.rescore = rescore if compression != "none" else "originals"
+        self.oversampling = max(oversampling, 1.0)
+        self._initial_capacity = max(initial_capacity, 1)
+        # 행 단위 배열 (이름 → (capacity, ...) 배열), 같은 행 번호로 함께 늘리고 옮김
+        self._arrays: Dict[str, np.ndarray] = {}
+        self._ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self._ids)
+    
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._rows
+    
+    def ids(self) -> List[str]:
+        """저장된 ID 목록 (행 순서)"""
+        return list(self._ids)
+    
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+    
+    def _row_layout(self) -> Dict[str, Tuple[tuple, type]]:
+        """저장할 행 배열 (이름 → (행 하나의 shape, dtype))"""
+        layout = {}
+        if self.compression == "none" or self.rescore == "originals":
+            layout["matrix"] = ((self.dim,), np.float32)
+        if self.compression == "int8":
+            layout["codes"] = ((self.dim,), np.int8)
+            layout["scales"] = ((), np.float32)
+        elif self.compression == "binary":
+            layout["codes"] = (((self.dim + 7) // 8,), np.uint8)
+        return layout
+    
+    def _encode(self, vectors: np.ndarray) -> Dict[str, np.ndarray]:
+        """정규화된 벡터 → 행 배열별 값"""
+        encoded = {}
+        if "matrix" in self._arrays:
+            encoded["matrix"] = vectors
+        if self.compression == "int8":
+            encoded["codes"], encoded["scales"] = quantize_int8(vectors)
+        elif self.compression == "binary":
+            encoded["codes"] = quantize_binary(vectors)
+        return encoded
+    
+    def _reserve(self, size: int):
+        """행렬 용량을 size 이상으로 확보"""
+        if not self._arrays:
+            capacity = max(self._initial_capacity, size)
+            self._arrays = {
+                name: np.empty((capacity, *shape), dtype=dtype)
+                for name, (shape, dtype) in self._row_layout().items()
+            }
+            return
+        
+        capacity = next(iter(self._arrays.values())).shape[0]
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        for name, array in self._arrays.items():
+            grown = np.empty((capacity, *array.shape[1:]), dtype=array.dtype)
+            grown[:len(self._ids)] = array[:len(self._ids)]
+            self._arrays[name] = grown
+    
+    def add(self, ids: Sequence[str], vectors) -> int:
+        """
+        벡터 추가 (이미 있는 ID는 덮어쓰기)
+        
+        Returns:
+            새로 추가된 개수
+        """
+        if not len(ids):
+            return 0
+        
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(ids), -1)
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+        if vectors.shape[1] != self.dim:
+            raise ValueError(f"벡터 차원 불일치: {vectors.shape[1]} (인덱스: {self.dim})")
+        vectors = self._normalize(vectors)
+        
+        added = 0
+        with self._lock:
+            # 같은 배치 안에서 중복된 ID는 마지막 값 사용
+            latest = {doc_id: i for i, doc_id in enumerate(ids)}
+            new_ids = [doc_id for doc_id in latest if doc_id not in self._rows]
+            self._reserve(len(self._ids) + len(new_ids))
+            encoded = self._encode(vectors)
+            
+            for doc_id, i in latest.items():
+                row = self._rows.get(doc_id)
+                if row is None:
+                    row = len(self._ids)
+                    self._rows[doc_id] = row
+                    self._ids.append(doc_id)
+                    added += 1
+                for name, values in encoded.items():
+                    self._arrays[name][row] = values[i]
+        
+        return added
+    
+    def delete(self, ids: Iterable[str]) -> int:
+        """
+        벡터 삭제 (없는 ID는 무시)
+        
+        Returns:
+            삭제된 개수
+        """
+        deleted = 0
+        with self._lock:
+            for doc_id in ids:
+                row = self._rows.pop(doc_id, None)
+                if row is None:
+                    continue
+                
+                last = len(self._ids) - 1
+                if row != last:
+                    # 마지막 행을 빈자리로 이동
+                    moved_id = self._ids[last]
+                    for array in self._arrays.values():
+                        array[row] = array[last]
+                    self._ids[row] = moved_id
+                    self._rows[moved_id] = row
+                self._ids.pop()
+                deleted += 1
+        
+        return deleted
+    
+    @staticmethod
+    def _top(scores: np.ndarray, k: int) -> np.ndarray:
+        """점수 상위 k개 위치 (점수 내림차순), 전체 정렬 대신 argpartition"""
+        n = len(scores)
+        k = min(k, n)
+        top = np.argpartition(scores, n - k)[n - k:] if k < n else np.arange(n)
+        return top[np.argsort(scores[top])[::-1]]
+    
+    def _rows_of(self, name: str, rows: Optional[np.ndarray], n: int) -> np.ndarray:
+        array = self._arrays[name]
+        return array[:n] if rows is None else array[rows]
+    
+    def _quantized_scores(self, query: np.ndarray, rows: Optional[np.ndarray], n: int) -> np.ndarray:
+        """양자화 벡터로 근사 점수 (int8: 역양자화 내적, binary: 1 − 2 × 해밍 거리 / dim)"""
+        codes = self._arrays["codes"]
+        if self.compression == "binary":
+            query_bits = quantize_binary(query)
+            block = codes[:n] if rows is None else codes[rows]
+            distance = np.bitwise_count(block ^ query_bits).sum(axis=1, dtype=np.int32)
+            return 1 - 2 * distance.astype(np.float32) / self.dim
+        
+        scores = np.empty(n, dtype=np.float32)
+        for start in range(0, n, _INT8_BLOCK_ROWS):
+            end = min(start + _INT8_BLOCK_ROWS, n)
+            block = codes[start:end] if rows is None else codes[rows[start:end]]
+            scores[start:end] = block.astype(np.float32) @ query
+        return scores * self._rows_of("scales", rows, n)
+    
+    def search(self, vector, k: int = 5, allowed: Optional[Iterable[str]] = None) -> List[Tuple[str, float]]:
+        """
+        코사인 유사도 top-k
+        
+        allowed를 넘기면 그 ID의 행만 모아서 계산한다 (필터 조건에 맞는 후보, pre-filter).
+        양자화 저장이면 근사 점수로 k × oversampling개를 고른 뒤 다시 계산해서 순위를 정한다.
+        
+        Returns:
+            [(ID, 유사도)] (유사도 내림차순)
+        """
+        with self._lock:
+            n = len(self._ids)
+            if n == 0 or k <= 0:
+                return []
+            
+            query = np.asarray(vector, dtype=np.float32)
+            if query.shape != (self.dim,):
+                raise ValueError(f"쿼리 벡터 차원 불일치: {query.shape} (인덱스: {self.dim})")
+            norm = np.linalg.norm(query)
+            if norm == 0:
+                return []
+            query = query / norm
+            
+            rows = None
+            if allowed is not None:
+                rows = np.fromiter(
+                    (self._rows[doc_id] for doc_id in allowed if doc_id in self._rows), dtype=np.int64
+                )
+                n = len(rows)
+                if n == 0:
+                    return []
+            
+            if self.compression == "none":
+                scores = self._rows_of("matrix", rows, n) @ query
+                top = self._top(scores, k)
+                ids = top if rows is None else rows[top]
+                return [(self._ids[i], float(score)) for i, score in zip(ids, scores[top])]
+            
+            # 1단계: 양자화 점수로 후보 선택
+            approximate = self._quantized_scores(query, rows, n)
+            candidates = self._top(approximate, math.ceil(k * self.oversampling))
+            candidate_rows = candidates if rows is None else rows[candidates]
+            
+            # 2단계: 후보만 다시 계산
+            if self.rescore == "originals":
+                scores = self._arrays["matrix"][candidate_rows] @ query
+            elif self.compression == "int8":
+                scores = approximate[candidates]
+            else:
+                scores = binary_dot(query, self._arrays["codes"][candidate_rows])
+            
+            top = self._top(scores, k)
+            return [(self._ids[candidate_rows[i]], float(scores[i])) for i in top]
+    
+    def stats(self) -> Dict:
+        """인덱스 상태 (헬스 체크용)"""
+        capacity = next(iter(self._arrays.values())).shape[0] if self._arrays else 0
+        return {
+            "size": len(self._ids),
+            "dim": self.dim,
+            "compression": self.compression,
+            "rescore": self.rescore,
+            "capacity": capacity,
+            "memory_bytes": sum(array.nbytes for array in self._arrays.values())
+        }
@@ -0,0 +1,380 @@
+"""
+/analyze 부하 테스트 / 지연 시간 벤치마크
+
+- 대상: 프로세스 안 FastAPI 앱(기본, httpx ASGI) 또는 --url 로 지정한 서버(uvicorn 등)
+- 부하: closed-loop(동시 작업자 N명이 응답을 받는 즉시 다음 요청) / open-loop(--rate, 초당 요청 수 고정)
+- 결과: 처리량 + 전체 / 단계별(metadata.timings_ms) p50 / p95 / p99 → JSON 파일
+- --compare 로 이전 결과와 비교해서 p95가 --threshold 이상 나빠지면 종료 코드 1
+
+예시:
+    # 로컬 백엔드 (Azure 미사용), 동시 20명, 30초, 캐시 끔
+    python scripts/benchmark_load.py --concurrency 20 --duration 30 --no-cache --output bench.json
+
+    # 초당 50건 open-loop, 이전 결과와 비교
+    python scripts/benchmark_load.py --rate 50 --duration 30 --compare bench.json
+
+    # 실행 중인 서버 대상
+    python scripts/benchmark_load.py --url http://localhost:8000 --concurrency 10
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import platform
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List
+
+import httpx
+import numpy as np
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+# scripts/test_rag.py와 같은 질문
+DEFAULT_QUERIES = [
+    "Redis Stream 테이블 설계가 뭐야?",
+    "CHUB 프로젝트에서 DBA는 누구야?",
+    "마감일이 언제야?",
+    "파티셔닝 전략은 뭐야?"
+]
+
+PERCENTILES = (50, 95, 99)
+
+# 비교 시 사용하는 지표 (값이 클수록 나쁨)
+COMPARE_METRICS = ("p50", "p95", "p99")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="/analyze 부하 테스트")
+    
+    target = parser.add_argument_group("대상")
+    target.add_argument("--url", help="벤치마크할 서버 주소 (없으면 프로세스 안에서 앱 실행)")
+    target.add_argument("--backend", choices=["local", "azure"], default="local",
+                        help="프로세스 안 실행 시 백엔드 (기본: local)")
+    target.add_argument("--endpoint", default="/analyze", help="요청 경로 (기본: /analyze)")
+    
+    load = parser.add_argument_group("부하")
+    load.add_argument("--concurrency", type=int, default=10, help="closed-loop 동시 작업자 수")
+    load.add_argument("--rate", type=float, help="open-loop 초당 요청 수 (지정하면 open-loop)")
+    load.add_argument("--duration", type=float, default=20.0, help="측정 시간 (초)")
+    load.add_argument("--requests", type=int, help="총 요청 수 (지정하면 duration 대신 사용)")
+    load.add_argument("--warmup", type=int, default=5, help="측정에서 제외할 워밍업 요청 수")
+    load.add_argument("--queries", help="질문 파일 (한 줄에 하나)")
+    load.add_argument("--unique", action="store_true", help="요청마다 질문을 다르게 만들어 캐시 적중 방지")
+    load.add_argument("--no-cache", action="store_true", help="질문 / 의미 캐시 비활성화 (프로세스 안 실행 시)")
+    load.add_argument("--timeout", type=float, default=60.0, help="요청 타임아웃 (초)")
+    load.add_argument("--seed", type=int, default=0, help="질문 선택 / 도착 간격 난수 시드")
+    
+    upstream = parser.add_argument_group("로컬 백엔드 지연 시간 (--backend local)")
+    upstream.add_argument("--embedding-latency-ms", type=float, default=30.0)
+    upstream.add_argument("--search-latency-ms", type=float, default=20.0)
+    upstream.add_argument("--chat-latency-ms", type=float, default=300.0, help="첫 토큰까지 지연")
+    upstream.add_argument("--tokens-per-second", type=float, default=50.0, help="0이면 즉시 생성")
+    
+    report = parser.add_argument_group("결과")
+    report.add_argument("--output", help="결과 JSON 파일 경로")
+    report.add_argument("--compare", help="비교할 이전 결과 JSON 파일")
+    report.add_argument("--threshold", type=float, default=0.10,
+                        help="회귀로 판단할 p95 증가 비율 (기본: 0.10 = 10%%)")
+    
+    return parser.parse_args()
+
+
+def configure_environment(args: argparse.Namespace):
+    """프로세스 안 실행용 환경 변수 (backend 모듈 import 전에 설정해야 함)"""
+    os.environ["KITE_BACKEND"] = args.backend
+    os.environ["KITE_LOCAL_EMBEDDING_LATENCY_MS"] = str(args.embedding_latency_ms)
+    os.environ["KITE_LOCAL_SEARCH_LATENCY_MS"] = str(args.search_latency_ms)
+    os.environ["KITE_LOCAL_CHAT_LATENCY_MS"] = str(args.chat_latency_ms)
+    os.environ["KITE_LOCAL_TOKENS_PER_SECOND"] = str(args.tokens_per_second)
+    
+    # 실행마다 같은 조건이 되도록 디스크 임베딩 캐시는 사용하지 않음
+    os.environ["KITE_EMBEDDING_CACHE_PATH"] = ""
+    if args.no_cache:
+        os.environ["KITE_QUERY_CACHE_SIZE"] = "0"
+        os.environ["KITE_SEMANTIC_CACHE_SIZE"] = "0"
+
+
+def load_queries(args: argparse.Namespace) -> List[str]:
+    if not args.queries:
+        return DEFAULT_QUERIES
+    lines = Path(args.queries).read_text(encoding="utf-8").splitlines()
+    return [line.strip() for line in lines if line.strip()]
+
+
+class LoadRunner:
+    """요청 생성 / 결과 수집"""
+    
+    def __init__(self, client: httpx.AsyncClient, args: argparse.Namespace, queries: List[str]):
+        self.client = client
+        self.args = args
+        self.queries = queries
+        self.random = random.Random(args.seed)
+        self.sent = 0
+        self.results: List[Dict] = []
+    
+    def next_query(self) -> str:
+        query = self.random.choice(self.queries)
+        self.sent += 1
+        if self.args.unique:
+            query = f"{query} #{self.sent}"
+        return query
+    
+    async def send(self, query: str, scheduled: float = None, record: bool = True) -> Dict:
+        """
+        요청 하나 전송
+        
+        open-loop에서는 scheduled(예정 시각)부터 지연 시간을 재서 서버가 밀린 시간도 포함한다
+        (coordinated omission 방지).
+        """
+        start = scheduled if scheduled is not None else time.perf_counter()
+        result = {"ok": False, "timings_ms": {}, "cache": None, "coalesced": None}
+        try:
+            response = await self.client.post(self.args.endpoint, json={"query": query})
+            body = response.json()
+            metadata = body.get("metadata", {})
+            result.update(
+                ok=response.status_code == 200 and "error" not in body and not metadata.get("stage_errors"),
+                status_code=response.status_code,
+                timings_ms=metadata.get("timings_ms", {}),
+                cache=metadata.get("cache"),
+                coalesced=metadata.get("coalesced")
+            )
+            if "error" in body:
+                result["error"] = body["error"]
+        except Exception as e:
+            result["error"] = f"{type(e).__name__}: {e}"
+        
+        result["latency_ms"] = (time.perf_counter() - start) * 1000
+        result["finished_at"] = time.perf_counter()
+        if record:
+            self.results.append(result)
+        return result
+    
+    async def warmup(self):
+        for _ in range(self.args.warmup):
+            await self.send(self.next_query(), record=False)
+    
+    async def closed_loop(self):
+        """동시 작업자 N명이 응답을 받는 즉시 다음 요청"""
+        deadline = time.perf_counter() + self.args.duration
+        # 워밍업 요청은 총 요청 수에서 제외
+        last = self.sent + self.args.requests if self.args.requests is not None else None
+        
+        async def worker():
+            while True:
+                if last is not None:
+                    if self.sent >= last:
+                        return
+                elif time.perf_counter() >= deadline:
+                    return
+                await self.send(self.next_query())
+        
+        await asyncio.gather(*(worker() for _ in range(self.args.concurrency)))
+    
+    async def open_loop(self):
+        """초당 rate건을 포아송 도착으로 전송 (응답 대기와 무관)"""
+        start = time.perf_counter()
+        total = self.args.requests
+        if total is None:
+            total = int(self.args.rate * self.args.duration)
+        
+        tasks = []
+        scheduled = start
+        for _ in range(total):
+            scheduled += self.random.expovariate(self.args.rate)
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(self.send(self.next_query(), scheduled=scheduled)))
+        
+        await asyncio.gather(*tasks)
+
+
+def summarize(values: List[float]) -> Dict:
+    """지연 시간 목록 → 백분위 요약 (밀리초)"""
+    if not values:
+        return {"count": 0}
+    array = np.asarray(values, dtype=np.float64)
+    summary = {"count": len(values), "mean": round(float(array.mean()), 2)}
+    for p, value in zip(PERCENTILES, np.percentile(array, PERCENTILES)):
+        summary[f"p{p}"] = round(float(value), 2)
+    summary["max"] = round(float(array.max()), 2)
+    return summary
+
+
+def build_report(results: List[Dict], elapsed: float, args: argparse.Namespace) -> Dict:
+    ok = [r for r in results if r["ok"]]
+    
+    # 캐시 적중 / 합류한 응답의 timings_ms는 원래 계산의 값이므로 단계별 통계에서 제외
+    stages: Dict[str, List[float]] = {}
+    for r in ok:
+        if r["cache"] == "hit" or r["coalesced"]:
+            continue
+        for stage, ms in r["timings_ms"].items():
+            stages.setdefault(stage, []).append(ms)
+    
+    cache_counts: Dict[str, int] = {}
+    for r in ok:
+        key = r["cache"] or "none"
+        cache_counts[key] = cache_counts.get(key, 0) + 1
+    
+    errors: Dict[str, int] = {}
+    for r in results:
+        if not r["ok"]:
+            key = str(r.get("error", "stage_errors"))[:120]
+            errors[key] = errors.get(key, 0) + 1
+    
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count()
+        },
+        "config": {
+            key: value for key, value in vars(args).items()
+            if key not in ("output", "compare", "threshold")
+        },
+        "mode": "open-loop" if args.rate else "closed-loop",
+        "elapsed_seconds": round(elapsed, 3),
+        "requests": len(results),
+        "succeeded": len(ok),
+        "failed": len(results) - len(ok),
+        "throughput_rps": round(len(ok) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": summarize([r["latency_ms"] for r in ok]),
+        "stages_ms": {stage: summarize(values) for stage, values in sorted(stages.items())},
+        "cache": cache_counts,
+        "coalesced": sum(1 for r in ok if r["coalesced"]),
+        "errors": errors
+    }
+
+
+def print_report(report: Dict):
+    print("\n" + "=" * 72)
+    print(f"📊 {report['mode']} | 요청 {report['requests']}건 "
+          f"(성공 {report['succeeded']} / 실패 {report['failed']}) | {report['elapsed_seconds']}초")
+    print(f"⚡ 처리량: {report['throughput_rps']} req/s | 캐시: {report['cache']} | 합류: {report['coalesced']}")
+    print("=" * 72)
+    print(f"{'stage':<24}{'count':>7}{'mean':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}")
+    
+    rows = [("request", report["latency_ms"])] + list(report["stages_ms"].items())
+    for stage, s in rows:
+        if not s.get("count"):
+            continue
+        print(f"{stage:<24}{s['count']:>7}{s['mean']:>10}{s['p50']:>10}{s['p95']:>10}{s['p99']:>10}{s['max']:>10}")
+    
+    for error, count in report["errors"].items():
+        print(f"❌ {count}건: {error}")
+
+
+def compare_reports(current: Dict, baseline: Dict, threshold: float) -> bool:
+    """
+    이전 결과와 비교 출력
+    
+    Returns:
+        p95 회귀(threshold 초과 증가) 또는 처리량 감소가 있으면 True
+    """
+    print("\n" + "=" * 72)
+    print(f"🔍 이전 결과와 비교 (기준: {baseline.get('created_at')})")
+    print("=" * 72)
+    
+    regressed = False
+    rows = [("request", current["latency_ms"], baseline.get("latency_ms", {}))]
+    rows += [
+        (stage, s, baseline["stages_ms"][stage])
+        for stage, s in current["stages_ms"].items()
+        if stage in baseline.get("stages_ms", {})
+    ]
+    for stage, now, before in rows:
+        cells = []
+        for metric in COMPARE_METRICS:
+            if metric not in now or not before.get(metric):
+                cells.append(f"{metric} -")
+                continue
+            change = now[metric] / before[metric] - 1
+            cells.append(f"{metric} {before[metric]:.1f}→{now[metric]:.1f} ({change:+.1%})")
+            if metric == "p95" and change > threshold:
+                regressed = True
+                cells[-1] += " ⚠️"
+        print(f"{stage:<24}" + "  ".join(cells))
+    
+    # open-loop 처리량은 요청 속도로 정해지므로 closed-loop끼리만 비교
+    before_rps = baseline.get("throughput_rps") or 0
+    if before_rps and current["mode"] == baseline.get("mode") == "closed-loop":
+        change = current["throughput_rps"] / before_rps - 1
+        flag = ""
+        if change < -threshold:
+            regressed = True
+            flag = " ⚠️"
+        print(f"{'throughput_rps':<24}{before_rps}→{current['throughput_rps']} ({change:+.1%}){flag}")
+    
+    print("\n❌ 성능 회귀 감지" if regressed else "\n✅ 회귀 없음")
+    return regressed
+
+
+async def run(args: argparse.Namespace, queries: List[str]) -> Dict:
+    limits = httpx.Limits(max_connections=max(args.concurrency, 100), max_keepalive_connections=None)
+    
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits)
+        lifespan = None
+    else:
+        from backend.main import app
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app),
+            limits=limits,
+            base_url="http://benchmark",
+            timeout=args.timeout
+        )
+        # ASGITransport는 lifespan 이벤트를 보내지 않으므로 직접 실행
+        lifespan = app.router.lifespan_context(app)
+        await lifespan.__aenter__()
+    
+    try:
+        runner = LoadRunner(client, args, queries)
+        print(f"🔥 워밍업 {args.warmup}건...")
+        await runner.warmup()
+        
+        mode = f"open-loop {args.rate} req/s" if args.rate else f"closed-loop 동시 {args.concurrency}"
+        print(f"🚀 측정 시작: {mode}")
+        start = time.perf_counter()
+        if args.rate:
+            await runner.open_loop()
+        else:
+            await runner.closed_loop()
+        elapsed = time.perf_counter() - start
+        
+        return build_report(runner.results, elapsed, args)
+    finally:
+        await client.aclose()
+        if lifespan is not None:
+            await lifespan.__aexit__(None, None, None)
+
+
+def main() -> int:
+    args = parse_args()
+    if not args.url:
+        configure_environment(args)
+    
+    report = asyncio.run(run(args, load_queries(args)))
+    print_report(report)
+    
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"\n💾 결과 저장: {args.output}")
+    
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        if compare_reports(report, baseline, args.threshold):
+            return 1
+    
+    return 0 if report["succeeded"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
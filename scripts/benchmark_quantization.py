@@ -0,0 +1,216 @@
+"""
+벡터 압축 벤치마크 (임베딩 차원 축소 × 양자화 × 재계산 방식)
+
+전체 차원 float32 정확 검색 결과를 기준으로 설정마다
+recall@k / 벡터 메모리 / 쿼리 지연 시간(p50 / p95) / 색인 시간을 측정한다.
+
+- 코퍼스: --vectors 로 내보낸 임베딩(.npy, N × D) 또는 합성 데이터(기본)
+  합성 데이터는 군집 + 뒤쪽 차원일수록 분산이 작은 구조
+  (text-embedding-3처럼 앞쪽 차원에 정보가 몰려 있어 차원을 잘라도 쓸 만한 경우를 흉내)
+- 차원 축소는 앞 차원만 남기고 다시 정규화 (dimensions 파라미터와 같은 방식)
+- 검색: backend.service.vector_store.VectorIndex (로컬 검색과 같은 코드)
+
+예시:
+    # 기본 (합성 20,000개 × 1536차원)
+    python scripts/benchmark_quantization.py --output quantization.json
+
+    # Azure 인덱스에서 내보낸 실제 임베딩, 차원 / 압축 조합 지정
+    python scripts/benchmark_quantization.py --vectors vectors.npy --dimensions 1536,512 --compressions none,int8
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.service.vector_compression import COMPRESSIONS, RESCORE_METHODS, reduce_dimensions
+from backend.service.vector_store import VectorIndex
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="벡터 압축 recall / 메모리 / 지연 시간 벤치마크")
+    
+    corpus = parser.add_argument_group("코퍼스")
+    corpus.add_argument("--vectors", help="임베딩 파일 (.npy, N × D). 없으면 합성 데이터")
+    corpus.add_argument("--size", type=int, default=20000, help="합성 문서 수")
+    corpus.add_argument("--dim", type=int, default=1536, help="합성 임베딩 차원")
+    corpus.add_argument("--clusters", type=int, default=200, help="합성 데이터 군집 수")
+    corpus.add_argument("--queries", type=int, default=200, help="쿼리 수")
+    corpus.add_argument("--seed", type=int, default=0)
+    
+    grid = parser.add_argument_group("설정 조합 (쉼표로 구분)")
+    grid.add_argument("--dimensions", default="1536,768,512,256", help="임베딩 차원")
+    grid.add_argument("--compressions", default=",".join(COMPRESSIONS), help="none / int8 / binary")
+    grid.add_argument("--rescore", default=",".join(RESCORE_METHODS), help="originals / quantized")
+    grid.add_argument("--oversampling", default="4", help="후보 배수")
+    grid.add_argument("--k", type=int, default=10, help="recall@k의 k")
+    
+    parser.add_argument("--output", help="결과 JSON 파일 경로")
+    return parser.parse_args()
+
+
+def _split(value: str, cast=str) -> List:
+    return [cast(item.strip()) for item in value.split(",") if item.strip()]
+
+
+def synthetic_corpus(args: argparse.Namespace) -> Tuple[np.ndarray, np.ndarray]:
+    """군집 구조 + 차원별로 줄어드는 분산의 합성 임베딩 (문서, 쿼리)"""
+    rng = np.random.default_rng(args.seed)
+    scales = (1 / np.sqrt(1 + np.arange(args.dim) / 64)).astype(np.float32)
+    
+    centers = rng.standard_normal((args.clusters, args.dim), dtype=np.float32) * scales
+    assignment = rng.integers(0, args.clusters, args.size)
+    documents = centers[assignment] + 0.6 * rng.standard_normal((args.size, args.dim), dtype=np.float32) * scales
+    
+    # 쿼리 = 임의 문서 근처 (코퍼스에 그대로 있는 벡터는 아님)
+    anchors = documents[rng.integers(0, args.size, args.queries)]
+    queries = anchors + 0.4 * rng.standard_normal((args.queries, args.dim), dtype=np.float32) * scales
+    return documents, queries
+
+
+def load_corpus(args: argparse.Namespace) -> Tuple[np.ndarray, np.ndarray]:
+    """--vectors가 있으면 그중 일부를 쿼리로 떼어냄 (나머지가 코퍼스)"""
+    if not args.vectors:
+        return synthetic_corpus(args)
+    
+    vectors = np.load(args.vectors).astype(np.float32)
+    rng = np.random.default_rng(args.seed)
+    order = rng.permutation(len(vectors))
+    query_count = min(args.queries, len(vectors) // 10)
+    return vectors[order[query_count:]], vectors[order[:query_count]]
+
+
+def exact_top_k(documents: np.ndarray, queries: np.ndarray, k: int) -> List[set]:
+    """기준 결과 (전체 차원 float32 정확 검색)"""
+    index = VectorIndex()
+    index.add([str(i) for i in range(len(documents))], documents)
+    return [{doc_id for doc_id, _ in index.search(query, k)} for query in queries]
+
+
+def run_config(
+    documents: np.ndarray,
+    queries: np.ndarray,
+    truth: List[set],
+    dimensions: int,
+    compression: str,
+    rescore: str,
+    oversampling: float,
+    k: int
+) -> Dict:
+    reduced_documents = reduce_dimensions(documents, dimensions)
+    reduced_queries = reduce_dimensions(queries, dimensions)
+    ids = [str(i) for i in range(len(documents))]
+    
+    started = time.perf_counter()
+    index = VectorIndex(compression=compression, rescore=rescore, oversampling=oversampling)
+    index.add(ids, reduced_documents)
+    build_seconds = time.perf_counter() - started
+    
+    # 워밍업
+    for query in reduced_queries[:5]:
+        index.search(query, k)
+    
+    latencies, recalls = [], []
+    for query, expected in zip(reduced_queries, truth):
+        started = time.perf_counter()
+        found = index.search(query, k)
+        latencies.append((time.perf_counter() - started) * 1000)
+        recalls.append(len({doc_id for doc_id, _ in found} & expected) / k)
+    
+    memory = index.stats()["memory_bytes"]
+    return {
+        "dimensions": dimensions,
+        "compression": compression,
+        "rescore": rescore if compression != "none" else None,
+        "oversampling": oversampling if compression != "none" else None,
+        f"recall@{k}": round(float(np.mean(recalls)), 4),
+        "memory_bytes": memory,
+        "bytes_per_vector": round(memory / index.stats()["capacity"], 1),
+        "build_seconds": round(build_seconds, 3),
+        "latency_ms": {
+            "p50": round(float(np.percentile(latencies, 50)), 3),
+            "p95": round(float(np.percentile(latencies, 95)), 3)
+        }
+    }
+
+
+def configurations(args: argparse.Namespace, max_dim: int) -> List[Tuple]:
+    configs = []
+    for dimensions in _split(args.dimensions, int):
+        if dimensions > max_dim:
+            print(f"⚠️ {dimensions}차원은 코퍼스 차원({max_dim})보다 커서 건너뜀")
+            continue
+        for compression in _split(args.compressions):
+            if compression == "none":
+                configs.append((dimensions, compression, "originals", 1.0))
+                continue
+            for rescore in _split(args.rescore):
+                for oversampling in _split(args.oversampling, float):
+                    configs.append((dimensions, compression, rescore, oversampling))
+    return configs
+
+
+def print_results(results: List[Dict], k: int, baseline_memory: int):
+    print("\n" + "=" * 96)
+    print(f"{'dim':>6}{'compression':>13}{'rescore':>11}{'over':>6}{f'recall@{k}':>11}"
+          f"{'memory MB':>11}{'ratio':>8}{'p50 ms':>9}{'p95 ms':>9}{'build s':>9}")
+    print("=" * 96)
+    for r in results:
+        ratio = r["memory_bytes"] / baseline_memory if baseline_memory else 0
+        print(f"{r['dimensions']:>6}{r['compression']:>13}{r['rescore'] or '-':>11}{r['oversampling'] or '-':>6}"
+              f"{r[f'recall@{k}']:>11}{r['memory_bytes'] / 1e6:>11.1f}{ratio:>8.3f}"
+              f"{r['latency_ms']['p50']:>9}{r['latency_ms']['p95']:>9}{r['build_seconds']:>9}")
+
+
+def main():
+    args = parse_args()
+    
+    documents, queries = load_corpus(args)
+    print(f"📦 코퍼스: {len(documents)}개 × {documents.shape[1]}차원, 쿼리 {len(queries)}개")
+    
+    truth = exact_top_k(documents, queries, args.k)
+    results = []
+    for config in configurations(args, documents.shape[1]):
+        print(f"🔄 dim={config[0]} compression={config[1]} rescore={config[2]} oversampling={config[3]}")
+        results.append(run_config(documents, queries, truth, *config, k=args.k))
+    
+    # 메모리 비율 기준: 전체 차원 float32
+    baseline = next(
+        (r["memory_bytes"] for r in results if r["compression"] == "none" and r["dimensions"] == documents.shape[1]),
+        None
+    )
+    print_results(results, args.k, baseline)
+    
+    if args.output:
+        report = {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "environment": {
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count()
+            },
+            "corpus": {
+                "source": args.vectors or "synthetic",
+                "documents": len(documents),
+                "dim": int(documents.shape[1]),
+                "queries": len(queries)
+            },
+            "k": args.k,
+            "results": results
+        }
+        Path(args.output).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"\n💾 결과 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
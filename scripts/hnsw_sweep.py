@@ -0,0 +1,376 @@
+"""
+HNSW 파라미터 스윕 (m × efConstruction × efSearch)
+
+정확 검색(brute force) 결과를 기준으로 파라미터 조합마다
+recall@k / 쿼리 지연 시간(p50 / p95) / 색인 시간을 측정하고,
+목표 recall을 만족하는 조합 중 가장 빠른 것을 추천한다.
+
+- 코퍼스: benchmark_quantization.py와 같음 (--vectors .npy 또는 합성 데이터)
+  --export-vectors 로 현재 Azure 인덱스의 content_vector를 .npy로 내보내서 바로 사용할 수 있다.
+- 엔진
+    hnswlib: 로컬 HNSW 구현 (pip install hnswlib, 요청 의존성에는 없음). 빠르게 조합을 훑을 때
+    azure: Azure AI Search에 임시 인덱스를 만들어 측정 (지연 시간에 네트워크 왕복 포함, 끝나면 삭제)
+- 추천 결과(--recommend)는 create_index(hnsw_parameters=...) / KITE_HNSW_CONFIG에 그대로 쓸 수 있다.
+
+예시:
+    # 로컬 (합성 20,000개 × 1536차원)
+    python scripts/hnsw_sweep.py --recommend hnsw_config.json --output hnsw_sweep.json
+
+    # 실제 임베딩으로, Azure AI Search에서 직접
+    python scripts/hnsw_sweep.py --export-vectors vectors.npy --engine azure --size 5000
+    KITE_HNSW_CONFIG=hnsw_config.json python scripts/setup_indexer.py
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from azure.search.documents import SearchClient
+from azure.search.documents.indexes import SearchIndexClient
+from azure.search.documents.indexes.models import (
+    SearchIndex,
+    SearchField,
+    SearchFieldDataType,
+    SimpleField,
+    VectorSearch,
+    VectorSearchProfile,
+    HnswAlgorithmConfiguration
+)
+from azure.core.credentials import AzureKeyCredential
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from scripts.benchmark_quantization import load_corpus, exact_top_k, _split
+from backend.service.vector_compression import reduce_dimensions
+
+# Azure AI Search가 허용하는 HNSW 파라미터 범위
+AZURE_LIMITS = {"m": (4, 10), "efConstruction": (100, 1000), "efSearch": (100, 1000)}
+
+# Azure 업로드 배치 크기 (요청 하나에 1000개까지)
+_UPLOAD_BATCH = 500
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="HNSW 파라미터별 recall / 지연 시간 / 색인 시간 스윕")
+    
+    corpus = parser.add_argument_group("코퍼스")
+    corpus.add_argument("--vectors", help="임베딩 파일 (.npy, N × D). 없으면 합성 데이터")
+    corpus.add_argument("--export-vectors", help="현재 Azure 인덱스의 content_vector를 이 경로(.npy)로 내보낸 뒤 사용")
+    corpus.add_argument("--size", type=int, default=20000, help="합성 문서 수 (내보낸 임베딩이면 최대 문서 수)")
+    corpus.add_argument("--dim", type=int, default=1536, help="합성 임베딩 차원")
+    corpus.add_argument("--clusters", type=int, default=200, help="합성 데이터 군집 수")
+    corpus.add_argument("--queries", type=int, default=200, help="쿼리 수")
+    corpus.add_argument("--dimensions", type=int, help="앞 차원만 남겨서 측정 (KITE_EMBEDDING_DIMENSIONS와 같게)")
+    corpus.add_argument("--seed", type=int, default=0)
+    
+    grid = parser.add_argument_group("파라미터 조합 (쉼표로 구분)")
+    grid.add_argument("--m", default="4,8,10", help="노드당 연결 수")
+    grid.add_argument("--ef-construction", default="100,200,400", help="색인 시 후보 목록 크기")
+    grid.add_argument("--ef-search", default="100,200,500", help="검색 시 후보 목록 크기")
+    grid.add_argument("--k", type=int, default=10, help="recall@k의 k")
+    
+    run = parser.add_argument_group("실행")
+    run.add_argument("--engine", choices=["hnswlib", "azure"], default="hnswlib")
+    run.add_argument("--index-prefix", default="kite-hnsw-sweep", help="azure 엔진 임시 인덱스 이름 접두어")
+    run.add_argument("--keep-indexes", action="store_true", help="azure 엔진 임시 인덱스를 지우지 않음")
+    
+    parser.add_argument("--target-recall", type=float, default=0.95, help="추천 기준 recall@k")
+    parser.add_argument("--recommend", help="추천 HNSW 설정 JSON 파일 경로 (KITE_HNSW_CONFIG)")
+    parser.add_argument("--output", help="결과 JSON 파일 경로")
+    return parser.parse_args()
+
+
+def export_index_vectors(path: str, limit: int) -> str:
+    """현재 Azure 인덱스의 content_vector를 .npy로 저장 (최대 limit개)"""
+    from backend.service.azure_search import AzureSearchService
+    
+    search_client = AzureSearchService().get_search_client()
+    results = search_client.search(search_text="*", select=["id", "content_vector"], top=limit)
+    vectors = [result["content_vector"] for result in results if result.get("content_vector")]
+    if not vectors:
+        raise RuntimeError("content_vector가 있는 문서가 없습니다")
+    
+    np.save(path, np.asarray(vectors, dtype=np.float32))
+    print(f"💾 임베딩 내보내기: {len(vectors)}개 → {path}")
+    return path
+
+
+def configurations(args: argparse.Namespace) -> List[Tuple[int, int, List[int]]]:
+    """(m, efConstruction, [efSearch...]) 목록 (같은 그래프에서 efSearch만 바꿔가며 측정)"""
+    ms = _split(args.m, int)
+    ef_constructions = _split(args.ef_construction, int)
+    ef_searches = _split(args.ef_search, int)
+    
+    # 추천 설정을 create_index에 그대로 넘기므로 hnswlib 엔진도 같은 범위로 제한
+    for name, values in (("m", ms), ("efConstruction", ef_constructions), ("efSearch", ef_searches)):
+        low, high = AZURE_LIMITS[name]
+        invalid = [value for value in values if not low <= value <= high]
+        if invalid:
+            raise ValueError(f"Azure AI Search의 {name}은 {low}~{high} 범위여야 합니다: {invalid}")
+    
+    return [(m, ef_construction, ef_searches) for m in ms for ef_construction in ef_constructions]
+
+
+class HnswlibEngine:
+    """hnswlib 로컬 인덱스 (코사인)"""
+    
+    name = "hnswlib"
+    
+    def __init__(self, args: argparse.Namespace):
+        try:
+            import hnswlib
+        except ImportError:
+            raise RuntimeError("hnswlib 엔진은 'pip install hnswlib'가 필요합니다")
+        self.hnswlib = hnswlib
+        self.seed = args.seed
+        self.index = None
+    
+    def build(self, documents: np.ndarray, m: int, ef_construction: int) -> float:
+        started = time.perf_counter()
+        index = self.hnswlib.Index(space="cosine", dim=documents.shape[1])
+        index.init_index(max_elements=len(documents), M=m, ef_construction=ef_construction, random_seed=self.seed)
+        index.add_items(documents, np.arange(len(documents)))
+        self.index = index
+        return time.perf_counter() - started
+    
+    def set_ef_search(self, ef_search: int):
+        self.index.set_ef(ef_search)
+    
+    def search(self, query: np.ndarray, k: int) -> List[str]:
+        labels, _ = self.index.knn_query(query, k=k)
+        return [str(label) for label in labels[0]]
+    
+    def close(self):
+        self.index = None
+
+
+class AzureEngine:
+    """
+    Azure AI Search 임시 인덱스 (id + content_vector만)
+    
+    efSearch는 인덱스 정의만 바꿔서 적용하고, 서비스가 거부하면 인덱스를 다시 만든다.
+    """
+    
+    name = "azure"
+    
+    def __init__(self, args: argparse.Namespace):
+        self.endpoint = os.getenv("AZURE_SEARCH_ENDPOINT")
+        self.credential = AzureKeyCredential(os.getenv("AZURE_SEARCH_KEY"))
+        self.index_client = SearchIndexClient(endpoint=self.endpoint, credential=self.credential)
+        self.prefix = args.index_prefix
+        self.keep = args.keep_indexes
+        self.created: List[str] = []
+        self.documents = None
+        self.search_client = None
+        self.params: Dict = {}
+    
+    def _index(self, name: str, dim: int, m: int, ef_construction: int, ef_search: int) -> SearchIndex:
+        return SearchIndex(
+            name=name,
+            fields=[
+                SimpleField(name="id", type=SearchFieldDataType.String, key=True),
+                SearchField(
+                    name="content_vector",
+                    type=SearchFieldDataType.Collection(SearchFieldDataType.Single),
+                    searchable=True,
+                    vector_search_dimensions=dim,
+                    vector_search_profile_name="sweep-profile"
+                )
+            ],
+            vector_search=VectorSearch(
+                profiles=[VectorSearchProfile(name="sweep-profile", algorithm_configuration_name="sweep-hnsw")],
+                algorithms=[HnswAlgorithmConfiguration(
+                    name="sweep-hnsw",
+                    parameters={"m": m, "efConstruction": ef_construction, "efSearch": ef_search, "metric": "cosine"}
+                )]
+            )
+        )
+    
+    def _wait_for_count(self, count: int, timeout: float = 600):
+        deadline = time.perf_counter() + timeout
+        while self.search_client.get_document_count() < count:
+            if time.perf_counter() > deadline:
+                raise TimeoutError(f"{timeout:.0f}초 안에 {count}개 문서가 색인되지 않았습니다")
+            time.sleep(1)
+    
+    def build(self, documents: np.ndarray, m: int, ef_construction: int, ef_search: int = 500) -> float:
+        name = f"{self.prefix}-m{m}-efc{ef_construction}"
+        self.index_client.create_or_update_index(self._index(name, documents.shape[1], m, ef_construction, ef_search))
+        if name not in self.created:
+            self.created.append(name)
+        self.search_client = SearchClient(endpoint=self.endpoint, index_name=name, credential=self.credential)
+        self.documents = documents
+        self.params = {"name": name, "m": m, "efConstruction": ef_construction, "efSearch": ef_search}
+        
+        # 업로드 시작부터 모든 문서가 검색 가능해질 때까지
+        started = time.perf_counter()
+        for start in range(0, len(documents), _UPLOAD_BATCH):
+            batch = documents[start:start + _UPLOAD_BATCH]
+            self.search_client.upload_documents([
+                {"id": str(start + offset), "content_vector": vector.tolist()}
+                for offset, vector in enumerate(batch)
+            ])
+        self._wait_for_count(len(documents))
+        return time.perf_counter() - started
+    
+    def set_ef_search(self, ef_search: int):
+        if ef_search == self.params["efSearch"]:
+            return
+        params = self.params
+        try:
+            self.index_client.create_or_update_index(
+                self._index(params["name"], self.documents.shape[1], params["m"], params["efConstruction"], ef_search)
+            )
+            self.params = {**params, "efSearch": ef_search}
+        except Exception as e:
+            print(f"   ⚠️ efSearch만 바꾸기 실패, 인덱스를 다시 만듦: {str(e)}")
+            self.index_client.delete_index(params["name"])
+            self.build(self.documents, params["m"], params["efConstruction"], ef_search)
+    
+    def search(self, query: np.ndarray, k: int) -> List[str]:
+        results = self.search_client.search(
+            search_text=None,
+            vector_queries=[{"kind": "vector", "vector": query.tolist(), "fields": "content_vector", "k": k}],
+            select=["id"],
+            top=k
+        )
+        return [result["id"] for result in results]
+    
+    def close(self):
+        if self.search_client is not None:
+            self.search_client.close()
+        if self.keep:
+            print(f"📌 임시 인덱스 유지: {', '.join(self.created)}")
+            return
+        for name in self.created:
+            try:
+                self.index_client.delete_index(name)
+            except Exception as e:
+                print(f"⚠️ 임시 인덱스 삭제 실패 ({name}): {str(e)}")
+
+
+def measure(engine, queries: np.ndarray, truth: List[set], k: int) -> Dict:
+    """현재 인덱스 설정으로 recall@k / 지연 시간"""
+    # 워밍업
+    for query in queries[:5]:
+        engine.search(query, k)
+    
+    latencies, recalls = [], []
+    for query, expected in zip(queries, truth):
+        started = time.perf_counter()
+        found = engine.search(query, k)
+        latencies.append((time.perf_counter() - started) * 1000)
+        recalls.append(len(set(found) & expected) / k)
+    
+    return {
+        f"recall@{k}": round(float(np.mean(recalls)), 4),
+        "latency_ms": {
+            "p50": round(float(np.percentile(latencies, 50)), 3),
+            "p95": round(float(np.percentile(latencies, 95)), 3)
+        }
+    }
+
+
+def recommend(results: List[Dict], k: int, target_recall: float) -> Optional[Dict]:
+    """
+    목표 recall을 만족하는 조합 중 p95 → 색인 시간이 가장 작은 것
+    (만족하는 조합이 없으면 recall이 가장 높은 것)
+    """
+    if not results:
+        return None
+    qualified = [r for r in results if r[f"recall@{k}"] >= target_recall]
+    if qualified:
+        best = min(qualified, key=lambda r: (r["latency_ms"]["p95"], r["build_seconds"]))
+    else:
+        print(f"⚠️ recall@{k} ≥ {target_recall}인 조합이 없어 recall이 가장 높은 조합을 추천")
+        best = max(results, key=lambda r: (r[f"recall@{k}"], -r["latency_ms"]["p95"]))
+    return {"m": best["m"], "efConstruction": best["efConstruction"], "efSearch": best["efSearch"], "metric": "cosine"}
+
+
+def print_results(results: List[Dict], k: int, recommended: Optional[Dict]):
+    print("\n" + "=" * 72)
+    print(f"{'m':>4}{'efConstruction':>16}{'efSearch':>10}{f'recall@{k}':>11}"
+          f"{'p50 ms':>9}{'p95 ms':>9}{'build s':>10}")
+    print("=" * 72)
+    for r in results:
+        mark = " ⭐" if recommended and all(r[key] == recommended[key] for key in ("m", "efConstruction", "efSearch")) else ""
+        print(f"{r['m']:>4}{r['efConstruction']:>16}{r['efSearch']:>10}{r[f'recall@{k}']:>11}"
+              f"{r['latency_ms']['p50']:>9}{r['latency_ms']['p95']:>9}{r['build_seconds']:>10}{mark}")
+
+
+def main():
+    args = parse_args()
+    
+    if args.export_vectors:
+        args.vectors = export_index_vectors(args.export_vectors, args.size)
+    
+    documents, queries = load_corpus(args)
+    if args.vectors and len(documents) > args.size:
+        documents = documents[:args.size]
+    if args.dimensions:
+        documents, queries = reduce_dimensions(documents, args.dimensions), reduce_dimensions(queries, args.dimensions)
+    print(f"📦 코퍼스: {len(documents)}개 × {documents.shape[1]}차원, 쿼리 {len(queries)}개 (엔진: {args.engine})")
+    
+    grid = configurations(args)
+    truth = exact_top_k(documents, queries, args.k)
+    
+    engine = HnswlibEngine(args) if args.engine == "hnswlib" else AzureEngine(args)
+    results = []
+    try:
+        for m, ef_construction, ef_searches in grid:
+            print(f"🔄 m={m} efConstruction={ef_construction} 색인 중...")
+            build_seconds = engine.build(documents, m, ef_construction)
+            for ef_search in ef_searches:
+                engine.set_ef_search(ef_search)
+                results.append({
+                    "m": m,
+                    "efConstruction": ef_construction,
+                    "efSearch": ef_search,
+                    "build_seconds": round(build_seconds, 3),
+                    **measure(engine, queries, truth, args.k)
+                })
+    finally:
+        engine.close()
+    
+    recommended = recommend(results, args.k, args.target_recall)
+    print_results(results, args.k, recommended)
+    print(f"\n⭐ 추천 설정 (recall@{args.k} ≥ {args.target_recall}): {recommended}")
+    
+    if args.recommend and recommended:
+        Path(args.recommend).write_text(json.dumps(recommended, indent=2), encoding="utf-8")
+        print(f"💾 추천 설정 저장: {args.recommend} (KITE_HNSW_CONFIG={args.recommend})")
+    
+    if args.output:
+        report = {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "environment": {
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count()
+            },
+            "engine": args.engine,
+            "corpus": {
+                "source": args.vectors or "synthetic",
+                "documents": len(documents),
+                "dim": int(documents.shape[1]),
+                "queries": len(queries)
+            },
+            "k": args.k,
+            "target_recall": args.target_recall,
+            "recommended": recommended,
+            "results": results
+        }
+        Path(args.output).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"💾 결과 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+문서 파일을 스트리밍 파이프라인으로 수집 (읽기 → 정리 → 청크 → 임베딩 → Blob / 인덱스)
+
+단계 사이 큐 크기가 정해져 있어서 문서가 수백만 개여도 메모리가 일정하다.
+체크포인트 파일에 처리한 위치를 남기므로 중간에 죽어도 같은 명령으로 다시 실행하면 이어서 처리한다.
+2초마다 처리량 / 큐 깊이를, 끝나면 단계별 시간을 출력한다.
+
+예시:
+    python scripts/ingest.py --input slack_export.jsonl
+    python scripts/ingest.py --input slack_export.jsonl --sink blob --sink index --output ingest_report.json
+    python scripts/ingest.py --input slack_export.jsonl --restart
+"""
+import os
+import sys
+import json
+import resource
+import argparse
+import platform
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.service.ingestion_pipeline import SINKS, ingest, read_documents
+from data.sample_documents import get_sample_documents
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="문서를 스트리밍 파이프라인으로 Blob / 인덱스에 수집")
+    parser.add_argument("--input", help="문서 파일 (.jsonl: 한 줄에 문서 하나 / .json: 문서 배열). 없으면 샘플 문서")
+    parser.add_argument("--sink", action="append", choices=SINKS, help="쓰기 대상 (여러 번 지정 가능, 기본 blob)")
+    parser.add_argument("--checkpoint", help="체크포인트 파일 (기본 .cache/ingest-{입력 파일 이름}.checkpoint.json)")
+    parser.add_argument("--restart", action="store_true", help="체크포인트를 지우고 처음부터")
+    parser.add_argument("--queue-size", type=int, help="단계 사이 큐 크기 (기본 KITE_PIPELINE_QUEUE_SIZE)")
+    parser.add_argument("--batch-size", type=int, help="쓰기 단계 묶음 크기 (기본 KITE_PIPELINE_BATCH_SIZE)")
+    parser.add_argument("--output", help="결과 JSON 파일 경로")
+    return parser.parse_args()
+
+
+def peak_rss_mb() -> float:
+    """프로세스 최대 메모리 (Linux는 KB, macOS는 바이트 단위)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def print_progress(progress: Dict):
+    queues = ", ".join(f"{q['queue']} {q['depth']}/{q['size']}" for q in progress["queues"])
+    print(
+        f"   {progress['documents']}개 (원본 위치 {progress['next_offset']}, 실패 {progress['failed']}개) "
+        f"| {progress['documents_per_second']}개/초 | 큐 {queues} "
+        f"| {peak_rss_mb()} MB | {progress['elapsed_seconds']}초"
+    )
+
+
+def print_stages(result: Dict):
+    print("\n" + "=" * 90)
+    print(f"{'단계':<12}{'입력':>10}{'출력':>10}{'작업(초)':>12}{'입력 대기(초)':>16}{'출력 대기(초)':>16}{'개/초':>12}")
+    print("-" * 90)
+    for stage in result["stages"]:
+        rate = stage["items_per_busy_second"]
+        print(
+            f"{stage['stage']:<12}{stage['items_in']:>10}{stage['items_out']:>10}{stage['busy_seconds']:>12}"
+            f"{stage['wait_input_seconds']:>16}{stage['wait_output_seconds']:>16}{rate if rate is not None else '-':>12}"
+        )
+    print("-" * 90)
+    for q in result["queues"]:
+        print(f"큐 {q['queue']}: 평균 {q['depth_avg']} / 최대 {q['depth_max']} (크기 {q['size']})")
+    print("=" * 90)
+
+
+def main():
+    args = parse_args()
+    sinks = args.sink or ["blob"]
+    source = str(Path(args.input).resolve()) if args.input else "sample_documents"
+    checkpoint_path = args.checkpoint or str(
+        project_root / ".cache" / f"ingest-{Path(args.input).stem if args.input else 'sample'}.checkpoint.json"
+    )
+    print(f"🚀 스트리밍 수집 시작: {source} → {', '.join(sinks)}\n")
+    
+    if args.restart:
+        Path(checkpoint_path).unlink(missing_ok=True)
+    
+    documents = read_documents(args.input) if args.input else iter(get_sample_documents())
+    try:
+        result = ingest(
+            documents,
+            source=source,
+            sinks=sinks,
+            checkpoint_path=checkpoint_path,
+            queue_size=args.queue_size,
+            batch_size=args.batch_size,
+            on_progress=print_progress
+        )
+    except ValueError as e:
+        print(f"❌ {str(e)}")
+        return False
+    except Exception as e:
+        print(f"❌ 수집 중단: {str(e)}")
+        print(f"💡 같은 명령으로 다시 실행하면 체크포인트({checkpoint_path})부터 이어서 처리합니다")
+        return False
+    
+    if result["stages"]:
+        print_stages(result)
+    print(
+        f"📊 {result['documents']}개 처리 (원본 위치 {result['resumed_from']}부터), "
+        f"{result['documents_per_second']}개/초, {result['elapsed_seconds']}초, 최대 메모리 {peak_rss_mb()} MB"
+    )
+    
+    if args.output:
+        report = {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "environment": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count()
+            },
+            "source": source,
+            "sinks": sinks,
+            "checkpoint": checkpoint_path,
+            "peak_rss_mb": peak_rss_mb(),
+            **result
+        }
+        Path(args.output).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"💾 결과 저장: {args.output}")
+    
+    if result["failed_ids"]:
+        print(f"\n⚠️ 실패한 문서 {len(result['failed_ids'])}개: {', '.join(result['failed_ids'][:10])}")
+        print(f"💡 같은 명령으로 다시 실행하면 실패한 문서만 다시 씁니다 (체크포인트: {checkpoint_path})")
+        return False
+    
+    print("\n🎉 수집 완료!")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,106 @@
+"""
+문서를 Azure AI Search 인덱스에 바로 올리기 (푸시 방식 색인)
+
+Blob 업로드 → 인덱서(5분 주기) → 스킬셋 임베딩 대신, 클라이언트에서 임베딩해서
+merge_or_upload로 바로 색인한다. 업로드가 끝나면 몇 초 안에 검색된다.
+급한 문서는 이 스크립트로, 나머지는 기존 Blob / 인덱서 경로로 올리면 된다.
+
+예시:
+    python scripts/push_index.py
+    python scripts/push_index.py --input urgent_mail.jsonl --fallback-blob
+"""
+import sys
+import argparse
+from pathlib import Path
+from typing import Dict, List
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.service.azure_blob import AzureBlobService
+from backend.service.blob_batches import blob_layout, sync_batches
+from backend.service.ingestion_pipeline import read_documents
+from backend.service.local_backend import LocalBlobService, use_local_backend
+from backend.service.push_indexer import PushIndexer
+from data.sample_documents import get_sample_documents
+from scripts.upload_to_blob import prepare
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="문서를 임베딩해서 검색 인덱스에 바로 올리기")
+    parser.add_argument("--input", help="문서 파일 (.jsonl: 한 줄에 문서 하나 / .json: 문서 배열). 없으면 샘플 문서")
+    parser.add_argument("--fallback-blob", action="store_true", help="색인에 실패한 문서는 Blob에 올려서 인덱서가 처리")
+    return parser.parse_args()
+
+
+def load_documents(args: argparse.Namespace):
+    return read_documents(args.input) if args.input else iter(get_sample_documents())
+
+
+def store_in_blob(blob_service, documents: List[Dict]) -> bool:
+    """
+    문서를 KITE_BLOB_LAYOUT에 맞게 Blob에 저장 (모두 성공하면 True)
+    
+    jsonl이면 데이터 소스 / 로컬 검색이 jsonl/ 배치만 읽으므로 {id}.json이 아니라 배치로 올린다.
+    """
+    if blob_layout() == "jsonl":
+        result = sync_batches(blob_service, documents)
+        print(f"📦 JSON Lines 배치로 {result['changed']}/{len(documents)}개 저장 (변경 없음 {result['unchanged']}개)")
+        return result["failed"] == 0
+    uploaded = blob_service.upload_documents(documents)
+    print(f"📦 {uploaded}/{len(documents)}개 저장")
+    return uploaded == len(documents)
+
+
+def print_progress(progress: Dict):
+    print(
+        f"   원본 {progress['documents']}개 → 색인 {progress['succeeded']}/{progress['index_documents']}개 "
+        f"(실패 {progress['failed']}개, 재시도 {progress['retries']}회) "
+        f"| 임베딩 {progress['embedding_seconds']:.1f}초, 업로드 {progress['upload_seconds']:.1f}초 "
+        f"| {progress['elapsed_seconds']}초"
+    )
+
+
+def main():
+    args = parse_args()
+    print("🚀 푸시 방식 색인 시작...\n")
+    
+    # 로컬 백엔드는 검색이 Blob 디렉터리를 바로 읽으므로 Blob 저장이 곧 색인
+    if use_local_backend():
+        print("💡 KITE_BACKEND=local: 로컬 Blob 디렉터리에 저장합니다 (로컬 검색이 바로 다시 읽음)")
+        documents = [prepare(doc) for doc in load_documents(args)]
+        return store_in_blob(LocalBlobService(), documents)
+    
+    try:
+        indexer = PushIndexer()
+    except ValueError as e:
+        print(f"❌ {str(e)}")
+        return False
+    
+    try:
+        result = indexer.push(load_documents(args), on_progress=print_progress)
+    finally:
+        indexer.close()
+    
+    print("\n" + "=" * 60)
+    print(f"📊 원본 {result['documents']}개, 색인 문서 {result['succeeded']}/{result['index_documents']}개 성공")
+    print(f"   임베딩 {result['embedding_seconds']}초, 업로드 {result['upload_seconds']}초, 전체 {result['elapsed_seconds']}초")
+    print("=" * 60)
+    
+    if not result["failed_ids"]:
+        print("\n🎉 모든 문서 색인 완료! 바로 검색할 수 있습니다.")
+        return True
+    
+    print(f"\n⚠️ 색인 실패 문서 {len(result['failed_ids'])}개: {', '.join(result['failed_ids'][:10])}")
+    if args.fallback_blob:
+        # 입력을 다시 읽어서 실패한 문서만 Blob으로 (인덱서가 다음 실행에서 색인)
+        failed = set(result["failed_ids"])
+        retry = [prepare(doc) for doc in load_documents(args) if doc["id"] in failed]
+        print("📦 Blob 대체 경로로 업로드 (다음 인덱서 실행 때 색인)")
+        store_in_blob(AzureBlobService(), retry)
+    return False
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
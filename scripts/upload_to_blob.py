@@ -1,40 +1,128 @@
 """
-샘플 문서를 Azure Blob Storage에 업로드
+샘플 문서(또는 내보낸 문서 파일)를 Azure Blob Storage에 업로드
+
+여러 문서를 동시에 올리고(KITE_BLOB_UPLOAD_CONCURRENCY / --concurrency),
+스로틀링이면 백오프 후 재시도한다. 진행 상황과 처리량을 1초마다 출력한다.
+
+기본은 증분 동기화: Blob의 Content-MD5와 비교해서 새 문서 / 바뀐 문서만 올린다
+(안 바뀐 Blob은 last-modified가 그대로라 인덱서가 다시 임베딩하지 않음).
+KITE_BLOB_LAYOUT=jsonl 이면 바뀐 문서만 JSON Lines 배치 Blob으로 묶어서 올린다 (blob_batches.py).
+
+예시:
+    python scripts/upload_to_blob.py
+    python scripts/upload_to_blob.py --input slack_export.jsonl --concurrency 64 --delete-missing
 """
 import sys
+import argparse
 from pathlib import Path
+from typing import Dict
 
 # 경로 설정
 project_root = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(project_root))
 
 from backend.service.azure_blob import AzureBlobService
+from backend.service.blob_batches import blob_layout, sync_batches
+from backend.service.blob_manifest import sync_documents
+from backend.service.chunking import attach_chunks, index_mode
+from backend.service.ingestion_pipeline import read_documents
+from backend.service.local_backend import LocalBlobService, use_local_backend
+from backend.service.query_filters import attach_filter_fields
 from data.sample_documents import get_sample_documents
 
 
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="문서를 Blob Storage에 업로드")
+    parser.add_argument("--input", help="문서 파일 (.jsonl: 한 줄에 문서 하나 / .json: 문서 배열). 없으면 샘플 문서")
+    parser.add_argument("--concurrency", type=int, help="동시 업로드 수 (기본 KITE_BLOB_UPLOAD_CONCURRENCY)")
+    parser.add_argument("--full", action="store_true", help="바뀌지 않은 문서도 모두 다시 업로드 (jsonl이면 전체를 새 배치로 압축)")
+    parser.add_argument("--delete-missing", action="store_true", help="원본에 없는 Blob(jsonl이면 문서) 삭제 (증분 동기화에서만)")
+    return parser.parse_args()
+
+
+def prepare(document: Dict) -> Dict:
+    """날짜 / 작성자 필터용 필드 추가 + 청크 색인이면 청크 분할 (인덱서가 청크마다 임베딩)"""
+    document = attach_filter_fields(document)
+    return attach_chunks(document) if index_mode() == "chunk" else document
+
+
+def print_progress(progress: Dict):
+    total = f"/{progress['total']}" if progress["total"] else ""
+    print(
+        f"   {progress['done']}{total}개 ({progress.get('skipped', 0)}개 변경 없음, "
+        f"{progress['failed']}개 실패, 재시도 {progress['retries']}회) "
+        f"| {progress['docs_per_second']}개/초, {progress['mb_per_second']} MB/초 "
+        f"| {progress['elapsed_seconds']}초"
+    )
+
+
 def main():
-    print("🚀 샘플 문서를 Blob Storage에 업로드 시작...\n")
+    args = parse_args()
+    print("🚀 문서를 Blob Storage에 업로드 시작...\n")
     
     try:
-        # Blob 서비스 초기화
-        blob_service = AzureBlobService()
+        # Blob 서비스 초기화 (KITE_BACKEND=local이면 로컬 디렉터리)
+        blob_service = LocalBlobService() if use_local_backend() else AzureBlobService()
+        
+        # 파일이면 한 건씩 읽어서 바로 업로드 (샘플 문서는 개수를 먼저 출력)
+        if args.input:
+            documents = (prepare(doc) for doc in read_documents(args.input))
+            print(f"📄 업로드할 파일: {args.input}\n")
+        else:
+            documents = [prepare(doc) for doc in get_sample_documents()]
+            print(f"📄 업로드할 문서: {len(documents)}개\n")
+        
+        # 문서 업로드 (기본: 바뀐 문서만)
+        if blob_layout() == "jsonl":
+            print("🔄 JSON Lines 배치 동기화 진행 중...\n")
+            result = sync_batches(
+                blob_service,
+                documents,
+                delete_missing=args.delete_missing,
+                compact=args.full,
+                max_concurrency=args.concurrency,
+                on_progress=print_progress
+            )
+            success_count, failed = result["changed"], result["failed"]
+            print(
+                f"\n📊 문서 {result['documents']}개 중 변경 {result['changed']}개, 삭제 {result['deleted']}개 "
+                f"→ 배치 {result['batches']}개 ({result['bytes'] / 1e6:.1f} MB)"
+            )
+            if result["removed_batches"]:
+                print(f"🗑️ 이전 배치 {result['removed_batches']}개 삭제")
+        elif args.full:
+            print("🔄 전체 업로드 진행 중...\n")
+            result = {}
         
-        # 샘플 문서 가져오기
-        documents = get_sample_documents()
-        print(f"📄 업로드할 문서: {len(documents)}개\n")
+            def report(progress: Dict):
+                result.update(progress)
+                print_progress(progress)
         
-        # 문서 업로드
-        print("🔄 업로드 진행 중...\n")
-        success_count = blob_service.upload_documents(documents)
+            success_count = blob_service.upload_documents(documents, max_concurrency=args.concurrency, on_progress=report)
+            failed = result.get("failed", 0)
+        else:
+            print("🔄 증분 동기화 진행 중...\n")
+            result = sync_documents(
+                blob_service,
+                documents,
+                delete_missing=args.delete_missing,
+                max_concurrency=args.concurrency,
+                on_progress=print_progress
+            )
+            success_count, failed = result["uploaded"], result["failed"]
+            print(f"\n📊 업로드 {result['uploaded']}개, 변경 없음 {result['unchanged']}개, 실패 {failed}개")
+            if result["stale"]:
+                action = f"{result['deleted']}개 삭제" if args.delete_missing else "--delete-missing으로 삭제 가능"
+                print(f"🗑️ 원본에 없는 Blob {result['stale']}개 ({action})")
         
-        if success_count == len(documents):
+        if failed == 0:
             print(f"\n🎉 모든 문서 업로드 완료! ({success_count}개)")
             print("\n📍 Azure Portal에서 확인:")
             print("   Storage Account > 컨테이너 > kite-documents")
             print("\n✅ 다음 단계: 인덱서가 자동으로 문서를 처리합니다 (최대 5분 소요)")
             return True
         else:
-            print(f"\n⚠️ 일부 문서 업로드 실패: {success_count}/{len(documents)}개 성공")
+            print(f"\n⚠️ 일부 문서 업로드 실패: {success_count}개 성공, {failed}개 실패")
             return False
             
     except Exception as e:
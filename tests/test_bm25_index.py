@@ -0,0 +1,84 @@
+"""BM25Index 점수가 살아 있는 문서만으로 계산한 BM25(전수 계산)와 같은지"""
+import math
+import random
+from collections import Counter
+
+import pytest
+
+from backend.service.bm25_index import BM25Index, tokenize
+
+VOCABULARY = [
+    "배포", "일정", "회의록", "프로젝트에서", "장애", "보고서를", "예산", "검토", "고객사", "요청",
+    "redis", "kafka", "chub", "api", "latency", "deploy", "review", "budget", "incident", "sprint"
+]
+
+
+def brute_force(tokenized, query, k1=1.2, b=0.75):
+    """살아 있는 문서 전체({문서 ID: 토큰 Counter})를 보고 계산한 BM25 {문서 ID: 점수}"""
+    lengths = {doc_id: sum(counts.values()) for doc_id, counts in tokenized.items()}
+    n = len(tokenized)
+    avg_length = sum(lengths.values()) / n
+    df = Counter(token for counts in tokenized.values() for token in counts)
+    
+    scores = {}
+    for token in dict.fromkeys(tokenize(query)):
+        if not df[token]:
+            continue
+        idf = math.log(1 + (n - df[token] + 0.5) / (df[token] + 0.5))
+        for doc_id, counts in tokenized.items():
+            tf = counts.get(token)
+            if tf:
+                norm = k1 * (1 - b + b * lengths[doc_id] / avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (k1 + 1) / (tf + norm)
+    return scores
+
+
+def random_text(rng):
+    return " ".join(rng.choice(VOCABULARY) for _ in range(rng.randint(3, 40)))
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    """3000개 추가 → 400개 삭제 → 200개 교체 (압축 비율 25% 미만이라 압축 전 상태)"""
+    rng = random.Random(7)
+    documents = {f"doc{i}": random_text(rng) for i in range(3000)}
+    index = BM25Index()
+    index.add_many(documents.items())
+    
+    deleted = rng.sample(sorted(documents), 400)
+    index.delete(deleted)
+    for doc_id in deleted:
+        del documents[doc_id]
+    
+    for doc_id in rng.sample(sorted(documents), 200):
+        documents[doc_id] = random_text(rng)
+        index.add(doc_id, documents[doc_id])
+    
+    assert index.stats()["deleted_pending"] == 600
+    return index, documents, rng
+
+
+def test_matches_brute_force_before_compaction(corpus):
+    index, documents, rng = corpus
+    tokenized = {doc_id: Counter(tokenize(text)) for doc_id, text in documents.items()}
+    for _ in range(60):
+        query = " ".join(rng.sample(VOCABULARY, rng.randint(1, 4)))
+        exact = brute_force(tokenized, query)
+        expected = sorted(exact.values(), reverse=True)[:10]
+        actual = index.search(query, k=10)
+        
+        # 동점 순서는 다를 수 있으므로 점수 목록 + 각 문서의 전수 계산 점수로 비교
+        assert [score for _, score in actual] == pytest.approx(expected, rel=1e-4)
+        for doc_id, score in actual:
+            assert score == pytest.approx(exact[doc_id], rel=1e-4)
+
+
+def test_deleted_terms_do_not_score():
+    index = BM25Index()
+    index.add_many([("a", "redis 장애"), ("b", "kafka 배포"), ("c", "kafka 일정")])
+    index.delete(["a"])
+    assert index.search("redis") == []
+    
+    index.add("b", "redis 복구")
+    assert [doc_id for doc_id, _ in index.search("redis")] == ["b"]
+    assert [doc_id for doc_id, _ in index.search("kafka")] == ["c"]
@@ -0,0 +1,114 @@
+"""query_filters.parse_query_filters / resolve_filters"""
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from backend.service.query_filters import FilterIndex, matches, parse_query_filters, resolve_filters
+
+# 2024-10-09 (수요일)
+TODAY = date(2024, 10, 9)
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("이번 주 슬랙에서 홍길동이 보낸 메시지", {
+        "sources": ["슬랙"], "senders": ["홍길동"], "date_from": "2024-10-07", "date_to": "2024-10-13"
+    }),
+    ("김영희님이 작성한 Confluence 문서", {"sources": ["컨플루언스"], "senders": ["김영희"]}),
+    ("jira 티켓 정리", {"sources": ["지라"]}),
+    ("메일로 온 요청", {"sources": ["메일"]}),
+    ("오늘 회의록", {"date_from": "2024-10-09", "date_to": "2024-10-09"}),
+    ("어제 받은 공지", {"date_from": "2024-10-08", "date_to": "2024-10-08"}),
+    ("지난주 배포 이슈", {"date_from": "2024-09-30", "date_to": "2024-10-06"}),
+    ("최근 3일 장애 보고", {"date_from": "2024-10-07", "date_to": "2024-10-09"}),
+    ("지난 달 예산 논의", {"date_from": "2024-09-01", "date_to": "2024-09-30"}),
+])
+def test_parses_explicit_filters(query, expected):
+    assert parse_query_filters(query, today=TODAY) == expected
+
+
+@pytest.mark.parametrize("query", [
+    "내가 쓴 요약해줘",
+    "그가 보낸 자료",
+    "누가 올린 문서야?",
+    "팀장님이 보낸 자료",
+    "이메일 주소 변경 요청 건 정리",
+    "slacker 설정 방법",
+    "오늘까지 해야 할 일",
+    "이번 주까지 제출할 보고서",
+    "어제까지 마감이었던 작업",
+])
+def test_ignores_pronouns_substrings_and_deadlines(query):
+    assert parse_query_filters(query, today=TODAY) == {}
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("고객에게 보낸 메일 정리", {"sources": ["메일"]}),
+    ("메일 보낸 사람", {"sources": ["메일"]}),
+    ("지라에서 어제 올린", {"sources": ["지라"], "date_from": "2024-10-08", "date_to": "2024-10-08"}),
+    ("전체 팀이 보낸 자료", {}),
+    ("상대방이 쓴 글", {}),
+])
+def test_ignores_particles_aliases_periods_and_generic_nouns_as_senders(query, expected):
+    assert parse_query_filters(query, today=TODAY) == expected
+
+
+def test_keeps_source_when_sender_is_a_title():
+    assert parse_query_filters("팀장님이 보낸 슬랙", today=TODAY) == {"sources": ["슬랙"]}
+
+
+def test_request_filters_override_parsed(monkeypatch):
+    monkeypatch.setenv("KITE_PARSE_QUERY_FILTERS", "true")
+    filters = resolve_filters("슬랙에서 홍길동이 보낸 메시지", {"sources": ["메일"]})
+    assert filters == {"sources": ["메일"], "senders": ["홍길동"]}
+
+
+def test_parsing_can_be_disabled(monkeypatch):
+    monkeypatch.setenv("KITE_PARSE_QUERY_FILTERS", "false")
+    assert resolve_filters("슬랙에서 홍길동이 보낸 메시지") == {}
+
+
+SOURCES = ["슬랙", "메일", "지라", "컨플루언스"]
+SENDERS = ["홍길동", "김영희", "박민수", "이영호"]
+
+
+def random_document(rng):
+    day = date(2024, 9, 1) + timedelta(days=rng.randint(0, 60))
+    return {
+        "source": rng.choice(SOURCES + [None]),
+        "sender": ", ".join(rng.sample(SENDERS, rng.randint(0, 2))),
+        "date": rng.choice([day.isoformat(), f"{day.isoformat()}T09:00:00", "", None])
+    }
+
+
+def random_filters(rng):
+    filters = {}
+    if rng.random() < 0.5:
+        filters["sources"] = rng.sample(SOURCES, rng.randint(1, 2))
+    if rng.random() < 0.5:
+        filters["senders"] = rng.sample(SENDERS, rng.randint(1, 2))
+    if rng.random() < 0.5:
+        filters["date_from"] = (date(2024, 9, 1) + timedelta(days=rng.randint(0, 60))).isoformat()
+    if rng.random() < 0.5:
+        filters["date_to"] = (date(2024, 9, 1) + timedelta(days=rng.randint(0, 60))).isoformat()
+    return filters or {"sources": [rng.choice(SOURCES)]}
+
+
+def test_filter_index_matches_full_scan():
+    rng = random.Random(3)
+    documents = {f"doc{i}": random_document(rng) for i in range(2000)}
+    index = FilterIndex()
+    for doc_id, document in documents.items():
+        index.add(doc_id, document)
+    for doc_id in rng.sample(sorted(documents), 300):
+        index.remove(doc_id)
+        del documents[doc_id]
+    for doc_id in rng.sample(sorted(documents), 300):
+        documents[doc_id] = random_document(rng)
+        index.add(doc_id, documents[doc_id])
+    
+    assert index.candidates({}) is None
+    for _ in range(200):
+        filters = random_filters(rng)
+        expected = {doc_id for doc_id, document in documents.items() if matches(document, filters)}
+        assert index.candidates(filters) == expected
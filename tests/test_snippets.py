@@ -0,0 +1,33 @@
+"""snippets.search_highlight_snippet / highlight_snippet 길이 제한"""
+from backend.service.snippets import HIGHLIGHT_POST_TAG, HIGHLIGHT_PRE_TAG, highlight_snippet, search_highlight_snippet
+
+
+def visible(snippet):
+    return snippet.replace(HIGHLIGHT_PRE_TAG, "").replace(HIGHLIGHT_POST_TAG, "").strip("…")
+
+
+def test_search_highlights_are_truncated_to_max_chars():
+    fragment = "배포 일정 " * 40 + f"{HIGHLIGHT_PRE_TAG}장애{HIGHLIGHT_POST_TAG} 보고 " + "회의록 " * 40
+    snippet = search_highlight_snippet({"content": [fragment, fragment]}, "본문", max_chars=50)
+    assert len(visible(snippet)) <= 50
+    assert snippet.endswith("…")
+    assert snippet.count(HIGHLIGHT_PRE_TAG) % 2 == 0
+
+
+def test_search_highlight_cut_inside_highlight_is_closed():
+    fragment = f"앞 {HIGHLIGHT_PRE_TAG}아주긴강조단어{HIGHLIGHT_POST_TAG} 뒤"
+    assert search_highlight_snippet({"content": [fragment]}, "", max_chars=5) == f"앞 {HIGHLIGHT_PRE_TAG}아주긴{HIGHLIGHT_POST_TAG}…"
+
+
+def test_short_search_highlights_are_unchanged():
+    fragment = f"{HIGHLIGHT_PRE_TAG}redis{HIGHLIGHT_POST_TAG} 장애 보고"
+    assert search_highlight_snippet({"content": [fragment]}, "", max_chars=50) == fragment
+
+
+def test_search_and_local_snippets_have_the_same_limit():
+    content = "redis 장애 " * 200
+    local = highlight_snippet(content, "redis 장애", max_chars=80)
+    azure = search_highlight_snippet(
+        {"content": [f"{HIGHLIGHT_PRE_TAG}redis{HIGHLIGHT_POST_TAG} 장애 " * 100]}, content, max_chars=80
+    )
+    assert len(visible(local)) <= 80 and len(visible(azure)) <= 80